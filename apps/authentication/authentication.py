@@ -0,0 +1,78 @@
+"""JWT authentication that resolves users from the cache.
+
+:class:`CachedJWTAuthentication` is a drop-in replacement for simplejwt's
+``JWTAuthentication``. The user a token names is loaded once and kept in the
+API cache for ``AUTH_USER_CACHE_TIMEOUT`` seconds under the ``user:<id>``
+version scope (see :mod:`apps.core.cache`). Saving or deleting the user
+bumps that scope, so changes such as deactivation or a new password apply
+to the next request; ``QuerySet.update()`` skips the signal and is only
+picked up once the entry expires.
+
+Only :data:`CACHED_FIELDS` are cached, never the password hash. A user
+served from the cache has its other fields deferred, so they load on first
+access and ``save()`` writes back only the fields it has. With
+``CHECK_REVOKE_TOKEN`` on, the MD5 digest of the hash that simplejwt compares
+with the token is cached instead of the hash.
+
+Users are loaded from the primary database: a token may name a user created
+moments ago, before a read replica has it.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.core.cache import get_cache, get_versions, user_scope
+from apps.core.replicas import use_primary
+
+CACHED_FIELDS = ('id', 'username', 'email', 'is_active', 'is_staff', 'is_superuser')
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_cache_timeout(self):
+        return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        timeout = self.get_cache_timeout()
+        if user_id is None or not timeout:
+            with use_primary():
+                return super().get_user(validated_token)
+
+        cache = get_cache()
+        [version] = get_versions([user_scope(user_id)])
+        key = f'auth-user:{user_id}:{version}'
+        entry = cache.get(key)
+        if entry is None:
+            with use_primary():
+                user = super().get_user(validated_token)
+            cache.set(key, self.cache_entry(user), timeout)
+            return user
+
+        # The same checks simplejwt runs on a freshly loaded user
+        user = self.cached_user(entry['fields'])
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != entry.get('password_md5'):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
+
+    def cached_user(self, values):
+        """A user as loaded from the database with only ``values`` selected"""
+        model = get_user_model()
+        # from_db() takes the values in the model's field order
+        names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+        return model.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+
+    def cache_entry(self, user):
+        entry = {'fields': {field: getattr(user, field) for field in CACHED_FIELDS}}
+        if api_settings.CHECK_REVOKE_TOKEN:
+            entry['password_md5'] = get_md5_hash_password(user.password)
+        return entry
@@ -5,8 +5,4 @@ class CoreConfig(AppConfig):
     name = 'apps.core'
 
     def ready(self):
-        try:
-            import apps.core.signals  # This line is CRITICAL
-            print("✅ Signals imported successfully")
-        except ImportError as e:
-            print(f"❌ Failed to import signals: {e}")
+        import apps.core.signals  # noqa: F401  registers the signal handlers
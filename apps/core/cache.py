@@ -0,0 +1,210 @@
+"""Versioned caching of API read responses.
+
+Cached responses are keyed by the requesting user, the request path and the
+current value of one or more *version counters* ("scopes"). Writes never
+delete cache entries; they bump the counters of the scopes they affect, so
+every key built afterwards is new and the old entries simply expire.
+
+Scopes used by the API:
+
+* ``collection`` -- anything listed across projects (project and task lists,
+  task detail); bumped by every project or task write.
+* ``project:<id>`` -- one project's detail and summary; bumped by writes to
+  the project or its tasks.
+* ``global`` -- part of every key; bumped when a user changes, since users
+  are nested into responses, and by writes that may touch any project.
+* ``user:<id>`` -- the user row cached by
+  :class:`apps.authentication.authentication.CachedJWTAuthentication`;
+  bumped with ``global`` when the user changes.
+
+Counters start at the current time in nanoseconds, so a counter that was
+evicted never comes back with a value an old entry was stored under.
+
+The same counters make cached responses conditional: their ``ETag`` hashes
+the cache key, and ``Last-Modified`` is the latest bump of any scope, so
+``If-None-Match`` and ``If-Modified-Since`` are answered with ``304``
+without touching the database.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+COLLECTION_SCOPE = 'collection'
+GLOBAL_SCOPE = 'global'
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def project_scope(project_id):
+    return f'project:{project_id}'
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def project_scopes(project_ids):
+    """Scopes invalidated by a write to the given projects or their tasks"""
+    return [COLLECTION_SCOPE, *(project_scope(pk) for pk in set(project_ids) if pk is not None)]
+
+
+def _version_key(scope):
+    return f'api-version:{scope}'
+
+
+def _modified_key(scope):
+    return f'api-modified:{scope}'
+
+
+def _init_missing(cache, values, keys, initial):
+    for key in keys:
+        if key not in values:
+            cache.add(key, initial, timeout=None)
+            values[key] = cache.get(key, initial)
+    return [values[key] for key in keys]
+
+
+def get_versions(scopes):
+    """Current counter value of each scope, initializing missing ones"""
+    cache = get_cache()
+    keys = [_version_key(scope) for scope in scopes]
+    return _init_missing(cache, cache.get_many(keys), keys, time.time_ns())
+
+
+def get_validators(scopes):
+    """``(versions, last modification timestamp)`` of ``scopes`` in one cache read"""
+    cache = get_cache()
+    version_keys = [_version_key(scope) for scope in scopes]
+    modified_keys = [_modified_key(scope) for scope in scopes]
+    values = cache.get_many(version_keys + modified_keys)
+    versions = _init_missing(cache, values, version_keys, time.time_ns())
+    # A missing modification time may have been evicted, so it counts as now
+    modified = _init_missing(cache, values, modified_keys, time.time())
+    return versions, max(modified)
+
+
+def _bump(scopes):
+    cache = get_cache()
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+    now = time.time()
+    cache.set_many({_modified_key(scope): now for scope in scopes}, timeout=None)
+
+
+def bump_versions(scopes, using=None):
+    """Invalidate everything cached under ``scopes``.
+
+    The counters are bumped right away, so the writing transaction never reads
+    its own stale entries, and again once it commits, which discards anything
+    other requests cached from the pre-commit data in the meantime.
+    """
+    scopes = list(scopes)
+    if not scopes:
+        return
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes), using=using)
+
+
+class CachedResponseMixin:
+    """Serve ``list`` and ``retrieve`` from the versioned response cache.
+
+    Views pick the version scopes a response depends on with
+    :meth:`get_cache_scopes`; other actions can opt in by returning
+    ``self.cached_response(request, handler, ...)``. Only ``200`` responses
+    are stored. Every cached action also sends ``ETag`` and
+    ``Last-Modified`` and answers matching conditional requests with ``304``
+    before the handler runs.
+    """
+    cache_actions = ('list', 'retrieve')
+    cache_timeout = None
+
+    def get_cache_scopes(self):
+        return [COLLECTION_SCOPE]
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(settings, 'API_CACHE_TIMEOUT', 300)
+
+    def get_cache_key(self, request, versions=None):
+        if versions is None:
+            versions = get_versions([GLOBAL_SCOPE, *self.get_cache_scopes()])
+        versions = '.'.join(str(version) for version in versions)
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        user = request.user.pk if request.user.is_authenticated else 'anon'
+        return f'api:{type(self).__name__}:{self.action}:{user}:{versions}:{path}'
+
+    def get_validators(self, request, key, modified):
+        """``(ETag, Last-Modified timestamp)`` of the response cached at ``key``.
+
+        Both also change once per cache timeout, so time-dependent fields
+        such as ``is_overdue`` stay no staler than the cache keeps them.
+        """
+        timeout = self.get_cache_timeout()
+        window = int(time.time() // timeout * timeout) if timeout else int(time.time())
+        tag = f'{key}:{request.accepted_renderer.format}:{window}'
+        return f'"{hashlib.md5(tag.encode()).hexdigest()}"', max(int(modified), window)
+
+    def is_not_modified(self, request, etag, last_modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            # Weak comparison; '*' is not honoured, it would hide 404s
+            return etag in (tag.removeprefix('W/') for tag in parse_etags(if_none_match))
+        since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE'))
+        # Dates in the future are invalid
+        return since is not None and last_modified <= since <= time.time()
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        response, key, validators = self.cache_lookup(request)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            self.cache_store(key, response)
+        return self.add_validators(response, validators)
+
+    def cache_lookup(self, request):
+        """``(response, key, validators)``; the response is ``None`` unless it
+        is a ``304`` or was found in the cache"""
+        versions, modified = get_validators([GLOBAL_SCOPE, *self.get_cache_scopes()])
+        self.last_write = modified
+        key = self.get_cache_key(request, versions)
+        validators = self.get_validators(request, key, modified)
+        if self.is_not_modified(request, *validators):
+            return Response(status=status.HTTP_304_NOT_MODIFIED), key, validators
+        data = get_cache().get(key)
+        return (Response(data) if data is not None else None), key, validators
+
+    def cache_store(self, key, response):
+        from .replicas import cache_timeout
+
+        if response.status_code == 200:
+            get_cache().set(key, response.data, cache_timeout(self.get_cache_timeout(), self.last_write))
+
+    def add_validators(self, response, validators):
+        etag, last_modified = validators
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if 'list' not in self.cache_actions:
+            return super().list(request, *args, **kwargs)
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'retrieve' not in self.cache_actions:
+            return super().retrieve(request, *args, **kwargs)
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
@@ -0,0 +1,72 @@
+"""Query hooks and database access from async views.
+
+:func:`wrap_queries` is ``connection.execute_wrapper()`` for a whole
+request: every connection routes its queries through the wrappers installed
+in the current context, so query metrics and N+1 detection see all queries,
+in whichever thread they run -- the request thread, the thread ASGI runs sync
+views in, or a :func:`run_sync` worker.
+
+Django's async ORM methods (``aget()``, ``acount()``, ...) run every query
+through ``sync_to_async`` on one thread shared by the whole process, so
+concurrent async requests still wait on each other. :func:`run_sync` runs
+ORM work on the default executor's thread pool instead: each worker thread
+keeps its own connection, subject to ``CONN_MAX_AGE`` like a request
+thread, so queries of concurrent requests overlap, and :func:`gather` runs
+the independent queries of one request side by side.
+``ASYNC_PARALLEL_QUERIES = False`` sends the work to the shared thread
+instead. The test suite does this because its transactions belong to
+the test thread.
+"""
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_query_wrappers = ContextVar('query_wrappers', default=())
+
+
+def dispatch_query(execute, sql, params, many, context):
+    """The ``execute_wrapper`` every connection gets when it connects"""
+    for wrapper in reversed(_query_wrappers.get()):
+        execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_dispatch(connection):
+    if dispatch_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, dispatch_query)
+
+
+@contextmanager
+def wrap_queries(wrapper):
+    """Pass every query run in this context through ``wrapper``"""
+    token = _query_wrappers.set(_query_wrappers.get() + (wrapper,))
+    try:
+        yield
+    finally:
+        _query_wrappers.reset(token)
+
+
+def _call_in_worker(func):
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+async def run_sync(func, *args, **kwargs):
+    """Run the ORM work in ``func`` without blocking the event loop"""
+    func = partial(func, *args, **kwargs)
+    if not getattr(settings, 'ASYNC_PARALLEL_QUERIES', True):
+        return await sync_to_async(func)()
+    return await sync_to_async(_call_in_worker, thread_sensitive=False)(func)
+
+
+async def gather(*funcs):
+    """Run independent ORM calls concurrently; returns their results in order"""
+    return await asyncio.gather(*(run_sync(func) for func in funcs))
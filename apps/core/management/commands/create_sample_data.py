@@ -1,13 +1,26 @@
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
 from apps.projects.models import Project, DevelopmentTask, DesignTask
+from apps.projects.sample_data import generate_sample_data
 
 class Command(BaseCommand):
-    help = 'Create sample data for testing'
+    help = 'Create sample data for testing (pass --users/--projects/--tasks for a large data set)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, help='Number of users to generate')
+        parser.add_argument('--projects', type=int, help='Number of projects to generate')
+        parser.add_argument('--tasks', type=int, help='Number of tasks to generate')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (same seed, same data)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per transaction')
 
     def handle(self, *args, **options):
+        if any(options[name] is not None for name in ('users', 'projects', 'tasks')):
+            return self.handle_scale(**options)
+
         # Create users
         users = []
         for i in range(1, 6):
@@ -98,3 +111,28 @@ class Command(BaseCommand):
         self.stdout.write(
             self.style.SUCCESS('Successfully created sample data!')
         )
+
+    def handle_scale(self, **options):
+        users = 10 if options['users'] is None else options['users']
+        projects = 10 if options['projects'] is None else options['projects']
+        tasks = options['tasks'] or 0
+        if min(users, projects, tasks, options['batch_size']) < 0 or options['batch_size'] == 0:
+            raise CommandError('Counts must not be negative and --batch-size must be positive')
+        if (projects or tasks) and not users:
+            raise CommandError('Projects and tasks need at least one user')
+        if tasks and not projects:
+            raise CommandError('Tasks need at least one project')
+
+        started = time.perf_counter()
+        users, projects, tasks = generate_sample_data(
+            users, projects, tasks,
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Created {users} users, {projects} projects and {tasks} tasks '
+                f'in {time.perf_counter() - started:.1f}s'
+            )
+        )
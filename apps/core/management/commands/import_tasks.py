@@ -0,0 +1,61 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from apps.projects.importer import IMPORT_FORMATS, import_tasks, read_rows
+
+class Command(BaseCommand):
+    help = 'Import tasks from a CSV or NDJSON file (use - for stdin)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or - for stdin')
+        parser.add_argument(
+            '--format',
+            dest='import_format',
+            choices=IMPORT_FORMATS,
+            help='Input format (default: from the file extension, else csv)'
+        )
+        parser.add_argument(
+            '--created-by',
+            help='Username recorded as creator for rows without a created_by column'
+        )
+        parser.add_argument('--chunk-size', type=int, help='Rows per transaction')
+        parser.add_argument('--batch-size', type=int, help='Rows per INSERT statement')
+        parser.add_argument(
+            '--notify',
+            action='store_true',
+            help='Queue "new task" emails for imported tasks (off by default)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['import_format'] or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv')
+
+        created_by = None
+        if options['created_by']:
+            try:
+                created_by = User.objects.get(username=options['created_by'])
+            except User.DoesNotExist:
+                raise CommandError(f"Unknown user {options['created_by']!r}")
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            result = import_tasks(
+                read_rows(stream, import_format),
+                created_by=created_by,
+                chunk_size=options['chunk_size'],
+                batch_size=options['batch_size'],
+                notify=options['notify'],
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for number, message in result.errors:
+            self.stderr.write(f'Row {number}: {message}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {result.created} tasks in {result.seconds:.1f}s '
+                f'({result.rows_per_second:.0f} rows/s), skipped {len(result.errors)} rows'
+            )
+        )
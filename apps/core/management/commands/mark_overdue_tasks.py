@@ -6,20 +6,16 @@ class Command(BaseCommand):
     help = 'Mark overdue tasks and send notifications'
 
     def handle(self, *args, **options):
-        overdue_tasks = []
         current_time = timezone.now()
-        
-        for task in Task.objects.filter(is_active=True):
-            if task.is_overdue:
-                overdue_tasks.append(task)
+        overdue_tasks = Task.objects.filter(is_active=True).overdue().select_related('project')
         
         self.stdout.write(
             self.style.SUCCESS(
-                f'Found {len(overdue_tasks)} overdue tasks at {current_time}'
+                f'Found {overdue_tasks.count()} overdue tasks at {current_time}'
             )
         )
         
-        for task in overdue_tasks:
+        for task in overdue_tasks.iterator():
             self.stdout.write(
                 f'- {task.title} (Due: {task.due_date}, Project: {task.project.name})'
             )
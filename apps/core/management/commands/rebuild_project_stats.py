@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from apps.projects.stats import rebuild_project_stats
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized per-project task counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project',
+            type=int,
+            action='append',
+            dest='project_ids',
+            help='Only rebuild the given project id (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_project_stats(options['project_ids'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt stats for {written} projects')
+        )
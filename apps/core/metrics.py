@@ -0,0 +1,263 @@
+"""Request and Celery task metrics in the Prometheus text format.
+
+Request metrics are histograms kept in the memory of each web process:
+:class:`apps.core.middleware.PerformanceMiddleware` records every request's
+duration, SQL query count and time, serializer time and render time per
+route (the URL name, e.g. ``task-detail``). Each worker process serves its
+own, so scrape every process, or run one per container.
+
+Celery tasks run in worker processes, so their histograms are kept in the
+shared API cache instead (``CACHE_URL``; without it only tasks run in the
+serving process, e.g. eagerly, show up). ``/metrics`` renders both.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .cache import get_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TASK_LATENCY_BUCKETS = (0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+TASK_STATES = ('success', 'failure', 'retry')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values):
+    if not labelnames:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)) + '}'
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+class Histogram:
+    """A labelled histogram held in process memory"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._lock = threading.Lock()
+        # label values -> ([count per bucket], sum)
+        self._values = {}
+
+    def observe(self, value, *labels):
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts, total = self._values.get(labels) or ([0] * len(self.buckets), 0.0)
+            counts[index] += 1
+            self._values[labels] = (counts, total + value)
+
+    def collect(self):
+        """``{label values: ([count per bucket], sum)}``"""
+        with self._lock:
+            return {labels: (list(counts), total) for labels, (counts, total) in self._values.items()}
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total) in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames + ('le',), labels + (_format_bound(bound),))
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {total}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class SharedHistogram(Histogram):
+    """A histogram whose counts live in the shared cache.
+
+    Each observation costs two cache increments (its bucket and the sum, in
+    microunits). ``label_values`` returns the label tuples to read back when
+    rendering.
+    """
+
+    def __init__(self, name, documentation, labelnames, label_values, buckets):
+        super().__init__(name, documentation, labelnames, buckets)
+        self.label_values = label_values
+
+    def _key(self, labels, part):
+        return f'metrics:{self.name}:{":".join(str(value) for value in labels)}:{part}'
+
+    def observe(self, value, *labels):
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        cache = get_cache()
+        _incr(cache, self._key(labels, index), 1)
+        _incr(cache, self._key(labels, 'sum'), round(value * 1e6))
+
+    def collect(self):
+        label_sets = list(self.label_values())
+        parts = list(range(len(self.buckets))) + ['sum']
+        stored = get_cache().get_many([self._key(labels, part) for labels in label_sets for part in parts])
+        values = {}
+        for labels in label_sets:
+            counts = [stored.get(self._key(labels, index), 0) for index in range(len(self.buckets))]
+            if any(counts):
+                values[labels] = (counts, stored.get(self._key(labels, 'sum'), 0) / 1e6)
+        return values
+
+    def clear(self):
+        get_cache().delete_many([
+            self._key(labels, part)
+            for labels in self.label_values()
+            for part in list(range(len(self.buckets))) + ['sum']
+        ])
+
+
+def _incr(cache, key, delta):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def _task_names():
+    from project_task_manager.celery import app
+
+    return sorted(name for name in app.tasks if not name.startswith('celery.'))
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Time spent handling the request.',
+    ('route', 'method', 'status'),
+)
+REQUEST_SQL_QUERIES = Histogram(
+    'http_request_sql_queries', 'SQL queries run per request.',
+    ('route', 'method'), COUNT_BUCKETS,
+)
+REQUEST_SQL_DURATION = Histogram(
+    'http_request_sql_duration_seconds', 'Time spent in SQL per request.', ('route', 'method'),
+)
+REQUEST_SERIALIZER_DURATION = Histogram(
+    'http_request_serializer_duration_seconds', 'Time spent serializing objects per request.',
+    ('route', 'method'),
+)
+REQUEST_RENDER_DURATION = Histogram(
+    'http_request_render_duration_seconds', 'Time spent rendering the response body.',
+    ('route', 'method'),
+)
+TASK_DURATION = SharedHistogram(
+    'celery_task_duration_seconds', 'Celery task run time.', ('task', 'state'),
+    lambda: [(name, state) for name in _task_names() for state in TASK_STATES],
+    TASK_LATENCY_BUCKETS,
+)
+TASK_ROWS = SharedHistogram(
+    'celery_task_rows', 'Rows (tasks, emails, snapshots) processed per Celery task run.', ('task',),
+    lambda: [(name,) for name in _task_names()],
+    COUNT_BUCKETS + (5000, 10000, 100000),
+)
+
+REGISTRY = [
+    REQUEST_DURATION,
+    REQUEST_SQL_QUERIES,
+    REQUEST_SQL_DURATION,
+    REQUEST_SERIALIZER_DURATION,
+    REQUEST_RENDER_DURATION,
+    TASK_DURATION,
+    TASK_ROWS,
+]
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+class RequestTimings:
+    """Counters for the request being handled, filled by the hooks below"""
+
+    def __init__(self):
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.render_seconds = 0.0
+        self.serializer_depth = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_queries += 1
+            self.sql_seconds += time.perf_counter() - start
+
+
+_request_timings = ContextVar('request_timings', default=None)
+
+
+def start_request_timings():
+    timings = RequestTimings()
+    return timings, _request_timings.set(timings)
+
+
+def end_request_timings(token):
+    _request_timings.reset(token)
+
+
+@contextmanager
+def serializer_timer():
+    """Add the time spent in the block to the request's serializer time.
+
+    Nested serializers inside a timed block are not counted twice.
+    """
+    timings = _request_timings.get()
+    if timings is None or timings.serializer_depth:
+        yield
+        return
+    timings.serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serializer_seconds += time.perf_counter() - start
+        timings.serializer_depth -= 1
+
+
+# [start time, rows] of each Celery task running in this thread; eager
+# tasks can run inside other tasks
+_running_tasks = threading.local()
+
+
+def _task_stack():
+    if not hasattr(_running_tasks, 'stack'):
+        _running_tasks.stack = []
+    return _running_tasks.stack
+
+
+def count_task_rows(rows):
+    """Report how many rows the running Celery task processed"""
+    stack = _task_stack()
+    if stack:
+        stack[-1][1] = (stack[-1][1] or 0) + rows
+
+
+def start_task_timer():
+    _task_stack().append([time.perf_counter(), None])
+
+
+def stop_task_timer():
+    """``(seconds, rows)`` of the task that just ran; either may be ``None``"""
+    stack = _task_stack()
+    if not stack:
+        return None, None
+    started, rows = stack.pop()
+    return time.perf_counter() - started, rows
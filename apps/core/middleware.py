@@ -0,0 +1,91 @@
+"""Per-request performance instrumentation"""
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+
+from . import metrics
+from .db import wrap_queries
+
+
+def is_staff(request):
+    """Whether the request's user is staff, without loading a user that isn't loaded yet"""
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return False
+    return bool(user is not None and user.is_staff)
+
+
+class PerformanceMiddleware:
+    """Time SQL, serialization and rendering for every request.
+
+    The totals are added to the per-route histograms served on ``/metrics``
+    and sent back in a ``Server-Timing`` header that browser devtools
+    display: to every client with ``PERF_SERVER_TIMING`` (the default with
+    ``DEBUG``), otherwise to staff users only. Serializer time is
+    reported by ``DynamicFieldsMixin``; streamed bodies are produced after the
+    response leaves the middleware and are not included.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = metrics.start_request_timings()
+        request._perf_timings = timings
+        start = time.perf_counter()
+        try:
+            with wrap_queries(timings.sql_wrapper):
+                response = self.get_response(request)
+        finally:
+            metrics.end_request_timings(token)
+        return self.record(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings, token = metrics.start_request_timings()
+        request._perf_timings = timings
+        start = time.perf_counter()
+        try:
+            with wrap_queries(timings.sql_wrapper):
+                response = await self.get_response(request)
+        finally:
+            metrics.end_request_timings(token)
+        return self.record(request, response, timings, time.perf_counter() - start)
+
+    def record(self, request, response, timings, total):
+        match = request.resolver_match
+        route = (match.view_name or match.route) if match else 'unmatched'
+        method = request.method
+        metrics.REQUEST_DURATION.observe(total, route, method, response.status_code)
+        metrics.REQUEST_SQL_QUERIES.observe(timings.sql_queries, route, method)
+        metrics.REQUEST_SQL_DURATION.observe(timings.sql_seconds, route, method)
+        metrics.REQUEST_SERIALIZER_DURATION.observe(timings.serializer_seconds, route, method)
+        metrics.REQUEST_RENDER_DURATION.observe(timings.render_seconds, route, method)
+
+        if getattr(settings, 'PERF_SERVER_TIMING', False) or is_staff(request):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={timings.sql_seconds * 1000:.1f};desc="{timings.sql_queries} queries"',
+                f'serialize;dur={timings.serializer_seconds * 1000:.1f}',
+                f'render;dur={timings.render_seconds * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ])
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns
+        timings = request._perf_timings
+        start = time.perf_counter()
+
+        def rendered(response):
+            timings.render_seconds += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:49
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='Watermark',
+        ),
+    ]
@@ -0,0 +1,173 @@
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from itertools import chain
+import logging
+
+logger = logging.getLogger(__name__)
+
+def task_assigned_email(task, connection=None):
+    """Build the 'new task assigned' email for a task"""
+    user = task.assigned_to
+    subject = f'New Task Assigned: {task.title}'
+    message = f"""
+Hi {user.first_name or user.username},
+
+You have been assigned a new task:
+
+Task: {task.title}
+Project: {task.project.name}
+Due Date: {task.due_date.strftime('%Y-%m-%d %H:%M')}
+Priority: {task.get_priority_display()}
+
+Please log in to view more details.
+
+Best regards,
+Project Management Team
+"""
+    return EmailMessage(
+        subject,
+        message,
+        getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'),
+        [user.email],
+        connection=connection,
+    )
+
+def task_overdue_email(task, connection=None):
+    """Build the 'task overdue' email for a task"""
+    user = task.assigned_to
+    subject = f'Overdue Task: {task.title}'
+    message = f"""
+Hi {user.first_name or user.username},
+
+The following task is overdue:
+
+Task: {task.title}
+Project: {task.project.name}
+Due Date: {task.due_date.strftime('%Y-%m-%d %H:%M')}
+Priority: {task.get_priority_display()}
+
+Please update the task status or contact your project manager.
+
+Best regards,
+Project Management Team
+"""
+    return EmailMessage(
+        subject,
+        message,
+        getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'),
+        [user.email],
+        connection=connection,
+    )
+
+def daily_summary_email(row, connection=None):
+    """Build the daily summary email from a ``send_daily_summary`` aggregate row"""
+    subject = 'Daily Task Summary'
+    message = f"""
+Hi {row['first_name'] or row['username']},
+
+Your daily task summary:
+- Overdue tasks: {row['overdue']}
+- Tasks due today: {row['due_today']}
+- Total active tasks: {row['total']}
+
+Please check your dashboard for details.
+
+Best regards,
+Project Management Team
+"""
+    return EmailMessage(
+        subject,
+        message,
+        getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'),
+        [row['email']],
+        connection=connection,
+    )
+
+def send_messages(messages):
+    """Send ``(key, message)`` pairs over one connection.
+
+    ``messages`` may be any iterable, so callers can stream them. Returns
+    ``(sent, failed_keys)``; a message that fails doesn't stop the rest of the
+    batch, and if the connection can't be opened every key fails.
+    """
+    messages = iter(messages)
+    first = next(messages, None)
+    if first is None:
+        return 0, []
+    messages = chain([first], messages)
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.error(f"Could not open mail connection: {str(e)}")
+        return 0, [key for key, _ in messages]
+    sent, failed = 0, []
+    try:
+        for key, message in messages:
+            message.connection = connection
+            try:
+                sent += message.send(fail_silently=False)
+            except Exception as e:
+                logger.error(f"Failed to send notification {key}: {str(e)}")
+                failed.append(key)
+    finally:
+        connection.close()
+    return sent, failed
+
+def deliver_task_created_notifications(task_ids):
+    """Email the assignees of the given tasks over one mail connection.
+
+    Returns ``(sent, failed_task_ids)``.
+    """
+    from apps.projects.models import Task
+
+    tasks = (
+        Task.objects.filter(pk__in=task_ids, assigned_to__isnull=False)
+        .exclude(assigned_to__email='')
+        .select_related('assigned_to', 'project')
+    )
+    sent, failed = send_messages([(task.pk, task_assigned_email(task)) for task in tasks])
+    logger.info(f"Sent {sent} task notifications, {len(failed)} failed")
+    return sent, failed
+
+def deliver_overdue_notifications(task_ids):
+    """Email the assignees of the given overdue tasks over one mail connection.
+
+    Returns ``(sent, failed_task_ids)``.
+    """
+    from apps.projects.models import Task
+
+    tasks = (
+        Task.objects.filter(pk__in=task_ids, assigned_to__isnull=False)
+        .exclude(assigned_to__email='')
+        .select_related('assigned_to', 'project')
+    )
+    sent, failed = send_messages([(task.pk, task_overdue_email(task)) for task in tasks])
+    logger.info(f"Sent {sent} overdue notifications, {len(failed)} failed")
+    return sent, failed
+
+def queue_task_created_notifications(task_ids, using=None):
+    """Send 'new task' emails once the current transaction commits.
+
+    Delivery happens in a Celery task so SMTP latency never holds the request
+    or its database locks, and a rolled back transaction sends nothing. With
+    ``TASK_NOTIFICATIONS_SYNC`` (used by the test suite) the emails are sent
+    immediately in-process instead.
+    """
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    if getattr(settings, 'TASK_NOTIFICATIONS_SYNC', False):
+        deliver_task_created_notifications(task_ids)
+        return
+
+    from apps.projects.tasks import send_task_created_notifications
+
+    batch_size = getattr(settings, 'TASK_NOTIFICATIONS_BATCH_SIZE', 100)
+
+    def dispatch():
+        for start in range(0, len(task_ids), batch_size):
+            send_task_created_notifications.delay(task_ids[start:start + batch_size])
+
+    transaction.on_commit(dispatch, using=using)
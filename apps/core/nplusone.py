@@ -0,0 +1,128 @@
+"""Detection of repeated queries (N+1 patterns) within one request.
+
+Every ``SELECT`` is reduced to its shape: parameters are already
+placeholders, and ``IN (...)`` lists of any length look the same. When one
+shape runs ``NPLUSONE_THRESHOLD`` times or more in a single request, the
+request most likely touches a relation once per row. ``NPLUSONE_MODE``
+decides what happens then: ``'log'`` (default with ``DEBUG``) logs a warning
+naming the code that ran the query, ``'raise'`` (used by the test suite)
+raises :class:`NPlusOneError`, and ``''`` turns detection off.
+"""
+import logging
+import os
+import re
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .db import wrap_queries
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)', re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_WHITESPACE = re.compile(r'\s+')
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def query_shape(sql):
+    """``sql`` with literals and ``IN`` list lengths normalized away"""
+    sql = _WHITESPACE.sub(' ', sql.strip())
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _LITERAL.sub('?', sql)
+
+
+def _caller():
+    """The innermost project frame outside this module, as ``path:line in func``"""
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        if frame.filename.startswith(_PROJECT_ROOT) and frame.filename != __file__:
+            return f'{os.path.relpath(frame.filename, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+class QueryRecorder:
+    """``execute_wrapper`` that counts ``SELECT`` shapes"""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.shapes = Counter()
+        self.callers = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip()[:6].upper() == 'SELECT':
+            shape = query_shape(sql)
+            self.shapes[shape] += 1
+            # Only look up the caller once the shape repeats
+            if self.shapes[shape] == 2:
+                self.callers[shape] = _caller()
+        return execute(sql, params, many, context)
+
+    def repeated(self):
+        """``[(shape, count, caller)]`` for shapes at or above the threshold"""
+        return [
+            (shape, count, self.callers.get(shape, 'unknown'))
+            for shape, count in self.shapes.most_common()
+            if count >= self.threshold
+        ]
+
+
+def get_mode():
+    return getattr(settings, 'NPLUSONE_MODE', '')
+
+
+def get_threshold():
+    return getattr(settings, 'NPLUSONE_THRESHOLD', 5)
+
+
+def report(repeated, label, mode=None):
+    mode = get_mode() if mode is None else mode
+    if not repeated or not mode:
+        return
+    lines = [f'{count}x from {caller}: {shape[:300]}' for shape, count, caller in repeated]
+    message = f'Repeated queries in {label}:\n  ' + '\n  '.join(lines)
+    if mode == 'raise':
+        raise NPlusOneError(message)
+    logger.warning(message)
+
+
+@contextmanager
+def detect_nplusone(label='block', threshold=None, mode=None):
+    """Record the queries run in the block and report repeated shapes"""
+    recorder = QueryRecorder(get_threshold() if threshold is None else threshold)
+    with wrap_queries(recorder):
+        yield recorder
+    report(recorder.repeated(), label, mode)
+
+
+class NPlusOneMiddleware:
+    """Run :func:`detect_nplusone` around every request when enabled"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not get_mode():
+            return self.get_response(request)
+        with detect_nplusone(f'{request.method} {request.path}'):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not get_mode():
+            return await self.get_response(request)
+        with detect_nplusone(f'{request.method} {request.path}'):
+            return await self.get_response(request)
@@ -0,0 +1,150 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Keyset (seek) pagination on the view's ordering plus ``id``.
+
+    Each page is fetched with ``WHERE (ordering..., id) > last row`` instead of
+    an ``OFFSET``, and no ``COUNT(*)`` is run, so deep pages cost the same as
+    the first one. The ordering comes from the ``OrderingFilter`` (or the
+    view's default ``ordering``) and must only use plain, non-null model
+    fields; ``id`` is appended as a tie-breaker in the direction of the first
+    ordering field.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset, view)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering
+        ]
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+        queryset = queryset.order_by(*self.ordering)
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = self.position_of(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_ordering(self, queryset, view):
+        ordering = [
+            name for name in queryset.query.order_by
+            if isinstance(name, str) and self.is_keyset_field(queryset.model, name)
+        ]
+        if not ordering or len(ordering) != len(queryset.query.order_by):
+            ordering = list(getattr(view, 'ordering', None) or ['-created_at'])
+        pk_name = queryset.model._meta.pk.attname
+        if ordering[-1].lstrip('-') not in ('pk', 'id', pk_name):
+            descending = ordering[0].startswith('-')
+            ordering.append(f'-{pk_name}' if descending else pk_name)
+        return ordering
+
+    def is_keyset_field(self, model, name):
+        try:
+            field = model._meta.get_field(name.lstrip('-'))
+        except FieldDoesNotExist:
+            return False
+        return field.concrete and not field.is_relation and not field.null
+
+    def seek_filter(self, position):
+        """``(f1, f2, ...) > (v1, v2, ...)`` honouring each field's direction"""
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            step = Q(**{
+                other.lstrip('-'): position[i]
+                for i, other in enumerate(self.ordering[:index])
+            })
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            step &= Q(**{f'{name.lstrip("-")}__{lookup}': position[index]})
+            condition |= step
+        return condition
+
+    def position_of(self, obj):
+        return [field.value_from_object(obj) for field in self.fields]
+
+    def encode_cursor(self, position):
+        payload = {
+            'o': self.ordering,
+            'p': [_serialize(value) for value in position],
+        }
+        data = json.dumps(payload, separators=(',', ':')).encode('ascii')
+        return base64.urlsafe_b64encode(data).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if payload['o'] != self.ordering or len(payload['p']) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(self.fields, payload['p'])]
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+
+def _serialize(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """Page-number pagination with per-request opt-in keyset pagination.
+
+    Passing ``?cursor=`` (empty for the first page) switches the request to
+    :class:`KeysetPagination`; follow the returned ``next`` link from there.
+    """
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,213 @@
+"""Read replicas with read-your-writes.
+
+:class:`ReplicaRouter` sends every write to ``default`` and reads to one of
+the aliases in ``DATABASE_REPLICAS``, picked once per request or Celery
+task so its reads see one consistent replica. Reads stay on the primary:
+
+* outside a request or task, e.g. in management commands, which often
+  recompute what they have read and write it back;
+
+* inside a transaction on the primary;
+* for the whole of a request with a non-safe method, so the rows it
+  updates are never loaded stale and written back;
+* for the rest of a request or task once it has written;
+* for ``REPLICA_PIN_SECONDS`` after a client's last write.
+  :class:`ReplicaPinningMiddleware` sets a cookie on the response and
+  remembers the authenticated user in the shared cache, since token
+  clients usually drop cookies.
+
+:func:`read_from` sends the reads of a block to one database, whatever the
+rules above say; :func:`reporting` uses ``REPORTING_DATABASE`` for heavy
+reporting work. Without ``DATABASE_REPLICAS`` everything reads from
+``default``.
+"""
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import get_cache
+
+_state = ContextVar('replica_state', default=None)
+_read_alias = ContextVar('replica_read_alias', default=None)
+_local = threading.local()
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+def get_pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+
+
+def pin_key(user_id):
+    return f'db-pin:user:{user_id}'
+
+
+def resolved_user_id(request):
+    """The authenticated user's id, without loading a user that isn't loaded yet"""
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+class RoutingState:
+    """What one request or task has done so far"""
+
+    def __init__(self, request=None, pinned=False):
+        self.request = request
+        self.pinned = pinned
+        self.user_checked = False
+        self.wrote = False
+        self.replica = None
+        self.read_replica = False
+
+    def use_primary(self):
+        if self.wrote or self.pinned:
+            return True
+        if not self.user_checked and self.request is not None:
+            # Token authentication runs inside the view, so look again until it has
+            user_id = resolved_user_id(self.request)
+            if user_id is not None:
+                self.user_checked = True
+                self.pinned = bool(get_cache().get(pin_key(user_id)))
+        return self.pinned
+
+    def pick_replica(self, replicas):
+        if self.replica not in replicas:
+            self.replica = random.choice(replicas)
+        self.read_replica = True
+        return self.replica
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias:
+            return alias
+        replicas = get_replicas()
+        if not replicas or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        state = _state.get()
+        if state is None or state.use_primary():
+            return DEFAULT_DB_ALIAS
+        return state.pick_replica(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas(), getattr(settings, 'REPORTING_DATABASE', None)}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+@contextmanager
+def read_from(alias):
+    """Send every read in this context to ``alias``; ``None`` routes as usual"""
+    token = _read_alias.set(alias or _read_alias.get())
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def use_primary():
+    return read_from(DEFAULT_DB_ALIAS)
+
+
+def reporting():
+    """Read from ``REPORTING_DATABASE`` when one is configured"""
+    return read_from(getattr(settings, 'REPORTING_DATABASE', None))
+
+
+def cache_timeout(timeout, modified):
+    """``timeout`` for data read in this context after the write at ``modified``.
+
+    A replica may not have caught up with a write less than
+    ``REPLICA_PIN_SECONDS`` old, so such data is kept only until it is older.
+    """
+    state = _state.get()
+    if state is None or not state.read_replica:
+        return timeout
+    remaining = get_pin_seconds() - (time.time() - modified)
+    if remaining <= 0:
+        return timeout
+    return math.ceil(remaining) if timeout is None else min(timeout, math.ceil(remaining))
+
+
+def start_task():
+    """Route the reads of a Celery task on their own"""
+    _local.__dict__.setdefault('tokens', []).append(_state.set(RoutingState()))
+
+
+def end_task():
+    tokens = getattr(_local, 'tokens', None)
+    if tokens:
+        _state.reset(tokens.pop())
+
+
+class ReplicaPinningMiddleware:
+    """Keep clients that just wrote on the primary"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not get_replicas():
+            return self.get_response(request)
+        state = self.get_state(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(request, response, state)
+
+    async def __acall__(self, request):
+        if not get_replicas():
+            return await self.get_response(request)
+        state = self.get_state(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(request, response, state)
+
+    def get_cookie_name(self):
+        return getattr(settings, 'REPLICA_PIN_COOKIE', 'db_pin')
+
+    def get_state(self, request):
+        pinned = request.method not in SAFE_METHODS or self.get_cookie_name() in request.COOKIES
+        return RoutingState(request, pinned=pinned)
+
+    def pin(self, request, response, state):
+        if state.wrote:
+            seconds = get_pin_seconds()
+            response.set_cookie(self.get_cookie_name(), '1', max_age=seconds, httponly=True, samesite='Lax')
+            user_id = resolved_user_id(request)
+            if user_id is not None:
+                get_cache().set(pin_key(user_id), 1, seconds)
+        return response
@@ -1,65 +1,153 @@
-from django.db.models.signals import post_save, pre_delete
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_migrate, post_save, post_delete, pre_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.conf import settings
+from celery.signals import task_postrun, task_prerun
+from apps.core import metrics, replicas
+from apps.core.db import install_query_dispatch
+from apps.core.cache import GLOBAL_SCOPE, bump_versions, project_scopes, user_scope
+from apps.core.notifications import queue_task_created_notifications
 import logging
-import sys
 
 # Import the actual model classes
-from apps.projects.models import Task, DevelopmentTask, DesignTask, Project
+from apps.projects.models import Task, DevelopmentTask, DesignTask, Project, ProjectStats
+from apps.projects import history, stats
+from apps.projects.search import repair_search_index
 
 logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender='projects.DevelopmentTask')  # String reference
 @receiver(post_save, sender='projects.DesignTask')       # String reference
 @receiver(post_save, sender='projects.Task')            # Use actual model class
-def task_created_notification(sender, instance, created, **kwargs):
-    """Send notification when a task is created"""
-    print(f"🔥 Signal fired! Task: {instance.title}, Created: {created}")
-    
-    if not created:
-        print("❌ Task was updated, not created. No email sent.")
+def task_created_notification(sender, instance, created, using, raw=False, **kwargs):
+    """Queue the assignment email when a task is created"""
+    if created and not raw and instance.assigned_to_id:
+        queue_task_created_notifications([instance.pk], using=using)
+
+@receiver(post_save, sender='projects.DevelopmentTask')
+@receiver(post_save, sender='projects.DesignTask')
+@receiver(post_save, sender='projects.Task')
+def update_project_stats_on_save(sender, instance, created, using, raw=False, **kwargs):
+    """Apply the task's change to its project's denormalized counters"""
+    if raw:
+        return
+    old_state = None if created else instance.loaded_state
+    deltas = stats.add_delta(stats.new_deltas(), old_state, stats.task_state(instance))
+    stats.apply_deltas(deltas, using=using)
+
+@receiver(post_save, sender='projects.DevelopmentTask')
+@receiver(post_save, sender='projects.DesignTask')
+@receiver(post_save, sender='projects.Task')
+def record_task_status_change(sender, instance, created, using, raw=False, **kwargs):
+    """Append a status history event when a task is created or changes status"""
+    if raw:
         return
-        
-    if not (instance.assigned_to and instance.assigned_to.email):
-        print("❌ No assigned user or email. No email sent.")
+    old_state = None if created else instance.loaded_state
+    user_id = instance.created_by_id if created else instance.updated_by_id
+    event = history.status_event(instance.pk, old_state, stats.task_state(instance), user_id)
+    history.record_events([event], using=using)
+
+@receiver(post_delete, sender='projects.DevelopmentTask')
+@receiver(post_delete, sender='projects.DesignTask')
+@receiver(post_delete, sender='projects.Task')
+def update_project_stats_on_delete(sender, instance, using, **kwargs):
+    """Remove a deleted task from its project's counters.
+
+    Tasks deleted along with their project are skipped: the stats row goes
+    with the project.
+    """
+    if isinstance(kwargs.get('origin'), Project):
         return
-        
-    subject = f'New Task Assigned: {instance.title}'
-    message = f"""
-Hi {instance.assigned_to.first_name or instance.assigned_to.username},
-
-You have been assigned a new task:
-
-Task: {instance.title}
-Project: {instance.project.name}
-Due Date: {instance.due_date.strftime('%Y-%m-%d %H:%M')}
-Priority: {instance.get_priority_display()}
-
-Please log in to view more details.
-
-Best regards,
-Project Management Team
-"""
-    
-    try:
-        send_mail(
-            subject,
-            message,
-            getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'),
-            [instance.assigned_to.email],
-            fail_silently=False,
-        )
-        print(f"✅ Email sent to {instance.assigned_to.email}")
-        logger.info(f"Task notification sent to {instance.assigned_to.email}")
-    except Exception as e:
-        print(f"❌ Email failed: {str(e)}")
-        logger.error(f"Failed to send task notification: {str(e)}")
-        if 'test' in sys.argv:
-            raise
+    old_state = instance.loaded_state or stats.task_state(instance)
+    deltas = stats.add_delta(stats.new_deltas(), old_state, None)
+    stats.apply_deltas(deltas, using=using, create_missing=False)
+
+@receiver(post_save, sender=Project)
+def create_project_stats(sender, instance, created, using, raw=False, **kwargs):
+    """Every project starts with an empty stats record"""
+    if created and not raw:
+        ProjectStats.objects.using(using).get_or_create(project=instance)
 
 @receiver(pre_delete, sender=Project)
 def cascade_delete_project_tasks(sender, instance, **kwargs):
     """Log cascade deletion of project tasks"""
     task_count = instance.tasks.count()
     logger.info(f"Project '{instance.name}' deleted. {task_count} tasks will be cascade deleted.")
+
+@receiver(post_save, sender='projects.DevelopmentTask')
+@receiver(post_save, sender='projects.DesignTask')
+@receiver(post_save, sender='projects.Task')
+@receiver(post_delete, sender='projects.DevelopmentTask')
+@receiver(post_delete, sender='projects.DesignTask')
+@receiver(post_delete, sender='projects.Task')
+def invalidate_task_responses(sender, instance, using, raw=False, **kwargs):
+    """Bump the cache versions of the task's project, old and new"""
+    if raw:
+        return
+    project_ids = {instance.project_id}
+    if instance.loaded_state:
+        project_ids.add(instance.loaded_state['project_id'])
+    bump_versions(project_scopes(project_ids), using=using)
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project_responses(sender, instance, using, raw=False, **kwargs):
+    """Bump the cache versions of a written or deleted project"""
+    if not raw:
+        bump_versions(project_scopes([instance.pk]), using=using)
+
+@receiver(m2m_changed, sender=Project.assigned_to.through)
+def invalidate_project_members(sender, instance, action, reverse, pk_set, using, **kwargs):
+    """Project membership is rendered with the project"""
+    if not reverse:
+        if action.startswith('post_'):
+            bump_versions(project_scopes([instance.pk]), using=using)
+    elif action in ('post_add', 'post_remove'):
+        bump_versions(project_scopes(pk_set), using=using)
+    elif action == 'pre_clear':
+        # The user's projects are only known before the clear
+        project_ids = list(instance.assigned_projects.values_list('pk', flat=True))
+        bump_versions(project_scopes(project_ids), using=using)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_responses(sender, instance, using, raw=False, update_fields=None, **kwargs):
+    """Users are nested into project and task responses and cached for authentication"""
+    if raw or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    bump_versions([GLOBAL_SCOPE, user_scope(instance.pk)], using=using)
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    """Table rebuilds during migrate drop the SQLite search triggers"""
+    if sender.name == 'apps.projects':
+        repair_search_index(connections[using])
+
+@receiver(connection_created)
+def route_queries_through_request_wrappers(sender, connection, **kwargs):
+    """Lets apps.core.db.wrap_queries() see queries on every connection"""
+    install_query_dispatch(connection)
+
+@task_prerun.connect
+def start_celery_task_timer(**kwargs):
+    metrics.start_task_timer()
+
+@task_prerun.connect
+def start_celery_task_routing(**kwargs):
+    """A task that writes reads its own writes from the primary"""
+    replicas.start_task()
+
+@task_postrun.connect
+def end_celery_task_routing(**kwargs):
+    replicas.end_task()
+
+@task_postrun.connect
+def record_celery_task_metrics(sender=None, state=None, **kwargs):
+    """Export the task's run time and the rows it reported on /metrics"""
+    seconds, rows = metrics.stop_task_timer()
+    if seconds is None or sender is None:
+        return
+    metrics.TASK_DURATION.observe(seconds, sender.name, (state or 'success').lower())
+    if rows is not None:
+        metrics.TASK_ROWS.observe(rows, sender.name)
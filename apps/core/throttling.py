@@ -0,0 +1,112 @@
+"""Token-bucket throttling backed by the shared API cache.
+
+Every client owns one bucket per scope: authenticated users are keyed by
+id under ``user``, everyone else by address under ``anon``. A bucket holds
+as many tokens as its rate allows per period (``THROTTLE_RATES``, e.g.
+``'600/min'``) and refills continuously. Each request takes the cost of its
+route from ``THROTTLE_COSTS`` (URL name -> tokens, default 1), so expensive
+endpoints drain the bucket faster. Viewset routes not listed by URL name
+fall back to their action name, so one ``'bulk_create'`` entry prices the
+action on every viewset that has it. Rejected requests get ``429`` with a
+``Retry-After`` header.
+
+A bucket is stored as one number, the time at which it will be full again
+(the "generic cell rate algorithm"). On Redis the check and the update run
+as one Lua script, a single round trip. Other backends fall back to
+``get``/``set`` under a process lock, which is exact for the local-memory
+cache and close enough elsewhere.
+"""
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from .cache import get_cache
+
+DEFAULT_RATES = {'user': '600/min', 'anon': '60/min'}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# KEYS[1]: bucket; ARGV: capacity and cost, both in seconds of refill.
+# Returns 0 when allowed, else the seconds to wait (as a string).
+_GCRA_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or 0), now)
+local new_tat = tat + tonumber(ARGV[2])
+local wait = new_tat - tonumber(ARGV[1]) - now
+if wait > 0 then
+    return tostring(wait)
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return 0
+"""
+
+_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """``'600/min'`` -> ``(600, 60)``"""
+    tokens, period = rate.split('/')
+    return int(tokens), PERIODS[period[0]]
+
+
+def get_cost(request, view=None):
+    match = request.resolver_match
+    costs = getattr(settings, 'THROTTLE_COSTS', {})
+    if match and match.view_name in costs:
+        return costs[match.view_name]
+    return costs.get(getattr(view, 'action', None), 1)
+
+
+def consume(key, tokens, period, cost):
+    """Take ``cost`` tokens from the bucket at ``key``.
+
+    Returns ``0`` when they were taken, otherwise the seconds until the
+    bucket holds enough.
+    """
+    interval = period / tokens
+    # A full bucket is ``period`` seconds of tokens; never ask for more, or
+    # an expensive request could not pass at all
+    capacity = period
+    cost = interval * min(cost, tokens)
+    cache = get_cache()
+    client = getattr(cache, '_cache', None)
+    if hasattr(client, 'get_client'):
+        redis = client.get_client(key, write=True)
+        wait = redis.eval(_GCRA_SCRIPT, 1, cache.make_and_validate_key(key), capacity, cost)
+        return float(wait)
+
+    with _lock:
+        now = time.time()
+        tat = max(cache.get(key) or 0, now)
+        new_tat = tat + cost
+        wait = new_tat - capacity - now
+        if wait > 0:
+            return wait
+        cache.set(key, new_tat, new_tat - now)
+        return 0
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttle requests by the cost-weighted token bucket of their client"""
+
+    def get_scope(self, request):
+        return 'user' if request.user and request.user.is_authenticated else 'anon'
+
+    def get_cache_key(self, request, scope):
+        ident = request.user.pk if scope == 'user' else self.get_ident(request)
+        return f'throttle:{scope}:{ident}'
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request)
+        rate = getattr(settings, 'THROTTLE_RATES', DEFAULT_RATES).get(scope)
+        if not rate:
+            return True
+        tokens, period = parse_rate(rate)
+        self.wait_seconds = consume(self.get_cache_key(request, scope), tokens, period, get_cost(request, view))
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from .metrics import render_metrics
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; requires ``Bearer <METRICS_TOKEN>``, or ``DEBUG`` when no token is set"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token and not settings.DEBUG:
+        return HttpResponse('Forbidden: set METRICS_TOKEN\n', status=403, content_type='text/plain')
+    if token:
+        header = request.headers.get('Authorization', '')
+        if not constant_time_compare(header, f'Bearer {token}'):
+            return HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,29 +1,45 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from django.db.models import Count
+from apps.core.cache import bump_versions, project_scopes
 from .models import Project, Task, DevelopmentTask, DesignTask
+from .search import FullTextSearchAdminMixin
+from .bulk import transition_tasks
 
-class TaskInline(admin.TabularInline):
+class BaseTaskInline(admin.TabularInline):
+    """Task rows that share their lookups instead of querying once per row"""
+
+    def get_queryset(self, request):
+        # Each row is labelled with str(task), which includes the project
+        return super().get_queryset(request).select_related('project')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'assigned_to' and formfield is not None:
+            # Every row renders the same user list; build it once
+            formfield.choices = list(formfield.choices)
+        return formfield
+
+class TaskInline(BaseTaskInline):
     """Inline editing for tasks"""
     model = Task
     extra = 0
     fields = ['title', 'status', 'priority', 'assigned_to', 'due_date']
     readonly_fields = ['created_at']
     
-class DevelopmentTaskInline(admin.TabularInline):
+class DevelopmentTaskInline(BaseTaskInline):
     """Inline editing for development tasks"""
     model = DevelopmentTask
     extra = 0
     fields = ['title', 'status', 'priority', 'assigned_to', 'due_date', 'technology']
 
-class DesignTaskInline(admin.TabularInline):
+class DesignTaskInline(BaseTaskInline):
     """Inline editing for design tasks"""
     model = DesignTask
     extra = 0
     fields = ['title', 'status', 'priority', 'assigned_to', 'due_date', 'design_type']
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     """Enhanced Project Admin"""
     list_display = [
         'name', 'status', 'start_date', 'end_date', 
@@ -57,45 +73,52 @@ class ProjectAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        return queryset.annotate(task_count=Count('tasks'))
+        return queryset.with_overdue_flag().select_related('stats')
     
     def task_count(self, obj):
-        return obj.task_count
-    task_count.admin_order_field = 'task_count'
+        return obj.task_stats.total_tasks
+    task_count.admin_order_field = 'stats__total_tasks'
     task_count.short_description = 'Tasks'
     
     def progress_display(self, obj):
         progress = obj.progress_percentage
         color = 'green' if progress >= 80 else 'orange' if progress >= 50 else 'red'
         return format_html(
-            '<span style="color: {};">{:.1f}%</span>',
-            color, progress
+            '<span style="color: {};">{}%</span>',
+            color, f'{progress:.1f}'
         )
     progress_display.short_description = 'Progress'
     
     def overdue_status(self, obj):
-        if obj.is_overdue:
+        if obj.overdue_flag:
             return format_html('<span style="color: red;">Overdue</span>')
         return format_html('<span style="color: green;">On Time</span>')
+    overdue_status.admin_order_field = 'overdue_flag'
     overdue_status.short_description = 'Status'
     
     def mark_completed(self, request, queryset):
-        queryset.update(status=Project.StatusChoices.COMPLETED)
-        self.message_user(request, f"{queryset.count()} projects marked as completed.")
+        project_ids = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status=Project.StatusChoices.COMPLETED)
+        bump_versions(project_scopes(project_ids))
+        self.message_user(request, f"{updated} projects marked as completed.")
     mark_completed.short_description = "Mark selected projects as completed"
     
     def mark_on_hold(self, request, queryset):
-        queryset.update(status=Project.StatusChoices.ON_HOLD)
-        self.message_user(request, f"{queryset.count()} projects marked as on hold.")
+        project_ids = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status=Project.StatusChoices.ON_HOLD)
+        bump_versions(project_scopes(project_ids))
+        self.message_user(request, f"{updated} projects marked as on hold.")
     mark_on_hold.short_description = "Mark selected projects as on hold"
     
     def mark_in_progress(self, request, queryset):
-        queryset.update(status=Project.StatusChoices.IN_PROGRESS)
-        self.message_user(request, f"{queryset.count()} projects marked as in progress.")
+        project_ids = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status=Project.StatusChoices.IN_PROGRESS)
+        bump_versions(project_scopes(project_ids))
+        self.message_user(request, f"{updated} projects marked as in progress.")
     mark_in_progress.short_description = "Mark selected projects as in progress"
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     """Base Task Admin"""
     list_display = [
         'title', 'project', 'status', 'priority', 
@@ -104,6 +127,7 @@ class TaskAdmin(admin.ModelAdmin):
     list_filter = ['status', 'priority', 'project', 'assigned_to', 'created_at']
     search_fields = ['title', 'description', 'project__name']
     date_hierarchy = 'due_date'
+    list_select_related = ['project', 'assigned_to']
     readonly_fields = ['created_at', 'updated_at', 'created_by', 'updated_by']
     
     fieldsets = (
@@ -123,26 +147,30 @@ class TaskAdmin(admin.ModelAdmin):
     )
     
     actions = ['mark_completed', 'mark_in_progress', 'mark_blocked']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_overdue_flag()
     
     def overdue_status(self, obj):
-        if obj.is_overdue:
+        if obj.overdue_flag:
             return format_html('<span style="color: red;">Overdue</span>')
         return format_html('<span style="color: green;">On Time</span>')
+    overdue_status.admin_order_field = 'overdue_flag'
     overdue_status.short_description = 'Status'
     
     def mark_completed(self, request, queryset):
-        queryset.update(status=Task.StatusChoices.COMPLETED)
-        self.message_user(request, f"{queryset.count()} tasks marked as completed.")
+        updated = transition_tasks(queryset, Task.StatusChoices.COMPLETED, request.user)
+        self.message_user(request, f"{len(updated)} tasks marked as completed.")
     mark_completed.short_description = "Mark selected tasks as completed"
     
     def mark_in_progress(self, request, queryset):
-        queryset.update(status=Task.StatusChoices.IN_PROGRESS)
-        self.message_user(request, f"{queryset.count()} tasks marked as in progress.")
+        updated = transition_tasks(queryset, Task.StatusChoices.IN_PROGRESS, request.user)
+        self.message_user(request, f"{len(updated)} tasks marked as in progress.")
     mark_in_progress.short_description = "Mark selected tasks as in progress"
     
     def mark_blocked(self, request, queryset):
-        queryset.update(status=Task.StatusChoices.BLOCKED)
-        self.message_user(request, f"{queryset.count()} tasks marked as blocked.")
+        updated = transition_tasks(queryset, Task.StatusChoices.BLOCKED, request.user)
+        self.message_user(request, f"{len(updated)} tasks marked as blocked.")
     mark_blocked.short_description = "Mark selected tasks as blocked"
 
 @admin.register(DevelopmentTask)
@@ -0,0 +1,159 @@
+"""Native async versions of the read-heavy endpoints, under ``/api/async/``.
+
+Each endpoint drives the matching viewset, so authentication, permissions,
+throttling, filters, ``?fields=``/``?expand=``, serializers and the response
+cache (with ``ETag``/``Last-Modified``) behave as on ``/api/``. The queries
+run through :func:`apps.core.db.run_sync`, so a request waiting on the
+database holds no thread under ASGI. A list page and its count are
+independent and are fetched concurrently. Responses are always JSON.
+"""
+from functools import wraps
+
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse
+from rest_framework.exceptions import MethodNotAllowed, NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from apps.core.db import gather, run_sync
+from apps.core.pagination import KeysetPagination
+
+from .models import resolve_task_subtypes
+from .views import ProjectViewSet, TaskViewSet, count_overdue, summarize_tasks
+
+
+def async_endpoint(viewset_class, action, detail=False, cached=False, queryset=None):
+    """Serve ``handler(view, request, queryset)`` as the viewset's ``action``.
+
+    The sync preliminaries (``APIView.initial()``, the cache lookup when
+    ``cached`` and building ``queryset(view)``) run in one :func:`run_sync`
+    call; the handler awaits its own queries and returns the response data.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        async def view(request, **kwargs):
+            viewset = viewset_class(
+                action_map={'get': action, 'head': action}, detail=detail,
+                renderer_classes=[JSONRenderer],
+            )
+            viewset.args = ()
+            viewset.kwargs = kwargs
+            viewset.headers = viewset.default_response_headers
+            request = viewset.initialize_request(request, **kwargs)
+            viewset.request = request
+
+            def prepare():
+                viewset.initial(request)
+                response, key, validators = viewset.cache_lookup(request) if cached else (None, None, None)
+                if response is not None:
+                    return response, key, validators, None
+                return None, key, validators, queryset(viewset) if queryset else None
+
+            try:
+                if viewset.action is None:
+                    raise MethodNotAllowed(request.method)
+                response, key, validators, rows = await run_sync(prepare)
+                if response is None:
+                    response = Response(await handler(viewset, request, rows))
+                    if cached:
+                        await run_sync(viewset.cache_store, key, response)
+                if cached:
+                    viewset.add_validators(response, validators)
+            except Exception as exc:
+                response = viewset.handle_exception(exc)
+            return render(viewset, request, response)
+        return view
+    return decorator
+
+
+def render(viewset, request, response):
+    """A plain ``HttpResponse``, so Django doesn't render it on a sync thread"""
+    response = viewset.finalize_response(request, response)
+    response.render()
+    return HttpResponse(response.content, status=response.status_code, headers=response.headers)
+
+
+async def paginate(view, request, queryset, resolve=None):
+    """The view's paginated list payload, fetching the page and the count concurrently.
+
+    Page numbers are parsed, validated and linked by the view's own
+    paginator, so responses match the sync endpoint; only ``?page=last``
+    has to wait for the count before it can fetch its rows.
+    """
+    paginator = view.paginator
+    page_size = paginator.get_page_size(request) if paginator else None
+    if KeysetPagination.cursor_query_param in request.query_params or not page_size:
+        rows = await run_sync(
+            lambda: paginator.paginate_queryset(queryset, request, view) if paginator else list(queryset)
+        )
+        data = view.get_serializer(resolve(rows) if resolve else rows, many=True).data
+        return paginator.get_paginated_response(data).data if paginator else data
+
+    number = request.query_params.get(paginator.page_query_param) or 1
+    try:
+        offset = (int(number) - 1) * page_size
+    except (TypeError, ValueError):
+        offset = None
+    if offset is not None and offset >= 0:
+        count, rows = await gather(queryset.count, lambda: list(queryset[offset:offset + page_size]))
+    else:
+        count, rows = await run_sync(queryset.count), None
+
+    pages = paginator.django_paginator_class(queryset, page_size)
+    pages.count = count
+    number = paginator.get_page_number(request, pages)
+    try:
+        page = pages.page(number)
+    except InvalidPage as exc:
+        raise NotFound(paginator.invalid_page_message.format(page_number=number, message=str(exc)))
+    page.object_list = rows if rows is not None else await run_sync(list, page.object_list)
+
+    paginator.request, paginator.page = request, page
+    data = view.get_serializer(resolve(page.object_list) if resolve else page.object_list, many=True).data
+    # The page-number response, whatever keyset state the paginator holds
+    return PageNumberPagination.get_paginated_response(paginator, data).data
+
+
+@async_endpoint(TaskViewSet, 'list', cached=True, queryset=lambda view: view.filter_queryset(view.get_queryset()))
+async def task_list(view, request, queryset):
+    return await paginate(view, request, queryset, resolve_task_subtypes)
+
+
+@async_endpoint(TaskViewSet, 'retrieve', detail=True, cached=True)
+async def task_detail(view, request, queryset):
+    return view.get_serializer(await run_sync(view.get_object)).data
+
+
+@async_endpoint(
+    TaskViewSet, 'overdue', queryset=lambda view: view.filter_queryset(view.get_queryset().overdue()),
+)
+async def task_overdue(view, request, queryset):
+    return await paginate(view, request, queryset, resolve_task_subtypes)
+
+
+@async_endpoint(
+    TaskViewSet, 'my_tasks', queryset=lambda view: view.get_queryset().filter(assigned_to=view.request.user),
+)
+async def my_tasks(view, request, queryset):
+    tasks = resolve_task_subtypes(await run_sync(list, queryset))
+    return view.get_serializer(tasks, many=True).data
+
+
+@async_endpoint(ProjectViewSet, 'list', cached=True, queryset=lambda view: view.filter_queryset(view.get_queryset()))
+async def project_list(view, request, queryset):
+    return await paginate(view, request, queryset)
+
+
+@async_endpoint(ProjectViewSet, 'retrieve', detail=True, cached=True)
+async def project_detail(view, request, queryset):
+    return view.get_serializer(await run_sync(view.get_object)).data
+
+
+@async_endpoint(ProjectViewSet, 'tasks_summary', detail=True, cached=True)
+async def project_tasks_summary(view, request, queryset):
+    # The project, joined to its stats row, and its overdue count are fetched
+    # concurrently; a pk that isn't a number has no tasks and 404s in get_object()
+    pk = str(view.kwargs[view.lookup_url_kwarg or view.lookup_field])
+    project, overdue = await gather(view.get_object, lambda: count_overdue(int(pk)) if pk.isdigit() else 0)
+    return summarize_tasks(project, overdue)
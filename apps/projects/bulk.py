@@ -0,0 +1,119 @@
+"""Batched writes for tasks of every type.
+
+Every task type is a row of ``projects_task``, so each batch is a single
+multi-row INSERT or UPDATE. The helpers bypass ``save()`` and its signals,
+so they keep ``ProjectStats``, the status history and the cached API
+responses up to date themselves.
+"""
+from django.db import router, transaction
+from django.utils import timezone
+
+from apps.core.cache import bump_versions, project_scopes
+
+from . import history, stats
+from .models import Task
+
+
+def insert_tasks(objs, batch_size=None, using=None):
+    """Insert unsaved task instances of a single model in multi-row INSERTs"""
+    objs = list(objs)
+    if not objs:
+        return objs
+    model = type(objs[0])
+    using = using or router.db_for_write(model)
+    model._base_manager.using(using).bulk_create(objs, batch_size=batch_size)
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = using
+        obj.remember_loaded_state()
+    return objs
+
+
+def create_tasks(objs, batch_size=None, using=None):
+    """Insert tasks and add them to their projects' stats in one transaction"""
+    objs = list(objs)
+    if not objs:
+        return objs
+    using = using or router.db_for_write(type(objs[0]))
+    with transaction.atomic(using=using):
+        insert_tasks(objs, batch_size=batch_size, using=using)
+        deltas = stats.new_deltas()
+        for obj in objs:
+            stats.add_delta(deltas, None, stats.task_state(obj))
+        stats.apply_deltas(deltas, using=using)
+        history.record_events(
+            [history.status_event(obj.pk, None, stats.task_state(obj), obj.created_by_id) for obj in objs],
+            using=using,
+        )
+        bump_versions(project_scopes(obj.project_id for obj in objs), using=using)
+    return objs
+
+
+def update_tasks(objs, fields, batch_size=None, using=None):
+    """``bulk_update`` loaded tasks and apply the stats deltas of the change"""
+    objs = list(objs)
+    if not objs:
+        return objs
+    using = using or router.db_for_write(type(objs[0]))
+    now = timezone.now()
+    fields = set(fields) | {'updated_at'}
+    for obj in objs:
+        obj.updated_at = now
+    if 'due_date' in fields:
+        # A moved due date makes the task eligible for a new overdue email
+        fields.add('overdue_notified_at')
+        for obj in objs:
+            if obj.loaded_state is None or obj.loaded_state['due_date'] != obj.due_date:
+                obj.overdue_notified_at = None
+    fields = sorted(fields)
+    with transaction.atomic(using=using):
+        type(objs[0])._base_manager.using(using).bulk_update(objs, fields, batch_size=batch_size)
+        deltas = stats.new_deltas()
+        for obj in objs:
+            stats.add_delta(deltas, obj.loaded_state, stats.task_state(obj))
+        stats.apply_deltas(deltas, using=using)
+        if 'status' in fields:
+            history.record_events(
+                [
+                    history.status_event(obj.pk, obj.loaded_state, stats.task_state(obj), obj.updated_by_id, now)
+                    for obj in objs if obj.loaded_state
+                ],
+                using=using,
+            )
+        project_ids = {obj.project_id for obj in objs}
+        project_ids.update(obj.loaded_state['project_id'] for obj in objs if obj.loaded_state)
+        bump_versions(project_scopes(project_ids), using=using)
+    for obj in objs:
+        obj.remember_loaded_state()
+    return objs
+
+
+def transition_tasks(queryset, status, user=None):
+    """Move every task in ``queryset`` to ``status`` with a single UPDATE.
+
+    Returns the primary keys of the tasks that were updated.
+    """
+    using = queryset.db
+    with transaction.atomic(using=using):
+        old_states = list(queryset.values('pk', *Task.TRACKED_FIELDS))
+        pks = [state.pop('pk') for state in old_states]
+        if not pks:
+            return []
+        now = timezone.now()
+        queryset.model._base_manager.using(using).filter(pk__in=pks).update(
+            status=status, updated_by=user, updated_at=now
+        )
+        deltas = stats.new_deltas()
+        for old_state in old_states:
+            stats.add_delta(deltas, old_state, dict(old_state, status=status))
+        stats.apply_deltas(deltas, using=using)
+        user_id = user.pk if user is not None else None
+        history.record_events(
+            [
+                history.status_event(pk, old_state, dict(old_state, status=status), user_id, now)
+                for pk, old_state in zip(pks, old_states)
+            ],
+            using=using,
+        )
+        bump_versions(project_scopes(state['project_id'] for state in old_states), using=using)
+    return pks
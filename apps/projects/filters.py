@@ -1,10 +1,20 @@
 import django_filters
 from django import forms
+from django_filters.constants import EMPTY_VALUES
 from .models import Project, Task, DevelopmentTask, DesignTask
+from .search import contains
+
+class SubstringFilter(django_filters.CharFilter):
+    """Case-insensitive substring match served by a trigram index"""
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        return contains(qs, self.field_name, value)
 
 class ProjectFilter(django_filters.FilterSet):
     """Project filtering"""
-    name = django_filters.CharFilter(lookup_expr='icontains')
+    name = SubstringFilter()
     status = django_filters.ChoiceFilter(choices=Project.StatusChoices.choices)
     start_date_after = django_filters.DateFilter(field_name='start_date', lookup_expr='gte')
     start_date_before = django_filters.DateFilter(field_name='start_date', lookup_expr='lte')
@@ -19,7 +29,7 @@ class ProjectFilter(django_filters.FilterSet):
 
 class TaskFilter(django_filters.FilterSet):
     """Task filtering"""
-    title = django_filters.CharFilter(lookup_expr='icontains')
+    title = SubstringFilter()
     status = django_filters.ChoiceFilter(choices=Task.StatusChoices.choices)
     priority = django_filters.ChoiceFilter(choices=Task.PriorityChoices.choices)
     project = django_filters.NumberFilter(field_name='project__id')
@@ -0,0 +1,109 @@
+"""Task status history and the daily project snapshots rolled up from it.
+
+Every write path that can change a task's status appends
+``TaskStatusEvent`` rows here: ``Task.save`` through a ``post_save`` handler
+and the batched helpers in ``apps.projects.bulk`` (which the admin actions
+use) with one multi-row INSERT. The daily rollup copies each project's
+``ProjectStats`` counters and counts the day's events, so reports never scan
+the raw event table.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.core.cache import GLOBAL_SCOPE, bump_versions
+
+from .models import ProjectDailySnapshot, ProjectStats, Task, TaskStatusEvent
+from .stats import COUNTER_FIELDS, overdue_counts
+
+
+def status_event(task_id, old_state, new_state, user_id=None, at=None):
+    """The event for a change from ``old_state`` to ``new_state``, or ``None``.
+
+    States are ``Task.TRACKED_FIELDS`` dicts; ``old_state`` is ``None`` for a
+    new task.
+    """
+    old_status = old_state['status'] if old_state else ''
+    if old_status == new_state['status']:
+        return None
+    return TaskStatusEvent(
+        task_id=task_id,
+        project_id=new_state['project_id'],
+        from_status=old_status,
+        to_status=new_state['status'],
+        changed_by_id=user_id,
+        changed_at=at or timezone.now(),
+    )
+
+
+def record_events(events, using=None):
+    """Append events with one multi-row INSERT, skipping ``None`` entries"""
+    events = [event for event in events if event is not None]
+    if events:
+        TaskStatusEvent.objects.using(using).bulk_create(events)
+    return events
+
+
+def day_bounds(day):
+    """Aware start and end datetimes of ``day`` in the current timezone"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def rollup_project_snapshots(day=None, using=None, batch_size=1000):
+    """Write every active project's snapshot for ``day`` (default: today).
+
+    Counters are copied from ``ProjectStats`` and overdue tasks counted as
+    they are when this runs, so schedule it at the end of the day; throughput
+    counts come from one grouped query over the day's events. Re-running replaces the day's rows. Returns
+    the number of snapshots written.
+    """
+    day = day or timezone.localdate()
+    start, end = day_bounds(day)
+    throughput = {
+        row.pop('project_id'): row
+        for row in TaskStatusEvent.objects.using(using)
+        .filter(changed_at__gte=start, changed_at__lt=end)
+        .order_by()
+        .values('project_id')
+        .annotate(
+            created_count=Count('id', filter=Q(from_status='')),
+            completed_count=Count('id', filter=Q(to_status=Task.StatusChoices.COMPLETED)),
+        )
+    }
+    overdue = overdue_counts(using=using)
+
+    written = 0
+    batch = []
+    stats = ProjectStats.objects.using(using).filter(project__is_active=True)
+    with transaction.atomic(using=using):
+        for row in stats.values('project_id', *COUNTER_FIELDS).iterator():
+            project_id = row.pop('project_id')
+            counts = throughput.get(project_id, {})
+            batch.append(ProjectDailySnapshot(
+                project_id=project_id,
+                date=day,
+                created_count=counts.get('created_count', 0),
+                completed_count=counts.get('completed_count', 0),
+                overdue_tasks=overdue.get(project_id, 0),
+                **row
+            ))
+            if len(batch) >= batch_size:
+                written += _upsert(batch, using)
+                batch = []
+        if batch:
+            written += _upsert(batch, using)
+        bump_versions([GLOBAL_SCOPE], using=using)
+    return written
+
+
+def _upsert(batch, using):
+    ProjectDailySnapshot.objects.using(using).bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['project', 'date'],
+        update_fields=list(COUNTER_FIELDS) + ['overdue_tasks', 'created_count', 'completed_count'],
+    )
+    return len(batch)
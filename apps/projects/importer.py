@@ -0,0 +1,220 @@
+"""Bulk import of tasks from CSV or NDJSON.
+
+Rows use the column names of the ``/export/`` endpoints, so an export can be
+loaded back as-is (``id``, ``created_at`` and the like are ignored). Each
+chunk of rows is written in its own transaction through
+:func:`apps.projects.bulk.create_tasks`: multi-row INSERTs into
+``projects_task``, with ``ProjectStats``, the status history and the cache
+versions updated once per chunk. Projects and users are looked up by natural
+key (``project_name``, ``assigned_to_username``, ``created_by_username``) or
+by id, and every key is fetched from the database once, found or not. Only
+active projects are matched, and a name shared by several projects is a row
+error rather than a guess.
+
+``save()`` is bypassed, so no per-task notification is sent; pass
+``notify=True`` to queue them in batches after each chunk commits.
+"""
+import csv
+import json
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.utils import timezone
+
+from apps.core.notifications import queue_task_created_notifications
+
+from .bulk import create_tasks
+from .models import TASK_TYPE_MODELS, Project, Task
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+TASK_TYPES = TASK_TYPE_MODELS
+
+# Columns copied onto the task after cleaning, per model
+TASK_FIELDS = ('title', 'description', 'status', 'priority', 'due_date', 'estimated_hours', 'actual_hours')
+SUBTYPE_FIELDS = {model: tuple(model.SUBTYPE_DEFAULTS) for model in TASK_TYPES.values()}
+
+# (id column, natural key column, model, natural key field)
+RELATED_KEYS = {
+    'project': ('project_id', 'project_name', Project, 'name'),
+    'assigned_to': ('assigned_to_id', 'assigned_to_username', User, 'username'),
+    'created_by': ('created_by_id', 'created_by_username', User, 'username'),
+}
+
+# Rows a key may resolve to, per model
+KEY_FILTERS = {Project: {'is_active': True}}
+
+AMBIGUOUS = object()
+
+
+class TaskImportError(Exception):
+    pass
+
+
+class ImportResult(namedtuple('ImportResult', 'created errors seconds')):
+    """``errors`` is a list of ``(row number, message)`` for skipped rows"""
+
+    @property
+    def rows_per_second(self):
+        return self.created / self.seconds if self.seconds else 0.0
+
+
+def read_rows(stream, import_format):
+    """Yield one dict per record of a text stream"""
+    if import_format == 'csv':
+        yield from csv.DictReader(stream)
+    elif import_format == 'ndjson':
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise TaskImportError(f'Unknown import format: {import_format}')
+
+
+def _empty(value):
+    return value is None or value == ''
+
+
+def _key_value(key, value):
+    return int(value) if key == 'pk' else value
+
+
+class KeyMap:
+    """Natural key -> id lookups for one model, filled one chunk at a time.
+
+    Keys that match no row are remembered as ``None`` and keys that match
+    several as ``AMBIGUOUS``, so neither is fetched again.
+    """
+
+    def __init__(self, model, field, using):
+        self.queryset = model._default_manager.using(using).filter(**KEY_FILTERS.get(model, {}))
+        self.field = field
+        self.ids = {}
+
+    def load(self, keys):
+        missing = {key for key in keys if key not in self.ids}
+        if missing:
+            self.ids.update(dict.fromkeys(missing))
+            queryset = self.queryset.filter(**{f'{self.field}__in': missing}).order_by()
+            for key, pk in queryset.values_list(self.field, 'pk'):
+                self.ids[key] = pk if self.ids[key] is None else AMBIGUOUS
+
+    def __getitem__(self, key):
+        pk = self.ids.get(key)
+        if pk is None:
+            raise KeyError(key)
+        if pk is AMBIGUOUS:
+            raise ValidationError(f'{key!r} matches more than one {self.queryset.model._meta.verbose_name}')
+        return pk
+
+
+def _clean(model, name, value):
+    field = model._meta.get_field(name)
+    value = field.clean(value, None)
+    if name == 'due_date' and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _build_task(row, keys, default_created_by):
+    task_type = row.get('task_type') or 'task'
+    model = TASK_TYPES.get(task_type)
+    if model is None:
+        raise ValidationError(f'Unknown task_type {task_type!r}')
+
+    values = {}
+    for name in TASK_FIELDS + SUBTYPE_FIELDS[model]:
+        value = row.get(name)
+        if not _empty(value):
+            values[name] = _clean(model, name, value)
+        elif name in ('title', 'due_date'):
+            raise ValidationError(f'{name} is required')
+
+    for name, (id_column, key_column, _, _) in RELATED_KEYS.items():
+        for column, key in ((id_column, 'pk'), (key_column, 'natural')):
+            if _empty(row.get(column)):
+                continue
+            try:
+                values[f'{name}_id'] = keys[name, key][_key_value(key, row[column])]
+            except KeyError:
+                raise ValidationError(f'Unknown {column} {row[column]!r}')
+            break
+    values.setdefault('created_by_id', default_created_by)
+    if values.get('project_id') is None:
+        raise ValidationError('project_id or project_name is required')
+    if values['created_by_id'] is None:
+        raise ValidationError('created_by_id or created_by_username is required')
+    return model(**values)
+
+
+def import_tasks(rows, created_by=None, chunk_size=None, batch_size=None, notify=False, using=None):
+    """Create tasks from ``rows`` (dicts) in chunked transactions.
+
+    Rows that fail validation are skipped and reported in the result; a
+    chunk is committed or rolled back as a whole. ``created_by`` is the user
+    for rows without a ``created_by_*`` column.
+    """
+    using = using or router.db_for_write(Task)
+    chunk_size = chunk_size or getattr(settings, 'TASK_IMPORT_CHUNK_SIZE', 5000)
+    default_created_by = created_by.pk if isinstance(created_by, User) else created_by
+    keys = {}
+    for name, (_, _, model, field) in RELATED_KEYS.items():
+        # Ids are checked through a map too, so a bad id skips its row
+        # instead of failing the chunk's INSERT
+        for key, key_field in (('pk', 'pk'), ('natural', field)):
+            maps = [m for m in keys.values() if m.queryset.model is model and m.field == key_field]
+            keys[name, key] = maps[0] if maps else KeyMap(model, key_field, using)
+
+    created = 0
+    errors = []
+    started = time.perf_counter()
+    chunk = []
+    for number, row in enumerate(rows, start=1):
+        chunk.append((number, row))
+        if len(chunk) >= chunk_size:
+            created += _import_chunk(chunk, keys, default_created_by, errors, batch_size, notify, using)
+            chunk = []
+    if chunk:
+        created += _import_chunk(chunk, keys, default_created_by, errors, batch_size, notify, using)
+    return ImportResult(created, errors, time.perf_counter() - started)
+
+
+def _chunk_keys(chunk, column, key):
+    for _, row in chunk:
+        if not _empty(row.get(column)):
+            try:
+                yield _key_value(key, row[column])
+            except (TypeError, ValueError):
+                # Reported for the row by _build_task
+                pass
+
+
+def _import_chunk(chunk, keys, default_created_by, errors, batch_size, notify, using):
+    for name, (id_column, key_column, _, _) in RELATED_KEYS.items():
+        for column, key in ((id_column, 'pk'), (key_column, 'natural')):
+            keys[name, key].load(_chunk_keys(chunk, column, key))
+
+    by_model = defaultdict(list)
+    for number, row in chunk:
+        try:
+            task = _build_task(row, keys, default_created_by)
+        except (ValidationError, ValueError, TypeError) as e:
+            messages = e.messages if isinstance(e, ValidationError) else [str(e)]
+            errors.append((number, '; '.join(messages)))
+            continue
+        by_model[type(task)].append(task)
+    if not by_model:
+        return 0
+
+    task_ids = []
+    with transaction.atomic(using=using):
+        for tasks in by_model.values():
+            create_tasks(tasks, batch_size=batch_size, using=using)
+            task_ids.extend(task.pk for task in tasks)
+        if notify:
+            queue_task_created_notifications(task_ids, using=using)
+    return len(task_ids)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_active', True), models.Q(('status', 'completed'), _negated=True)), fields=['end_date'], name='project_overdue_end_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_active', True), models.Q(('status', 'completed'), _negated=True)), fields=['due_date'], name='task_overdue_due_date_idx'),
+        ),
+    ]
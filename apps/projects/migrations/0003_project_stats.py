@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+
+def populate_project_stats(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectStats = apps.get_model('projects', 'ProjectStats')
+    Task = apps.get_model('projects', 'Task')
+    db = schema_editor.connection.alias
+
+    rows = (
+        Task.objects.using(db)
+        .filter(is_active=True)
+        .order_by()
+        .values('project_id')
+        .annotate(
+            total_tasks=Count('id'),
+            completed_tasks=Count('id', filter=Q(status='completed')),
+            in_progress_tasks=Count('id', filter=Q(status='in_progress')),
+            blocked_tasks=Count('id', filter=Q(status='blocked')),
+            overdue_tasks=Count(
+                'id', filter=Q(due_date__lt=timezone.now()) & ~Q(status='completed')
+            ),
+            estimated_hours=Sum('estimated_hours'),
+            actual_hours=Sum('actual_hours'),
+        )
+    )
+    counters = {row.pop('project_id'): row for row in rows}
+    ProjectStats.objects.using(db).bulk_create(
+        [
+            ProjectStats(
+                project_id=project_id,
+                **{field: value or 0 for field, value in counters.get(project_id, {}).items()}
+            )
+            for project_id in Project.objects.using(db).values_list('pk', flat=True)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_overdue_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStats',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='projects.project')),
+                ('total_tasks', models.IntegerField(default=0)),
+                ('completed_tasks', models.IntegerField(default=0)),
+                ('in_progress_tasks', models.IntegerField(default=0)),
+                ('blocked_tasks', models.IntegerField(default=0)),
+                ('overdue_tasks', models.IntegerField(default=0)),
+                ('estimated_hours', models.BigIntegerField(default=0)),
+                ('actual_hours', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Project Stats',
+                'verbose_name_plural': 'Project Stats',
+            },
+        ),
+        migrations.RunPython(populate_project_stats, migrations.RunPython.noop),
+    ]
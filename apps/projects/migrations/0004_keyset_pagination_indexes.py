@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['is_active', 'created_at', 'id'], name='projects_pr_is_acti_bfb529_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['is_active', 'created_at', 'id'], name='projects_ta_is_acti_9313c0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['is_active', 'due_date', 'id'], name='projects_ta_is_acti_c6b9b1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['is_active', 'priority', 'id'], name='projects_ta_is_acti_641377_idx'),
+        ),
+    ]
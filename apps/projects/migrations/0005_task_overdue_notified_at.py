@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:47
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_already_overdue(apps, schema_editor):
+    # The previous scan emailed every overdue task on each run, so tasks that
+    # are overdue now have already been notified.
+    Task = apps.get_model('projects', 'Task')
+    now = timezone.now()
+    Task.objects.using(schema_editor.connection.alias).filter(
+        is_active=True, status__in=['todo', 'in_progress'], due_date__lt=now,
+    ).update(overdue_notified_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='overdue_notified_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(mark_already_overdue, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from apps.projects.search import install_search_index
+
+    install_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from apps.projects.search import drop_search_index
+
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_task_overdue_notified_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def create_trigram_index(apps, schema_editor):
+    from apps.projects.search import install_trigram_index
+
+    install_trigram_index(schema_editor.connection)
+
+
+def drop_trigram_index(apps, schema_editor):
+    from apps.projects.search import drop_trigram_index
+
+    drop_trigram_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:04
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_trigram_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectDailySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_tasks', models.IntegerField(default=0)),
+                ('completed_tasks', models.IntegerField(default=0)),
+                ('in_progress_tasks', models.IntegerField(default=0)),
+                ('blocked_tasks', models.IntegerField(default=0)),
+                ('overdue_tasks', models.IntegerField(default=0)),
+                ('estimated_hours', models.BigIntegerField(default=0)),
+                ('actual_hours', models.BigIntegerField(default=0)),
+                ('created_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_snapshots', to='projects.project')),
+            ],
+            options={
+                'ordering': ['project', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('project', 'date'), name='unique_project_snapshot_date')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('todo', 'To Do'), ('in_progress', 'In Progress'), ('review', 'Review'), ('completed', 'Completed'), ('blocked', 'Blocked')], max_length=20)),
+                ('to_status', models.CharField(choices=[('todo', 'To Do'), ('in_progress', 'In Progress'), ('review', 'Review'), ('completed', 'Completed'), ('blocked', 'Blocked')], max_length=20)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='task_status_events', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='projects.project')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='projects.task')),
+            ],
+            options={
+                'ordering': ['changed_at', 'id'],
+                'indexes': [models.Index(fields=['changed_at'], name='projects_ta_changed_8d4187_idx'), models.Index(fields=['project', 'changed_at'], name='projects_ta_project_58732c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,252 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+# (model, task_type, {column: value for rows that were missing one})
+SUBTYPES = (
+    ('DevelopmentTask', 'development', {
+        'technology': 'python', 'repository_url': '', 'branch_name': '', 'pull_request_url': '',
+    }),
+    ('DesignTask', 'design', {
+        'design_type': 'ui_ux', 'design_tool': '', 'design_file_url': '', 'feedback_notes': '',
+    }),
+)
+
+
+def merge_subtype_tables(apps, schema_editor):
+    """Copy every subtype row onto its task row, one UPDATE per subtype"""
+    db = schema_editor.connection.alias
+    Task = apps.get_model('projects', 'Task')
+    for model_name, task_type, columns in SUBTYPES:
+        model = apps.get_model('projects', model_name)
+        rows = model.objects.using(db).filter(task_ptr=OuterRef('pk')).order_by()
+        Task.objects.using(db).filter(pk__in=model.objects.using(db).values('task_ptr')).update(
+            task_type=task_type,
+            **{column: Subquery(rows.values(f'legacy_{column}')[:1]) for column in columns},
+        )
+
+
+def split_subtype_tables(apps, schema_editor):
+    qn = schema_editor.quote_name
+    for model_name, task_type, columns in SUBTYPES:
+        table = qn(f'projects_{model_name.lower()}')
+        names = ', '.join(qn(f'legacy_{column}') for column in columns)
+        values = ', '.join(f'COALESCE({qn(column)}, %s)' for column in columns)
+        schema_editor.execute(
+            f'INSERT INTO {table} (task_ptr_id, {names}) '
+            f'SELECT id, {values} FROM projects_task WHERE task_type = %s',
+            [*columns.values(), task_type],
+        )
+
+
+# The task search index as of this migration (see apps.projects.search),
+# with or without the subtype text. ``{row}`` prefixes the row's columns.
+TASK_DETAIL = (
+    "trim(coalesce({row}technology, {row}design_type, '') || ' ' || "
+    "coalesce({row}branch_name, {row}design_tool, ''))"
+)
+POSTGRES_TASK_TEXT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+POSTGRES_TASK_DETAIL = f"setweight(to_tsvector('english', {TASK_DETAIL.format(row='')}), 'C')"
+SQLITE_TASK_TRIGGERS = ('projects_task_fts_insert', 'projects_task_fts_update', 'projects_task_fts_delete')
+
+
+def install_task_search_index(schema_editor, subtype_columns):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        vector = POSTGRES_TASK_TEXT
+        if subtype_columns:
+            vector = f'{vector} || {POSTGRES_TASK_DETAIL}'
+        schema_editor.execute(
+            'ALTER TABLE projects_task ADD COLUMN IF NOT EXISTS search_vector tsvector '
+            f'GENERATED ALWAYS AS ({vector}) STORED'
+        )
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS projects_task_search_idx ON projects_task USING GIN (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        detail = TASK_DETAIL if subtype_columns else "''"
+        watched = 'title, description'
+        if subtype_columns:
+            watched += ', task_type, technology, branch_name, design_type, design_tool'
+        insert, update, delete = SQLITE_TASK_TRIGGERS
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE projects_task_fts USING fts5("
+            "title, description, detail, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO projects_task_fts(rowid, title, description, detail) "
+            f"SELECT id, title, description, {detail.format(row='')} FROM projects_task"
+        )
+        schema_editor.execute(f"""
+            CREATE TRIGGER {insert} AFTER INSERT ON projects_task BEGIN
+                INSERT INTO projects_task_fts(rowid, title, description, detail)
+                VALUES (new.id, new.title, new.description, {detail.format(row='new.')});
+            END""")
+        schema_editor.execute(f"""
+            CREATE TRIGGER {update} AFTER UPDATE OF {watched} ON projects_task BEGIN
+                UPDATE projects_task_fts SET title = new.title, description = new.description,
+                    detail = {detail.format(row='new.')}
+                WHERE rowid = new.id;
+            END""")
+        schema_editor.execute(f"""
+            CREATE TRIGGER {delete} AFTER DELETE ON projects_task BEGIN
+                DELETE FROM projects_task_fts WHERE rowid = old.id;
+            END""")
+
+
+def drop_task_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE projects_task DROP COLUMN IF EXISTS search_vector')
+    elif vendor == 'sqlite':
+        for trigger in SQLITE_TASK_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        schema_editor.execute('DROP TABLE IF EXISTS projects_task_fts')
+
+
+def index_subtype_text(apps, schema_editor):
+    drop_task_search_index(apps, schema_editor)
+    install_task_search_index(schema_editor, subtype_columns=True)
+
+
+def unindex_subtype_text(apps, schema_editor):
+    drop_task_search_index(apps, schema_editor)
+    install_task_search_index(schema_editor, subtype_columns=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_task_status_history'),
+    ]
+
+    operations = [
+        # Rolling back ends here, with the index built without subtype text
+        migrations.RunPython(migrations.RunPython.noop, unindex_subtype_text),
+        # The subtype columns move onto Task under the same names
+        migrations.RenameField(
+            model_name='developmenttask',
+            old_name='technology',
+            new_name='legacy_technology',
+        ),
+        migrations.RenameField(
+            model_name='developmenttask',
+            old_name='repository_url',
+            new_name='legacy_repository_url',
+        ),
+        migrations.RenameField(
+            model_name='developmenttask',
+            old_name='branch_name',
+            new_name='legacy_branch_name',
+        ),
+        migrations.RenameField(
+            model_name='developmenttask',
+            old_name='pull_request_url',
+            new_name='legacy_pull_request_url',
+        ),
+        migrations.RenameField(
+            model_name='designtask',
+            old_name='design_type',
+            new_name='legacy_design_type',
+        ),
+        migrations.RenameField(
+            model_name='designtask',
+            old_name='design_tool',
+            new_name='legacy_design_tool',
+        ),
+        migrations.RenameField(
+            model_name='designtask',
+            old_name='design_file_url',
+            new_name='legacy_design_file_url',
+        ),
+        migrations.RenameField(
+            model_name='designtask',
+            old_name='feedback_notes',
+            new_name='legacy_feedback_notes',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='task_type',
+            field=models.CharField(choices=[('task', 'Task'), ('development', 'Development'), ('design', 'Design')], default='task', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='technology',
+            field=models.CharField(blank=True, choices=[('python', 'Python'), ('javascript', 'JavaScript'), ('java', 'Java'), ('react', 'React'), ('django', 'Django'), ('other', 'Other')], max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='repository_url',
+            field=models.URLField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='branch_name',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='pull_request_url',
+            field=models.URLField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='design_type',
+            field=models.CharField(blank=True, choices=[('ui_ux', 'UI/UX Design'), ('graphic', 'Graphic Design'), ('wireframe', 'Wireframe'), ('prototype', 'Prototype'), ('mockup', 'Mockup')], max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='design_tool',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='design_file_url',
+            field=models.URLField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='feedback_notes',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['task_type', 'created_at', 'id'], name='projects_ta_task_ty_975a50_idx'),
+        ),
+        migrations.RunPython(merge_subtype_tables, split_subtype_tables),
+        migrations.DeleteModel(
+            name='DesignTask',
+        ),
+        migrations.DeleteModel(
+            name='DevelopmentTask',
+        ),
+        migrations.CreateModel(
+            name='DesignTask',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Design Task',
+                'verbose_name_plural': 'Design Tasks',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('projects.task',),
+        ),
+        migrations.CreateModel(
+            name='DevelopmentTask',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Development Task',
+                'verbose_name_plural': 'Development Tasks',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('projects.task',),
+        ),
+        migrations.RunPython(index_subtype_text, drop_task_search_index),
+    ]
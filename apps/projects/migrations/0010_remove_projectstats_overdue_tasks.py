@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:28
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_single_table_tasks'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='projectstats',
+            name='overdue_tasks',
+        ),
+    ]
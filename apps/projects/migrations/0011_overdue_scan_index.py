@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_remove_projectstats_overdue_tasks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_active', True), ('overdue_notified_at__isnull', True), ('status__in', ['todo', 'in_progress'])), fields=['due_date'], name='task_overdue_unnotified_idx'),
+        ),
+    ]
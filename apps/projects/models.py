@@ -1,8 +1,45 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from apps.core.models import BaseModel
 
+
+class ProjectQuerySet(models.QuerySet):
+    """Project queryset with database-side overdue helpers"""
+
+    def overdue_q(self):
+        return Q(end_date__lt=timezone.now().date()) & ~Q(status=Project.StatusChoices.COMPLETED)
+
+    def overdue(self):
+        """Projects past their end date that are not completed"""
+        return self.filter(self.overdue_q())
+
+    def with_overdue_flag(self):
+        """Annotate each project with an ``overdue_flag`` boolean"""
+        return self.annotate(
+            overdue_flag=ExpressionWrapper(self.overdue_q(), output_field=BooleanField())
+        )
+
+
+class TaskQuerySet(models.QuerySet):
+    """Task queryset with database-side overdue helpers"""
+
+    def overdue_q(self):
+        return Q(due_date__lt=timezone.now()) & ~Q(status=Task.StatusChoices.COMPLETED)
+
+    def overdue(self):
+        """Tasks past their due date that are not completed"""
+        return self.filter(self.overdue_q())
+
+    def with_overdue_flag(self):
+        """Annotate each task with an ``overdue_flag`` boolean"""
+        return self.annotate(
+            overdue_flag=ExpressionWrapper(self.overdue_q(), output_field=BooleanField())
+        )
+
+
 class Project(BaseModel):
     """Project model extending BaseModel"""
     
@@ -28,11 +65,21 @@ class Project(BaseModel):
         blank=True
     )
 
+    objects = ProjectQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status']),
             models.Index(fields=['start_date', 'end_date']),
+            # Keyset pagination on the default API ordering
+            models.Index(fields=['is_active', 'created_at', 'id']),
+            # Partial index backing ProjectQuerySet.overdue()
+            models.Index(
+                fields=['end_date'],
+                name='project_overdue_end_date_idx',
+                condition=Q(is_active=True) & ~Q(status='completed'),
+            ),
         ]
 
     def __str__(self):
@@ -45,20 +92,57 @@ class Project(BaseModel):
 
     @property
     def is_overdue(self):
-        from django.utils import timezone
         return self.end_date < timezone.now().date() and self.status != self.StatusChoices.COMPLETED
 
+    @property
+    def task_stats(self):
+        """Denormalized task counters, or an empty record if none exists yet"""
+        try:
+            return self.stats
+        except ProjectStats.DoesNotExist:
+            return ProjectStats(project=self)
+
     @property
     def progress_percentage(self):
-        total_tasks = self.tasks.count()
-        if total_tasks == 0:
-            return 0
-        completed_tasks = self.tasks.filter(status='completed').count()
-        return round((completed_tasks / total_tasks) * 100, 2)
+        return self.task_stats.progress_percentage
+
+
+class SubtypeManager(models.Manager.from_queryset(TaskQuerySet)):
+    """Only the rows of the proxy model's ``TASK_TYPE``"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(task_type=self.model.TASK_TYPE)
+
+
+class TechnologyChoices(models.TextChoices):
+    PYTHON = 'python', 'Python'
+    JAVASCRIPT = 'javascript', 'JavaScript'
+    JAVA = 'java', 'Java'
+    REACT = 'react', 'React'
+    DJANGO = 'django', 'Django'
+    OTHER = 'other', 'Other'
+
+
+class DesignTypeChoices(models.TextChoices):
+    UI_UX = 'ui_ux', 'UI/UX Design'
+    GRAPHIC = 'graphic', 'Graphic Design'
+    WIREFRAME = 'wireframe', 'Wireframe'
+    PROTOTYPE = 'prototype', 'Prototype'
+    MOCKUP = 'mockup', 'Mockup'
 
 
 class Task(BaseModel):
-    """Base Task model"""
+    """Base Task model.
+
+    Every task type lives in this one table: ``task_type`` tells them apart
+    and the subtype columns are NULL on tasks of other types.
+    ``DevelopmentTask`` and ``DesignTask`` are proxies over it.
+    """
+
+    class TaskTypeChoices(models.TextChoices):
+        TASK = 'task', 'Task'
+        DEVELOPMENT = 'development', 'Development'
+        DESIGN = 'design', 'Design'
     
     class StatusChoices(models.TextChoices):
         TODO = 'todo', 'To Do'
@@ -100,6 +184,42 @@ class Task(BaseModel):
     due_date = models.DateTimeField()
     estimated_hours = models.PositiveIntegerField(default=0)
     actual_hours = models.PositiveIntegerField(default=0, blank=True)
+    # Set once the assignee has been told the task is overdue; cleared when
+    # the due date moves so a rescheduled task can be notified again.
+    overdue_notified_at = models.DateTimeField(null=True, blank=True, editable=False)
+    task_type = models.CharField(
+        max_length=20,
+        choices=TaskTypeChoices.choices,
+        default=TaskTypeChoices.TASK,
+        editable=False
+    )
+
+    # DevelopmentTask columns
+    technology = models.CharField(
+        max_length=20, choices=TechnologyChoices.choices, null=True, blank=True
+    )
+    repository_url = models.URLField(null=True, blank=True)
+    branch_name = models.CharField(max_length=100, null=True, blank=True)
+    pull_request_url = models.URLField(null=True, blank=True)
+    # DesignTask columns
+    design_type = models.CharField(
+        max_length=20, choices=DesignTypeChoices.choices, null=True, blank=True
+    )
+    design_tool = models.CharField(max_length=50, null=True, blank=True)
+    design_file_url = models.URLField(null=True, blank=True)
+    feedback_notes = models.TextField(null=True, blank=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    TASK_TYPE = TaskTypeChoices.TASK
+    # The subtype columns of this task type and their values on new tasks
+    SUBTYPE_DEFAULTS = {}
+
+    # Fields whose previous values are remembered on load so that writes can
+    # update ProjectStats with a delta instead of recounting.
+    TRACKED_FIELDS = (
+        'project_id', 'status', 'due_date', 'estimated_hours', 'actual_hours', 'is_active',
+    )
     
     class Meta:
         ordering = ['-created_at']
@@ -108,65 +228,234 @@ class Task(BaseModel):
             models.Index(fields=['priority']),
             models.Index(fields=['due_date']),
             models.Index(fields=['project', 'status']),
+            # Keyset pagination on the API ordering fields
+            models.Index(fields=['is_active', 'created_at', 'id']),
+            models.Index(fields=['is_active', 'due_date', 'id']),
+            models.Index(fields=['is_active', 'priority', 'id']),
+            # The subtype endpoints list one task type at a time
+            # (is_active is left out: SQLite compares booleans without '=', so a
+            # column after it in the index could not be used for ordering)
+            models.Index(fields=['task_type', 'created_at', 'id']),
+            # Partial index backing TaskQuerySet.overdue()
+            models.Index(
+                fields=['due_date'],
+                name='task_overdue_due_date_idx',
+                condition=Q(is_active=True) & ~Q(status='completed'),
+            ),
+            # Partial index backing the mark_overdue_tasks scan
+            models.Index(
+                fields=['due_date'],
+                name='task_overdue_unnotified_idx',
+                condition=Q(is_active=True, status__in=['todo', 'in_progress'], overdue_notified_at__isnull=True),
+            ),
         ]
 
+    def __init__(self, *args, **kwargs):
+        # Rows loaded from the database arrive as positional values
+        if not args:
+            kwargs.setdefault('task_type', self.TASK_TYPE)
+            for name, value in self.SUBTYPE_DEFAULTS.items():
+                kwargs.setdefault(name, value)
+        super().__init__(*args, **kwargs)
+
     def __str__(self):
         return f"{self.title} - {self.project.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_state()
+        return instance
+
+    def remember_loaded_state(self):
+        """Snapshot the tracked fields as they are stored in the database"""
+        if self.get_deferred_fields().intersection(self.TRACKED_FIELDS):
+            self._loaded_state = None
+        else:
+            self._loaded_state = {f: getattr(self, f) for f in self.TRACKED_FIELDS}
+
     @property
-    def is_overdue(self):
-        from django.utils import timezone
-        return self.due_date < timezone.now() and self.status != self.StatusChoices.COMPLETED
+    def loaded_state(self):
+        return getattr(self, '_loaded_state', None)
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        # post_save handlers (ProjectStats) must commit or roll back with the row
+        with transaction.atomic(using=using):
+            if self.pk is not None and not self._state.adding and self.loaded_state is None:
+                self._loaded_state = (
+                    Task.objects.using(using)
+                    .filter(pk=self.pk)
+                    .values(*self.TRACKED_FIELDS)
+                    .first()
+                )
+            if self.loaded_state and self.loaded_state['due_date'] != self.due_date:
+                self.overdue_notified_at = None
+                update_fields = kwargs.get('update_fields')
+                if update_fields is not None and 'due_date' in update_fields:
+                    kwargs['update_fields'] = {*update_fields, 'overdue_notified_at'}
+            super().save(*args, **kwargs)
+        self.remember_loaded_state()
 
     @property
-    def task_type(self):
-        return self.__class__.__name__.replace('Task', '').lower()
+    def is_overdue(self):
+        return self.due_date < timezone.now() and self.status != self.StatusChoices.COMPLETED
 
 
 class DevelopmentTask(Task):
     """Development specific task"""
-    
-    class TechnologyChoices(models.TextChoices):
-        PYTHON = 'python', 'Python'
-        JAVASCRIPT = 'javascript', 'JavaScript'
-        JAVA = 'java', 'Java'
-        REACT = 'react', 'React'
-        DJANGO = 'django', 'Django'
-        OTHER = 'other', 'Other'
 
-    technology = models.CharField(
-        max_length=20, 
-        choices=TechnologyChoices.choices, 
-        default=TechnologyChoices.PYTHON
-    )
-    repository_url = models.URLField(blank=True)
-    branch_name = models.CharField(max_length=100, blank=True)
-    pull_request_url = models.URLField(blank=True)
-    
+    TechnologyChoices = TechnologyChoices
+
+    objects = SubtypeManager()
+
+    TASK_TYPE = Task.TaskTypeChoices.DEVELOPMENT
+    SUBTYPE_DEFAULTS = {
+        'technology': TechnologyChoices.PYTHON,
+        'repository_url': '',
+        'branch_name': '',
+        'pull_request_url': '',
+    }
+
     class Meta:
+        proxy = True
         verbose_name = "Development Task"
         verbose_name_plural = "Development Tasks"
 
 
 class DesignTask(Task):
     """Design specific task"""
-    
-    class DesignTypeChoices(models.TextChoices):
-        UI_UX = 'ui_ux', 'UI/UX Design'
-        GRAPHIC = 'graphic', 'Graphic Design'
-        WIREFRAME = 'wireframe', 'Wireframe'
-        PROTOTYPE = 'prototype', 'Prototype'
-        MOCKUP = 'mockup', 'Mockup'
 
-    design_type = models.CharField(
-        max_length=20, 
-        choices=DesignTypeChoices.choices, 
-        default=DesignTypeChoices.UI_UX
-    )
-    design_tool = models.CharField(max_length=50, blank=True)
-    design_file_url = models.URLField(blank=True)
-    feedback_notes = models.TextField(blank=True)
-    
+    DesignTypeChoices = DesignTypeChoices
+
+    objects = SubtypeManager()
+
+    TASK_TYPE = Task.TaskTypeChoices.DESIGN
+    SUBTYPE_DEFAULTS = {
+        'design_type': DesignTypeChoices.UI_UX,
+        'design_tool': '',
+        'design_file_url': '',
+        'feedback_notes': '',
+    }
+
     class Meta:
+        proxy = True
         verbose_name = "Design Task"
         verbose_name_plural = "Design Tasks"
+
+
+TASK_SUBTYPES = (DevelopmentTask, DesignTask)
+
+TASK_TYPE_MODELS = {model.TASK_TYPE: model for model in (Task,) + TASK_SUBTYPES}
+
+
+def resolve_task_subtypes(tasks):
+    """Give every task the proxy class of its ``task_type``.
+
+    Subtype columns are loaded with the row, so this runs no queries.
+    """
+    tasks = list(tasks)
+    for task in tasks:
+        if type(task) is Task and task.task_type != Task.TASK_TYPE:
+            task.__class__ = TASK_TYPE_MODELS[task.task_type]
+    return tasks
+
+
+class ProjectStats(models.Model):
+    """Denormalized task counters for a project.
+
+    Counters cover active tasks only and are updated with F-expressions on
+    every task write (see ``apps.projects.stats``); run
+    ``rebuild_project_stats`` to recompute them from the task table. Overdue
+    counts change with time alone and are counted when read instead.
+    """
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    total_tasks = models.IntegerField(default=0)
+    completed_tasks = models.IntegerField(default=0)
+    in_progress_tasks = models.IntegerField(default=0)
+    blocked_tasks = models.IntegerField(default=0)
+    estimated_hours = models.BigIntegerField(default=0)
+    actual_hours = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Project Stats"
+        verbose_name_plural = "Project Stats"
+
+    def __str__(self):
+        return f"Stats for project {self.project_id}"
+
+    @property
+    def progress_percentage(self):
+        if self.total_tasks <= 0:
+            return 0
+        return round((self.completed_tasks / self.total_tasks) * 100, 2)
+
+
+class TaskStatusEvent(models.Model):
+    """Append-only log of task status changes.
+
+    ``from_status`` is blank for the event recorded when a task is created.
+    ``project`` is copied from the task so history can be read per project
+    without a join.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='status_events')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='status_events')
+    from_status = models.CharField(max_length=20, choices=Task.StatusChoices.choices, blank=True)
+    to_status = models.CharField(max_length=20, choices=Task.StatusChoices.choices)
+    changed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='task_status_events'
+    )
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['changed_at', 'id']
+        indexes = [
+            models.Index(fields=['changed_at']),
+            models.Index(fields=['project', 'changed_at']),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id}: {self.from_status or 'created'} -> {self.to_status}"
+
+
+class ProjectDailySnapshot(models.Model):
+    """A project's task counters at the end of a day, plus that day's throughput.
+
+    Written once a day by ``rollup_project_snapshots`` from ``ProjectStats``
+    and the day's ``TaskStatusEvent`` rows; burndown and velocity read only
+    these rows.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='daily_snapshots')
+    date = models.DateField()
+    total_tasks = models.IntegerField(default=0)
+    completed_tasks = models.IntegerField(default=0)
+    in_progress_tasks = models.IntegerField(default=0)
+    blocked_tasks = models.IntegerField(default=0)
+    overdue_tasks = models.IntegerField(default=0)
+    estimated_hours = models.BigIntegerField(default=0)
+    actual_hours = models.BigIntegerField(default=0)
+    created_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['project', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'date'], name='unique_project_snapshot_date'),
+        ]
+
+    def __str__(self):
+        return f"Project {self.project_id} on {self.date}"
+
+    @property
+    def remaining_tasks(self):
+        return self.total_tasks - self.completed_tasks
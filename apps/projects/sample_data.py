@@ -0,0 +1,195 @@
+"""Deterministic, production-sized sample data for performance work.
+
+The same ``seed`` always produces the same users, projects and tasks (dates
+are relative to the day the generator runs). Rows are written with
+multi-row INSERTs through :func:`apps.projects.bulk.insert_tasks`, one
+transaction per batch; ``ProjectStats`` is rebuilt once at the end instead of
+per batch, and no notifications or status events are produced.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import router, transaction
+from django.utils import timezone
+
+from .bulk import insert_tasks
+from .models import DesignTask, DevelopmentTask, Project, Task
+from .stats import rebuild_project_stats
+
+SAMPLE_PASSWORD = 'password123'
+
+# Relative weights of each choice
+TASK_STATUS_WEIGHTS = {
+    Task.StatusChoices.TODO: 30,
+    Task.StatusChoices.IN_PROGRESS: 20,
+    Task.StatusChoices.REVIEW: 10,
+    Task.StatusChoices.BLOCKED: 5,
+    Task.StatusChoices.COMPLETED: 35,
+}
+TASK_PRIORITY_WEIGHTS = {
+    Task.PriorityChoices.LOW: 25,
+    Task.PriorityChoices.MEDIUM: 45,
+    Task.PriorityChoices.HIGH: 22,
+    Task.PriorityChoices.URGENT: 8,
+}
+PROJECT_STATUS_WEIGHTS = {
+    Project.StatusChoices.PLANNING: 15,
+    Project.StatusChoices.IN_PROGRESS: 50,
+    Project.StatusChoices.REVIEW: 10,
+    Project.StatusChoices.COMPLETED: 20,
+    Project.StatusChoices.ON_HOLD: 5,
+}
+TASK_MODEL_WEIGHTS = {Task: 20, DevelopmentTask: 50, DesignTask: 30}
+
+TITLE_VERBS = ('Implement', 'Fix', 'Review', 'Design', 'Refactor', 'Document', 'Test', 'Migrate')
+TITLE_NOUNS = (
+    'checkout flow', 'login page', 'search API', 'invoice export', 'dashboard',
+    'notification emails', 'user settings', 'payment gateway', 'onboarding', 'reports',
+)
+PROJECT_NAMES = ('Platform', 'Mobile App', 'Website', 'Data Pipeline', 'Billing', 'Analytics')
+DESIGN_TOOLS = ('Figma', 'Sketch', 'Adobe XD', '')
+
+# Share of tasks without an assignee
+UNASSIGNED_RATE = 0.1
+# Due dates fall this many days around today; past ones make overdue tasks
+DUE_DAYS_BEFORE = 60
+DUE_DAYS_AFTER = 90
+
+
+class Weighted:
+    """``random.choices`` over a fixed ``{value: weight}`` mapping"""
+
+    def __init__(self, weights):
+        self.values = list(weights)
+        self.cum_weights = []
+        total = 0
+        for value in self.values:
+            total += weights[value]
+            self.cum_weights.append(total)
+
+    def pick(self, rng):
+        return rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+
+def generate_sample_data(users, projects, tasks, seed=0, batch_size=5000, using=None, log=None):
+    """Create ``users`` users, ``projects`` projects and ``tasks`` tasks.
+
+    Project sizes follow a Pareto distribution, so a few projects hold most of
+    the tasks. Tasks already overdue are marked as notified, as the overdue
+    scan would have done. Returns ``(users, projects, tasks)`` created.
+    """
+    using = using or router.db_for_write(Task)
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+
+    user_ids = _create_users(users, seed, batch_size, using)
+    log(f'Created {len(user_ids)} users')
+    project_members = _create_projects(projects, user_ids, rng, batch_size, using)
+    log(f'Created {len(project_members)} projects')
+
+    project_ids = list(project_members)
+    project_picker = Weighted({pk: rng.paretovariate(1.2) for pk in project_ids})
+    statuses = Weighted(TASK_STATUS_WEIGHTS)
+    priorities = Weighted(TASK_PRIORITY_WEIGHTS)
+    models = Weighted(TASK_MODEL_WEIGHTS)
+    creator = user_ids[0]
+    now = timezone.now()
+
+    created = 0
+    while created < tasks:
+        count = min(batch_size, tasks - created)
+        by_model = {model: [] for model in TASK_MODEL_WEIGHTS}
+        for number in range(created, created + count):
+            model = models.pick(rng)
+            project_id = project_picker.pick(rng)
+            members = project_members[project_id]
+            status = statuses.pick(rng)
+            due_date = now + timedelta(
+                days=rng.randint(-DUE_DAYS_BEFORE, DUE_DAYS_AFTER), hours=rng.randint(0, 23)
+            )
+            estimated = rng.choice((1, 2, 3, 5, 8, 13, 21))
+            values = {
+                'title': f'{rng.choice(TITLE_VERBS)} {rng.choice(TITLE_NOUNS)} #{number + 1}',
+                'description': f'Generated task {number + 1}',
+                'project_id': project_id,
+                'assigned_to_id': None if rng.random() < UNASSIGNED_RATE else rng.choice(members),
+                'status': status,
+                'priority': priorities.pick(rng),
+                'due_date': due_date,
+                'estimated_hours': estimated,
+                'actual_hours': rng.randint(0, estimated * 2) if status == Task.StatusChoices.COMPLETED else 0,
+                'created_by_id': creator,
+            }
+            if due_date < now and status != Task.StatusChoices.COMPLETED:
+                values['overdue_notified_at'] = now
+            if model is DevelopmentTask:
+                values['technology'] = rng.choice(DevelopmentTask.TechnologyChoices.values)
+                values['branch_name'] = f'feature/task-{number + 1}'
+            elif model is DesignTask:
+                values['design_type'] = rng.choice(DesignTask.DesignTypeChoices.values)
+                values['design_tool'] = rng.choice(DESIGN_TOOLS)
+            by_model[model].append(model(**values))
+        with transaction.atomic(using=using):
+            for objs in by_model.values():
+                insert_tasks(objs, using=using)
+        created += count
+        log(f'Created {created}/{tasks} tasks')
+
+    rebuild_project_stats(project_ids, using=using)
+    return len(user_ids), len(project_ids), created
+
+
+def _create_users(count, seed, batch_size, using):
+    password = make_password(SAMPLE_PASSWORD)
+    usernames = [f'sample{seed}-user{i}' for i in range(1, count + 1)]
+    User.objects.using(using).bulk_create(
+        [
+            User(
+                username=username,
+                email=f'{username}@example.com',
+                first_name=f'User{i}',
+                last_name='Sample',
+                password=password,
+            )
+            for i, username in enumerate(usernames, start=1)
+        ],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    ids = dict(User.objects.using(using).filter(username__in=usernames).values_list('username', 'pk'))
+    return [ids[username] for username in usernames]
+
+
+def _create_projects(count, user_ids, rng, batch_size, using):
+    """Create projects and their members; returns ``{project_id: [user_id, ...]}``"""
+    today = timezone.localdate()
+    statuses = Weighted(PROJECT_STATUS_WEIGHTS)
+    objs = []
+    for i in range(1, count + 1):
+        start_date = today - timedelta(days=rng.randint(0, 180))
+        objs.append(Project(
+            name=f'{rng.choice(PROJECT_NAMES)} {i}',
+            description=f'Generated project {i}',
+            status=statuses.pick(rng),
+            start_date=start_date,
+            end_date=start_date + timedelta(days=rng.randint(30, 365)),
+            created_by_id=rng.choice(user_ids),
+        ))
+    with transaction.atomic(using=using):
+        Project.objects.using(using).bulk_create(objs, batch_size=batch_size)
+        members = {
+            project.pk: rng.sample(user_ids, min(len(user_ids), rng.randint(3, 8)))
+            for project in objs
+        }
+        Membership = Project.assigned_to.through
+        Membership.objects.using(using).bulk_create(
+            [
+                Membership(project_id=project_id, user_id=user_id)
+                for project_id, member_ids in members.items()
+                for user_id in member_ids
+            ],
+            batch_size=batch_size,
+        )
+    return members
@@ -0,0 +1,436 @@
+"""Indexed full-text search for projects and tasks.
+
+On PostgreSQL each table has a generated, weighted ``search_vector`` column
+with a GIN index; a task's subtype columns are weighted below its title and
+description. On SQLite the text is mirrored into FTS5 tables
+(``projects_project_fts`` and ``projects_task_fts``, keyed by rowid = primary
+key) by triggers, with the subtype text in the task row's ``detail`` column.
+Other backends fall back to DRF's ``icontains`` search over the view's
+``search_fields``. Entries of ``search_fields`` the index doesn't cover, such
+as ``project__name`` in the task admin, are still matched with ``icontains``
+alongside the indexed search.
+
+The ``icontains`` filters on task titles and project names go through
+:func:`contains`, backed by ``pg_trgm`` GIN indexes on PostgreSQL and FTS5
+trigram tables on SQLite.
+
+The indexes are created by migrations ``0006_search_index`` and
+``0007_trigram_index``; ``0009_single_table_tasks`` rebuilds the task index
+once the subtype columns have moved into ``projects_task``. SQLite drops a table's triggers whenever Django
+rebuilds the table in a later migration, so they are re-created after every
+``migrate``.
+"""
+import logging
+import operator
+import re
+from functools import reduce
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'english'
+
+# Subtype text of a task row; the columns of other task types are NULL.
+# ``{row}`` is the prefix of the row's columns.
+TASK_DETAIL = (
+    "trim(coalesce({row}technology, {row}design_type, '') || ' ' || "
+    "coalesce({row}branch_name, {row}design_tool, ''))"
+)
+
+POSTGRES_TASK_TEXT = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
+POSTGRES_TASK_DETAIL = f"setweight(to_tsvector('{SEARCH_CONFIG}', {TASK_DETAIL.format(row='')}), 'C')"
+
+POSTGRES_VECTORS = {
+    'projects_project': (
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+    ),
+    'projects_task': f"{POSTGRES_TASK_TEXT} || {POSTGRES_TASK_DETAIL}",
+}
+
+
+def sqlite_task_fts(subtype_columns=True):
+    """The ``projects_task_fts`` definition, with or without the subtype text"""
+    detail = TASK_DETAIL if subtype_columns else "''"
+    watched = 'title, description'
+    if subtype_columns:
+        watched += ', task_type, technology, branch_name, design_type, design_tool'
+    return (
+        "CREATE VIRTUAL TABLE projects_task_fts USING fts5("
+        "title, description, detail, tokenize='porter unicode61')",
+        "INSERT INTO projects_task_fts(rowid, title, description, detail) "
+        f"SELECT id, title, description, {detail.format(row='')} FROM projects_task",
+        {
+            'projects_task_fts_insert': f"""
+                AFTER INSERT ON projects_task BEGIN
+                    INSERT INTO projects_task_fts(rowid, title, description, detail)
+                    VALUES (new.id, new.title, new.description, {detail.format(row='new.')});
+                END""",
+            'projects_task_fts_update': f"""
+                AFTER UPDATE OF {watched} ON projects_task BEGIN
+                    UPDATE projects_task_fts SET title = new.title, description = new.description,
+                        detail = {detail.format(row='new.')}
+                    WHERE rowid = new.id;
+                END""",
+            'projects_task_fts_delete': """
+                AFTER DELETE ON projects_task BEGIN
+                    DELETE FROM projects_task_fts WHERE rowid = old.id;
+                END""",
+        },
+    )
+
+
+# SQLite shadow tables: (CREATE, backfill, {trigger name: trigger body})
+SQLITE_SHADOW_TABLES = {
+    'projects_project_fts': (
+        "CREATE VIRTUAL TABLE projects_project_fts USING fts5("
+        "name, description, tokenize='porter unicode61')",
+        "INSERT INTO projects_project_fts(rowid, name, description) "
+        "SELECT id, name, description FROM projects_project",
+        {
+            'projects_project_fts_insert': """
+                AFTER INSERT ON projects_project BEGIN
+                    INSERT INTO projects_project_fts(rowid, name, description)
+                    VALUES (new.id, new.name, new.description);
+                END""",
+            'projects_project_fts_update': """
+                AFTER UPDATE OF name, description ON projects_project BEGIN
+                    UPDATE projects_project_fts SET name = new.name, description = new.description
+                    WHERE rowid = new.id;
+                END""",
+            'projects_project_fts_delete': """
+                AFTER DELETE ON projects_project BEGIN
+                    DELETE FROM projects_project_fts WHERE rowid = old.id;
+                END""",
+        },
+    ),
+    'projects_task_fts': sqlite_task_fts(),
+    'projects_project_trgm': (
+        "CREATE VIRTUAL TABLE projects_project_trgm USING fts5("
+        "name, tokenize='trigram case_sensitive 0')",
+        "INSERT INTO projects_project_trgm(rowid, name) SELECT id, name FROM projects_project",
+        {
+            'projects_project_trgm_insert': """
+                AFTER INSERT ON projects_project BEGIN
+                    INSERT INTO projects_project_trgm(rowid, name) VALUES (new.id, new.name);
+                END""",
+            'projects_project_trgm_update': """
+                AFTER UPDATE OF name ON projects_project BEGIN
+                    UPDATE projects_project_trgm SET name = new.name WHERE rowid = new.id;
+                END""",
+            'projects_project_trgm_delete': """
+                AFTER DELETE ON projects_project BEGIN
+                    DELETE FROM projects_project_trgm WHERE rowid = old.id;
+                END""",
+        },
+    ),
+    'projects_task_trgm': (
+        "CREATE VIRTUAL TABLE projects_task_trgm USING fts5("
+        "title, tokenize='trigram case_sensitive 0')",
+        "INSERT INTO projects_task_trgm(rowid, title) SELECT id, title FROM projects_task",
+        {
+            'projects_task_trgm_insert': """
+                AFTER INSERT ON projects_task BEGIN
+                    INSERT INTO projects_task_trgm(rowid, title) VALUES (new.id, new.title);
+                END""",
+            'projects_task_trgm_update': """
+                AFTER UPDATE OF title ON projects_task BEGIN
+                    UPDATE projects_task_trgm SET title = new.title WHERE rowid = new.id;
+                END""",
+            'projects_task_trgm_delete': """
+                AFTER DELETE ON projects_task BEGIN
+                    DELETE FROM projects_task_trgm WHERE rowid = old.id;
+                END""",
+        },
+    ),
+}
+
+FULL_TEXT_TABLES = ('projects_project_fts', 'projects_task_fts')
+
+# Definitions for databases migrated to before 0009, where the subtype
+# columns are still in tables of their own
+PRE_SUBTYPE_COLUMNS = {
+    'projects_task': POSTGRES_TASK_TEXT,
+    'projects_task_fts': sqlite_task_fts(subtype_columns=False),
+}
+
+# Fields the full-text index covers for querysets of each table; querysets of
+# the task subtypes also match the subtype text
+INDEXED_FIELDS = {
+    'projects_project': {'name', 'description'},
+    'projects_task': {'title', 'description'},
+}
+INDEXED_SUBTYPE_FIELDS = {'technology', 'branch_name', 'design_type', 'design_tool'}
+
+# Columns filtered with ``icontains`` that have a substring index:
+# (table, column) -> SQLite trigram shadow table
+TRIGRAM_COLUMNS = {
+    ('projects_project', 'name'): 'projects_project_trgm',
+    ('projects_task', 'title'): 'projects_task_trgm',
+}
+
+
+def has_subtype_columns(cursor, connection):
+    columns = connection.introspection.get_table_description(cursor, Task._meta.db_table)
+    return any(column.name == 'task_type' for column in columns)
+
+
+def definition(definitions, table, cursor, connection):
+    """``definitions[table]``, or its pre-0009 form if the schema is that old"""
+    if table in PRE_SUBTYPE_COLUMNS and not has_subtype_columns(cursor, connection):
+        return PRE_SUBTYPE_COLUMNS[table]
+    return definitions[table]
+
+
+def install_sqlite_tables(cursor, connection, tables):
+    existing = set(connection.introspection.table_names(cursor))
+    for table in tables:
+        create, backfill, triggers = definition(SQLITE_SHADOW_TABLES, table, cursor, connection)
+        if table not in existing:
+            cursor.execute(create)
+            cursor.execute(backfill)
+        install_sqlite_triggers(cursor, triggers)
+
+
+def install_sqlite_triggers(cursor, triggers):
+    for name, body in triggers.items():
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+
+
+def drop_sqlite_tables(cursor, tables):
+    for table in tables:
+        for name in SQLITE_SHADOW_TABLES[table][2]:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+def install_search_index(connection):
+    """Create the full-text columns, tables, indexes and triggers (idempotent)"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for table in POSTGRES_VECTORS:
+                vector = definition(POSTGRES_VECTORS, table, cursor, connection)
+                cursor.execute(
+                    f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector '
+                    f'GENERATED ALWAYS AS ({vector}) STORED'
+                )
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} USING GIN (search_vector)'
+                )
+        elif connection.vendor == 'sqlite':
+            install_sqlite_tables(cursor, connection, FULL_TEXT_TABLES)
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for table in POSTGRES_VECTORS:
+                cursor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
+        elif connection.vendor == 'sqlite':
+            drop_sqlite_tables(cursor, FULL_TEXT_TABLES)
+
+
+def install_trigram_index(connection):
+    """Create substring indexes for ``TRIGRAM_COLUMNS`` where the backend can.
+
+    PostgreSQL needs the ``pg_trgm`` extension; if it is unavailable (or the
+    role may not create it) no index is created and filtering keeps working
+    without one.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            try:
+                with transaction.atomic(using=connection.alias):
+                    cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            except DatabaseError:
+                logger.warning('pg_trgm is not available; substring filters will not be indexed')
+                return
+            for table, column in TRIGRAM_COLUMNS:
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm_idx '
+                    f'ON {table} USING GIN ({column} gin_trgm_ops)'
+                )
+        elif connection.vendor == 'sqlite':
+            install_sqlite_tables(cursor, connection, TRIGRAM_COLUMNS.values())
+
+
+def drop_trigram_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for table, column in TRIGRAM_COLUMNS:
+                cursor.execute(f'DROP INDEX IF EXISTS {table}_{column}_trgm_idx')
+        elif connection.vendor == 'sqlite':
+            drop_sqlite_tables(cursor, TRIGRAM_COLUMNS.values())
+
+
+def repair_search_index(connection):
+    """Re-create SQLite triggers dropped by table rebuilds in migrations"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        existing = set(connection.introspection.table_names(cursor))
+        for table in SQLITE_SHADOW_TABLES:
+            if table in existing:
+                install_sqlite_triggers(cursor, definition(SQLITE_SHADOW_TABLES, table, cursor, connection)[2])
+
+
+def search_supported(using):
+    return connections[using].vendor in ('postgresql', 'sqlite')
+
+
+def _fts5_query(terms):
+    """Quote every word so user input can't use FTS5 query syntax"""
+    words = re.findall(r'\w+', terms)
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def indexed_fields(model):
+    fields = INDEXED_FIELDS.get(model._meta.db_table, set())
+    if issubclass(model, Task) and model is not Task:
+        fields = fields | INDEXED_SUBTYPE_FIELDS
+    return fields
+
+
+# Lookups for the ``search_fields`` prefixes shared by DRF and the admin
+LOOKUP_PREFIXES = {'^': 'istartswith', '=': 'iexact', '@': 'search', '$': 'iregex'}
+
+
+def unindexed_matches(model, search_fields, terms):
+    """``Q`` for the rows matching ``terms`` in ``search_fields`` outside the index.
+
+    Each term has to match one of the fields, as in DRF's and the admin's own
+    search; ``None`` when the index covers every field.
+    """
+    lookups = []
+    for field in search_fields or ():
+        lookup = LOOKUP_PREFIXES.get(field[:1])
+        name = field[1:] if lookup else field
+        if name not in indexed_fields(model):
+            lookups.append(f'{name}__{lookup or "icontains"}')
+    if not lookups or not terms:
+        return None
+    condition = reduce(operator.and_, (
+        reduce(operator.or_, (Q(**{lookup: term}) for lookup in lookups)) for term in terms
+    ))
+    # A subquery, so matches through multi-valued relations don't repeat rows
+    return Q(pk__in=model._base_manager.filter(condition).values('pk'))
+
+
+def search(queryset, terms, also=None):
+    """Filter ``queryset`` to rows matching ``terms`` and annotate ``search_rank``.
+
+    Higher ranks are better matches. Plain ``Task`` querysets only match the
+    title and description; subtype querysets also match their own fields.
+    Rows matching the ``Q`` ``also`` are kept too, ranked below every match.
+    """
+    model = queryset.model
+    connection = connections[queryset.db]
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    pk = f'{table}.{qn(model._meta.pk.column)}'
+
+    if connection.vendor == 'postgresql':
+        vector = f'{table}.search_vector'
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        # The bare column is what the GIN index covers
+        condition, params = f'{vector} @@ {tsquery}', [terms]
+        if model is Task:
+            # Leave out the subtype text (weight C), rechecking only the rows the index found
+            vector = f"ts_filter({vector}, '{{a,b}}')"
+            condition, params = f'{condition} AND {vector} @@ {tsquery}', [terms, terms]
+        matches = Q(RawSQL(condition, params, output_field=BooleanField()))
+        return queryset.filter(
+            matches if also is None else matches | also
+        ).annotate(
+            search_rank=RawSQL(f'ts_rank({vector}, {tsquery})', [terms], output_field=FloatField())
+        )
+
+    query = _fts5_query(terms)
+    if not query:
+        return queryset if also is None else queryset.filter(also)
+    if issubclass(model, Task):
+        fts, weights = 'projects_task_fts', '10.0, 1.0, 5.0'
+        if model is Task:
+            query = f'{{title description}} : ({query})'
+    else:
+        fts, weights = 'projects_project_fts', '10.0, 1.0'
+    matches = Q(pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [query]))
+    return queryset.filter(
+        matches if also is None else matches | also
+    ).annotate(
+        # bm25() is lower for better matches; NULL for rows matched by ``also``
+        search_rank=RawSQL(
+            f'SELECT -bm25({fts}, {weights}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {pk}',
+            [query],
+            output_field=FloatField(),
+        )
+    )
+
+
+def contains(queryset, field_name, value):
+    """``icontains`` that uses a substring index when the column has one.
+
+    On PostgreSQL this is ``ILIKE`` (Django's ``UPPER(...) LIKE`` can't use a
+    trigram index). On SQLite the trigram FTS5 table is probed with ``LIKE``,
+    which needs at least three characters and no wildcards in ``value``.
+    """
+    field = queryset.model._meta.get_field(field_name)
+    table = field.model._meta.db_table
+    shadow = TRIGRAM_COLUMNS.get((table, field.column))
+    connection = connections[queryset.db]
+    if shadow is not None and connection.vendor == 'postgresql':
+        qn = connection.ops.quote_name
+        pattern = f'%{connection.ops.prep_for_like_query(value)}%'
+        return queryset.filter(
+            RawSQL(f'{qn(table)}.{qn(field.column)} ILIKE %s', [pattern], output_field=BooleanField())
+        )
+    if (
+        shadow is not None and connection.vendor == 'sqlite' and len(value) >= 3
+        and not any(char in value for char in '%_\\')
+    ):
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {shadow} WHERE {field.column} LIKE %s', [f'%{value}%']
+        ))
+    return queryset.filter(**{f'{field_name}__icontains': value})
+
+
+class FullTextSearchFilter(SearchFilter):
+    """``?search=`` backed by the full-text index, ordered by relevance.
+
+    Results are ranked unless the client passes ``?ordering=``, so list this
+    backend after ``OrderingFilter``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '').strip()
+        if not terms:
+            return queryset
+        if not search_supported(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+        also = unindexed_matches(
+            queryset.model, self.get_search_fields(view, request), self.get_search_terms(request)
+        )
+        queryset = search(queryset, terms, also)
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-search_rank', '-pk')
+        return queryset
+
+
+class FullTextSearchAdminMixin:
+    """Admin changelist search through the full-text index"""
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term.strip() and search_supported(queryset.db):
+            also = unindexed_matches(queryset.model, self.get_search_fields(request), search_term.split())
+            return search(queryset, search_term, also), False
+        return super().get_search_results(request, queryset, search_term)
@@ -1,14 +1,107 @@
 from rest_framework import serializers
+from rest_framework.fields import empty
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
+from apps.core.metrics import serializer_timer
 from .models import Project, Task, DevelopmentTask, DesignTask
 
-class UserSerializer(serializers.ModelSerializer):
+
+def nested_paths(paths, name):
+    """Strip ``name.`` from dotted ``paths`` for a nested serializer"""
+    if paths is None:
+        return None
+    prefix = f'{name}.'
+    return {path[len(prefix):] for path in paths if path.startswith(prefix)}
+
+
+class DynamicFieldsMixin:
+    """Sparse fieldsets and opt-in expansion of related objects.
+
+    ``fields`` limits the readable fields that are rendered and ``expand``
+    names the entries of ``Meta.expandable_fields`` to nest in full. Both
+    accept dotted paths (``tasks.assigned_to``) for nested serializers. When
+    not passed explicitly they are read from the serializer context, which
+    the viewsets fill from the ``?fields=`` and ``?expand=`` query params.
+    An expandable field that is not expanded falls back to its declared
+    field (usually a primary key) or is left out if none is declared.
+    """
+
+    def __init__(self, *args, fields=empty, expand=empty, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._requested_fields = fields
+        self._expand = expand
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self._requested_fields
+        if requested is empty:
+            requested = self.context.get('fields')
+        expand = self._expand
+        if expand is empty:
+            expand = self.context.get('expand')
+        expand = expand or set()
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name, (serializer_class, options) in expandable.items():
+            if name not in fields:
+                continue
+            if name in expand:
+                fields[name] = serializer_class(
+                    read_only=True,
+                    fields=nested_paths(requested, name) or None,
+                    expand=nested_paths(expand, name),
+                    **options
+                )
+            elif name not in self._declared_fields:
+                del fields[name]
+
+        if requested is not None:
+            top_level = {path.split('.', 1)[0] for path in requested}
+            for name in list(fields):
+                if name not in top_level and not fields[name].write_only:
+                    del fields[name]
+        return fields
+
+    def to_representation(self, instance):
+        # Counted once per top-level object for the Server-Timing header
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field that resolves ids from objects preloaded into the context.
+
+    Bulk endpoints put ``{Model: {pk: obj}}`` under ``context['preloaded']``
+    so validating a thousand rows doesn't run a thousand lookups.
+    """
+
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        preloaded = self.context.get('preloaded', {}).get(model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            pk = model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in preloaded:
+            self.fail('does_not_exist', pk_value=data)
+        return preloaded[pk]
+
+
+def subtype_extra_kwargs(model):
+    """Subtype columns are only nullable for tasks of other types"""
+    return {name: {'allow_null': False} for name in model.SUBTYPE_DEFAULTS}
+
+
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
 
-class TaskSerializer(serializers.ModelSerializer):
-    assigned_to = UserSerializer(read_only=True)
+class TaskSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    project = PreloadedPrimaryKeyRelatedField(queryset=Project.objects.all())
+    assigned_to = serializers.PrimaryKeyRelatedField(read_only=True)
     assigned_to_id = serializers.IntegerField(write_only=True, required=False)
     task_type = serializers.ReadOnlyField()
     is_overdue = serializers.ReadOnlyField()
@@ -21,10 +114,15 @@ class TaskSerializer(serializers.ModelSerializer):
             'estimated_hours', 'actual_hours', 'task_type', 'is_overdue',
             'created_at', 'updated_at'
         ]
+        expandable_fields = {
+            'assigned_to': (UserSerializer, {}),
+        }
 
-class DevelopmentTaskSerializer(serializers.ModelSerializer):
-    assigned_to = UserSerializer(read_only=True)
+class DevelopmentTaskSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    project = PreloadedPrimaryKeyRelatedField(queryset=Project.objects.all())
+    assigned_to = serializers.PrimaryKeyRelatedField(read_only=True)
     assigned_to_id = serializers.IntegerField(write_only=True, required=False)
+    task_type = serializers.ReadOnlyField()
     is_overdue = serializers.ReadOnlyField()
     
     class Meta:
@@ -34,12 +132,18 @@ class DevelopmentTaskSerializer(serializers.ModelSerializer):
             'assigned_to_id', 'status', 'priority', 'due_date', 
             'estimated_hours', 'actual_hours', 'technology', 
             'repository_url', 'branch_name', 'pull_request_url',
-            'is_overdue', 'created_at', 'updated_at'
+            'task_type', 'is_overdue', 'created_at', 'updated_at'
         ]
+        extra_kwargs = subtype_extra_kwargs(DevelopmentTask)
+        expandable_fields = {
+            'assigned_to': (UserSerializer, {}),
+        }
 
-class DesignTaskSerializer(serializers.ModelSerializer):
-    assigned_to = UserSerializer(read_only=True)
+class DesignTaskSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    project = PreloadedPrimaryKeyRelatedField(queryset=Project.objects.all())
+    assigned_to = serializers.PrimaryKeyRelatedField(read_only=True)
     assigned_to_id = serializers.IntegerField(write_only=True, required=False)
+    task_type = serializers.ReadOnlyField()
     is_overdue = serializers.ReadOnlyField()
     
     class Meta:
@@ -49,17 +153,53 @@ class DesignTaskSerializer(serializers.ModelSerializer):
             'assigned_to_id', 'status', 'priority', 'due_date', 
             'estimated_hours', 'actual_hours', 'design_type', 
             'design_tool', 'design_file_url', 'feedback_notes',
-            'is_overdue', 'created_at', 'updated_at'
+            'task_type', 'is_overdue', 'created_at', 'updated_at'
         ]
+        extra_kwargs = subtype_extra_kwargs(DesignTask)
+        expandable_fields = {
+            'assigned_to': (UserSerializer, {}),
+        }
+
+class PolymorphicTaskSerializer(TaskSerializer):
+    """Read-only task serializer that renders each row with its subtype serializer.
+
+    Expects rows to carry their proxy class (see ``resolve_task_subtypes``);
+    the subtype columns are part of every task row, so nothing is queried.
+    """
+    subtype_serializers = {
+        DevelopmentTask: DevelopmentTaskSerializer,
+        DesignTask: DesignTaskSerializer,
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._subtype_instances = {}
+
+    def get_subtype_serializer(self, model):
+        if model not in self._subtype_instances:
+            self._subtype_instances[model] = self.subtype_serializers[model](
+                context=self.context,
+                fields=self._requested_fields,
+                expand=self._expand,
+            )
+        return self._subtype_instances[model]
+
+    def to_representation(self, instance):
+        if type(instance) in self.subtype_serializers:
+            return self.get_subtype_serializer(type(instance)).to_representation(instance)
+        return super().to_representation(instance)
+
+class BulkTransitionSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    status = serializers.ChoiceField(choices=Task.StatusChoices.choices)
 
-class ProjectSerializer(serializers.ModelSerializer):
-    assigned_to = UserSerializer(many=True, read_only=True)
+class ProjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    assigned_to = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     assigned_to_ids = serializers.ListField(
         child=serializers.IntegerField(), 
         write_only=True, 
         required=False
     )
-    tasks = TaskSerializer(many=True, read_only=True)
     tasks_count = serializers.SerializerMethodField()
     progress_percentage = serializers.ReadOnlyField()
     is_overdue = serializers.ReadOnlyField()
@@ -72,9 +212,13 @@ class ProjectSerializer(serializers.ModelSerializer):
             'tasks_count', 'progress_percentage', 'is_overdue',
             'created_at', 'updated_at'
         ]
+        expandable_fields = {
+            'assigned_to': (UserSerializer, {'many': True}),
+            'tasks': (TaskSerializer, {'many': True}),
+        }
     
     def get_tasks_count(self, obj):
-        return obj.tasks.count()
+        return obj.task_stats.total_tasks
     
     def create(self, validated_data):
         assigned_to_ids = validated_data.pop('assigned_to_ids', [])
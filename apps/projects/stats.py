@@ -0,0 +1,160 @@
+"""Maintenance of the denormalized ProjectStats counters.
+
+Writes apply per-project deltas with F-expressions so concurrent writers
+never lose updates: single rows from the model signals, and the bulk paths in
+``apps.projects.bulk`` that bypass ``save()`` through :func:`apply_deltas`.
+:func:`rebuild_project_stats` recomputes the counters from the task table, for
+projects missing a stats row, sample data and the management command.
+
+Overdue counts are not stored: a task becomes overdue when its due date
+passes, without any write to apply a delta. :func:`overdue_counts` counts
+them at read time through the partial index behind ``Task.objects.overdue()``.
+"""
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.core.cache import GLOBAL_SCOPE, bump_versions, project_scopes
+
+from .models import Project, ProjectStats, Task
+
+COUNTER_FIELDS = (
+    'total_tasks', 'completed_tasks', 'in_progress_tasks', 'blocked_tasks',
+    'estimated_hours', 'actual_hours',
+)
+
+
+def contribution(state):
+    """Counter values a task in ``state`` adds to its project's stats"""
+    if not state or not state['is_active']:
+        return {}
+    status = state['status']
+    return {
+        'total_tasks': 1,
+        'completed_tasks': int(status == Task.StatusChoices.COMPLETED),
+        'in_progress_tasks': int(status == Task.StatusChoices.IN_PROGRESS),
+        'blocked_tasks': int(status == Task.StatusChoices.BLOCKED),
+        'estimated_hours': state['estimated_hours'] or 0,
+        'actual_hours': state['actual_hours'] or 0,
+    }
+
+
+def _overdue_tasks(using=None):
+    return Task.objects.using(using).filter(is_active=True).overdue()
+
+
+def overdue_counts(project_ids=None, using=None):
+    """``{project_id: overdue task count}``, with one grouped COUNT"""
+    tasks = _overdue_tasks(using)
+    if project_ids is not None:
+        tasks = tasks.filter(project_id__in=list(project_ids))
+    return dict(tasks.order_by().values('project_id').annotate(count=Count('id')).values_list('project_id', 'count'))
+
+
+def overdue_count_subquery():
+    """The overdue task count of the project at ``OuterRef('pk')``, for annotations"""
+    counts = (
+        _overdue_tasks().filter(project_id=OuterRef('pk'))
+        .order_by().values('project_id').annotate(count=Count('id')).values('count')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def task_state(task):
+    return {f: getattr(task, f) for f in Task.TRACKED_FIELDS}
+
+
+def add_delta(deltas, old_state, new_state):
+    """Accumulate the change from ``old_state`` to ``new_state`` into ``deltas``"""
+    if old_state:
+        for field, value in contribution(old_state).items():
+            deltas[old_state['project_id']][field] -= value
+    if new_state:
+        for field, value in contribution(new_state).items():
+            deltas[new_state['project_id']][field] += value
+    return deltas
+
+
+def new_deltas():
+    return defaultdict(lambda: defaultdict(int))
+
+
+def apply_deltas(deltas, using=None, create_missing=True):
+    """Apply per-project counter deltas atomically.
+
+    Projects without a stats row are rebuilt from scratch when
+    ``create_missing`` is set; deletes pass ``False`` because the project may
+    be going away in the same transaction. Rows are updated in project id
+    order, so concurrent writers lock them in the same order and can't
+    deadlock.
+    """
+    missing = []
+    with transaction.atomic(using=using):
+        for project_id, delta in sorted(deltas.items()):
+            changes = {field: F(field) + value for field, value in delta.items() if value}
+            if not changes:
+                continue
+            updated = ProjectStats.objects.using(using).filter(project_id=project_id).update(
+                updated_at=timezone.now(), **changes
+            )
+            if not updated:
+                missing.append(project_id)
+        if missing and create_missing:
+            rebuild_project_stats(missing, using=using)
+
+
+def rebuild_project_stats(project_ids=None, using=None, batch_size=1000):
+    """Recompute stats from the task table with one grouped aggregate query.
+
+    The rebuilt projects' cached API responses are invalidated as well, since
+    callers use this after writes that bypass the model signals. Returns the
+    number of stats rows written.
+    """
+    # Count on the database the stats are written to; a replica may lag behind it
+    tasks = Task.objects.using(using or DEFAULT_DB_ALIAS).filter(is_active=True)
+    projects = Project.objects.using(using or DEFAULT_DB_ALIAS).all()
+    if project_ids is not None:
+        project_ids = list(project_ids)
+        tasks = tasks.filter(project_id__in=project_ids)
+        projects = projects.filter(pk__in=project_ids)
+
+    rows = tasks.order_by().values('project_id').annotate(
+        total_tasks=Count('id'),
+        completed_tasks=Count('id', filter=Q(status=Task.StatusChoices.COMPLETED)),
+        in_progress_tasks=Count('id', filter=Q(status=Task.StatusChoices.IN_PROGRESS)),
+        blocked_tasks=Count('id', filter=Q(status=Task.StatusChoices.BLOCKED)),
+        estimated_hours=Sum('estimated_hours'),
+        actual_hours=Sum('actual_hours'),
+    )
+    counters = {row.pop('project_id'): row for row in rows}
+
+    written = 0
+    batch = []
+    now = timezone.now()
+    for project_id in projects.values_list('pk', flat=True).iterator():
+        values = counters.get(project_id, {})
+        batch.append(ProjectStats(
+            project_id=project_id,
+            updated_at=now,
+            **{field: values.get(field) or 0 for field in COUNTER_FIELDS}
+        ))
+        if len(batch) >= batch_size:
+            written += _upsert(batch, using)
+            batch = []
+    if batch:
+        written += _upsert(batch, using)
+    bump_versions([GLOBAL_SCOPE] if project_ids is None else project_scopes(project_ids), using=using)
+    return written
+
+
+def _upsert(batch, using):
+    ProjectStats.objects.using(using).bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['project'],
+        update_fields=list(COUNTER_FIELDS) + ['updated_at'],
+    )
+    return len(batch)
@@ -1,99 +1,183 @@
-from celery import shared_task
-from django.core.mail import send_mail
+from celery import group, shared_task
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q
 from django.utils import timezone
 from .models import Task
+from apps.core.cache import bump_versions, project_scopes
+from apps.core.metrics import count_task_rows
+from apps.core.replicas import reporting, use_primary
+from apps.core.notifications import (
+    daily_summary_email,
+    deliver_overdue_notifications,
+    deliver_task_created_notifications,
+    send_messages,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+@shared_task(bind=True, max_retries=5)
+def send_task_created_notifications(self, task_ids):
+    """Send 'new task' emails for a batch of tasks over one mail connection.
+
+    Failed messages are retried with exponential backoff; only the tasks whose
+    email failed are sent again.
+    """
+    sent, failed = deliver_task_created_notifications(task_ids)
+    count_task_rows(sent)
+    if failed:
+        raise self.retry(args=[failed], countdown=min(30 * 2 ** self.request.retries, 3600))
+    return sent
+
 @shared_task
-def mark_overdue_tasks():
-    """Mark overdue tasks and send notifications"""
-    overdue_tasks = []
-    
-    for task in Task.objects.filter(is_active=True, status__in=['todo', 'in_progress']):
-        if task.is_overdue:
-            overdue_tasks.append(task)
-    
-    if overdue_tasks:
-        logger.info(f"Found {len(overdue_tasks)} overdue tasks")
-        
-        # Send notifications to assigned users
-        for task in overdue_tasks:
-            if task.assigned_to and task.assigned_to.email:
-                send_overdue_notification.delay(task.id)
-    
-    return f"Processed {len(overdue_tasks)} overdue tasks"
+def mark_overdue_tasks(chunk_size=None):
+    """Notify assignees of overdue tasks that haven't been notified yet.
+
+    The scan reads the partial index of unnotified open tasks, so it has no
+    lower bound on the due date: a task created already past due, or whose
+    due date moved earlier, is picked up by the next run. Rows are read in
+    chunks of ``chunk_size``; each chunk is claimed by setting
+    ``overdue_notified_at`` so every task is emailed once, even when runs
+    overlap. The scan reads the primary so it never claims from stale rows.
+    """
+    chunk_size = chunk_size or getattr(settings, 'OVERDUE_SCAN_CHUNK_SIZE', 1000)
+    with use_primary():
+        return _mark_overdue_tasks(chunk_size)
+
+def _mark_overdue_tasks(chunk_size):
+    now = timezone.now()
+    window = Task.objects.filter(
+        is_active=True,
+        status__in=[Task.StatusChoices.TODO, Task.StatusChoices.IN_PROGRESS],
+        due_date__lt=now,
+        overdue_notified_at__isnull=True,
+    )
+
+    processed = 0
+    chunk = []
+    for pk in window.order_by('due_date', 'pk').values_list('pk', flat=True).iterator(chunk_size=chunk_size):
+        chunk.append(pk)
+        if len(chunk) >= chunk_size:
+            processed += _notify_overdue_chunk(chunk, now)
+            chunk = []
+    if chunk:
+        processed += _notify_overdue_chunk(chunk, now)
+
+    count_task_rows(processed)
+    if processed:
+        logger.info(f"Found {processed} newly overdue tasks")
+    return f"Processed {processed} overdue tasks"
+
+def _notify_overdue_chunk(task_ids, now):
+    """Claim a chunk of overdue tasks and queue their emails after commit"""
+    with transaction.atomic():
+        claimed = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=task_ids, overdue_notified_at__isnull=True)
+            .values_list('pk', 'project_id', 'assigned_to_id')
+        )
+        if not claimed:
+            return 0
+        Task.objects.filter(pk__in=[pk for pk, _, _ in claimed]).update(overdue_notified_at=now)
+        # The tasks just crossed their due date, so cached summaries are stale
+        bump_versions(project_scopes(project_id for _, project_id, _ in claimed))
+
+        notify = [pk for pk, _, assignee in claimed if assignee is not None]
+        batch_size = getattr(settings, 'TASK_NOTIFICATIONS_BATCH_SIZE', 100)
+
+        def dispatch():
+            for start in range(0, len(notify), batch_size):
+                send_overdue_notifications.delay(notify[start:start + batch_size])
+
+        transaction.on_commit(dispatch)
+    return len(claimed)
+
+@shared_task(bind=True, max_retries=5)
+def send_overdue_notifications(self, task_ids):
+    """Send overdue emails for a batch of tasks over one mail connection"""
+    sent, failed = deliver_overdue_notifications(task_ids)
+    count_task_rows(sent)
+    if failed:
+        raise self.retry(args=[failed], countdown=min(30 * 2 ** self.request.retries, 3600))
+    return sent
 
 @shared_task
 def send_overdue_notification(task_id):
     """Send overdue task notification"""
-    try:
-        task = Task.objects.get(id=task_id)
-        if task.assigned_to and task.assigned_to.email:
-            subject = f'Overdue Task: {task.title}'
-            message = f"""
-            Hi {task.assigned_to.first_name or task.assigned_to.username},
-
-            The following task is overdue:
-
-            Task: {task.title}
-            Project: {task.project.name}
-            Due Date: {task.due_date.strftime('%Y-%m-%d %H:%M')}
-            Priority: {task.get_priority_display()}
-
-            Please update the task status or contact your project manager.
-
-            Best regards,
-            Project Management Team
-            """
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [task.assigned_to.email],
-                fail_silently=False,
-            )
-            logger.info(f"Overdue notification sent for task {task.id}")
-    except Task.DoesNotExist:
-        logger.error(f"Task {task_id} not found for overdue notification")
-    except Exception as e:
-        logger.error(f"Failed to send overdue notification: {str(e)}")
+    sent, failed = deliver_overdue_notifications([task_id])
+    count_task_rows(sent)
+    if sent:
+        logger.info(f"Overdue notification sent for task {task_id}")
 
 @shared_task
-def send_daily_summary():
-    """Send daily task summary to users"""
+def send_daily_summary(shard_size=None):
+    """Fan the daily summary out to one subtask per range of user ids"""
     from django.contrib.auth.models import User
-    
-    for user in User.objects.filter(is_active=True, email__isnull=False):
-        user_tasks = Task.objects.filter(assigned_to=user, is_active=True)
-        overdue_count = len([t for t in user_tasks if t.is_overdue])
-        due_today_count = user_tasks.filter(
-            due_date__date=timezone.now().date()
-        ).count()
-        
-        if overdue_count > 0 or due_today_count > 0:
-            subject = 'Daily Task Summary'
-            message = f"""
-            Hi {user.first_name or user.username},
-
-            Your daily task summary:
-            - Overdue tasks: {overdue_count}
-            - Tasks due today: {due_today_count}
-            - Total active tasks: {user_tasks.count()}
-
-            Please check your dashboard for details.
-
-            Best regards,
-            Project Management Team
-            """
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=True,
-            )
+
+    shard_size = shard_size or getattr(settings, 'DAILY_SUMMARY_SHARD_SIZE', 1000)
+    with reporting():
+        bounds = User.objects.filter(is_active=True).aggregate(first=Min('id'), last=Max('id'))
+    if bounds['first'] is None:
+        return 0
+    shards = [
+        send_daily_summary_shard.s(start, min(start + shard_size - 1, bounds['last']))
+        for start in range(bounds['first'], bounds['last'] + 1, shard_size)
+    ]
+    group(shards).apply_async()
+    return len(shards)
+
+@shared_task
+def send_daily_summary_shard(first_user_id, last_user_id):
+    """Email the daily summary to active users with ids in the given range.
+
+    The per-user counts come from a single grouped query over the shard's
+    tasks, and the mail goes out over one connection.
+    """
+    now = timezone.now()
+    rows = (
+        Task.objects.filter(
+            is_active=True,
+            assigned_to__gte=first_user_id,
+            assigned_to__lte=last_user_id,
+            assigned_to__is_active=True,
+        )
+        .exclude(assigned_to__email='')
+        .order_by()
+        .values(
+            'assigned_to_id',
+            username=F('assigned_to__username'),
+            first_name=F('assigned_to__first_name'),
+            email=F('assigned_to__email'),
+        )
+        .annotate(
+            total=Count('id'),
+            overdue=Count('id', filter=Task.objects.overdue_q()),
+            due_today=Count('id', filter=Q(due_date__date=timezone.localdate(now))),
+        )
+        .filter(Q(overdue__gt=0) | Q(due_today__gt=0))
+    )
+    with reporting():
+        sent, failed = send_messages(
+            (row['assigned_to_id'], daily_summary_email(row)) for row in rows.iterator()
+        )
+    count_task_rows(sent)
+    logger.info(f"Sent {sent} daily summaries for users {first_user_id}-{last_user_id}, {len(failed)} failed")
+    return sent
+
+@shared_task
+def rollup_project_snapshots(day=None):
+    """Write yesterday's (or ``day``'s, ISO date) burndown/velocity snapshots.
+
+    Beat runs this just after midnight, so the whole of yesterday's events
+    are counted.
+    """
+    from datetime import date, timedelta
+    from .history import rollup_project_snapshots as rollup
+
+    day = date.fromisoformat(day) if day else timezone.localdate() - timedelta(days=1)
+    with reporting():
+        written = rollup(day)
+    count_task_rows(written)
+    logger.info(f"Wrote {written} project snapshots")
+    return written
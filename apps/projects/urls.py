@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import ProjectViewSet, TaskViewSet, DevelopmentTaskViewSet, DesignTaskViewSet
 
 router = DefaultRouter()
@@ -8,6 +9,18 @@ router.register(r'tasks', TaskViewSet)
 router.register(r'development-tasks', DevelopmentTaskViewSet)
 router.register(r'design-tasks', DesignTaskViewSet)
 
+# Native async versions of the read-heavy endpoints
+async_urlpatterns = [
+    path('projects/', async_views.project_list, name='async-project-list'),
+    path('projects/<int:pk>/', async_views.project_detail, name='async-project-detail'),
+    path('projects/<int:pk>/tasks_summary/', async_views.project_tasks_summary, name='async-project-tasks-summary'),
+    path('tasks/', async_views.task_list, name='async-task-list'),
+    path('tasks/overdue/', async_views.task_overdue, name='async-task-overdue'),
+    path('tasks/my_tasks/', async_views.my_tasks, name='async-task-my-tasks'),
+    path('tasks/<int:pk>/', async_views.task_detail, name='async-task-detail'),
+]
+
 urlpatterns = [
     path('', include(router.urls)),
+    path('async/', include(async_urlpatterns)),
 ]
@@ -1,62 +1,453 @@
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Prefetch, Sum
+from django.db.models.functions import TruncWeek
 from django.utils import timezone
-from .models import Project, Task, DevelopmentTask, DesignTask
+from datetime import timedelta
+from .models import Project, Task, DevelopmentTask, DesignTask, resolve_task_subtypes
 from .serializers import (
-    ProjectSerializer, TaskSerializer, 
-    DevelopmentTaskSerializer, DesignTaskSerializer
+    nested_paths, ProjectSerializer, TaskSerializer, PolymorphicTaskSerializer,
+    DevelopmentTaskSerializer, DesignTaskSerializer, BulkTransitionSerializer
 )
 from .filters import ProjectFilter, TaskFilter
+from .bulk import create_tasks, update_tasks, transition_tasks
+from .search import FullTextSearchFilter
+from .stats import overdue_count_subquery, overdue_counts
+from .export import (
+    EXPORT_FORMATS, PROJECT_EXPORT_COLUMNS, TASK_EXPORT_COLUMNS, export_response
+)
+from apps.core.cache import CachedResponseMixin, COLLECTION_SCOPE, project_scope
+from apps.core.notifications import queue_task_created_notifications
+
+
+def paginated_response(view, queryset):
+    """Serialize a queryset through the view's paginator, like ``list``"""
+    page = view.paginate_queryset(queryset)
+    if page is not None:
+        serializer = view.get_serializer(page, many=True)
+        return view.get_paginated_response(serializer.data)
+    serializer = view.get_serializer(queryset, many=True)
+    return Response(serializer.data)
+
+
+def count_overdue(project_id):
+    return overdue_counts([project_id]).get(project_id, 0)
+
+
+def summarize_tasks(project, overdue_tasks=None):
+    """The ``tasks_summary`` payload, from the project's denormalized stats.
+
+    The overdue count changes as time passes, so it is counted here unless
+    the caller already has it.
+    """
+    stats = project.task_stats
+    if overdue_tasks is None:
+        overdue_tasks = count_overdue(project.pk)
+    return {
+        'total_tasks': stats.total_tasks,
+        'completed_tasks': stats.completed_tasks,
+        'in_progress_tasks': stats.in_progress_tasks,
+        'blocked_tasks': stats.blocked_tasks,
+        'overdue_tasks': overdue_tasks,
+        'estimated_hours': stats.estimated_hours,
+        'actual_hours': stats.actual_hours,
+        'progress_percentage': stats.progress_percentage,
+    }
+
+
+class SparseFieldsetMixin:
+    """``?fields=`` and ``?expand=`` handling shared by the viewsets.
+
+    Actions in ``expand_by_default_actions`` nest ``default_expand`` unless the
+    client passes ``?expand=`` itself; every other action (lists in
+    particular) is lean by default. Relations in ``select_expanded`` are only
+    joined when they are expanded.
+    """
+    expand_by_default_actions = ('retrieve', 'create', 'update', 'partial_update')
+    default_expand = ()
+    select_expanded = ()
+
+    def _query_param_set(self, name):
+        request = getattr(self, 'request', None)
+        value = request.query_params.get(name) if request is not None else None
+        if value is None:
+            return None
+        return {part.strip() for part in value.split(',') if part.strip()}
+
+    def requested_fields(self):
+        return self._query_param_set('fields')
+
+    def expanded_fields(self):
+        expand = self._query_param_set('expand')
+        if expand is None:
+            if self.action in self.expand_by_default_actions:
+                return set(self.default_expand)
+            return set()
+        return expand
+
+    def wants(self, path):
+        """Whether the (dotted) field ``path`` will be rendered"""
+        requested = self.requested_fields()
+        for name in path.split('.'):
+            if requested is None:
+                return True
+            if name not in {p.split('.', 1)[0] for p in requested}:
+                return False
+            requested = nested_paths(requested, name) or None
+        return True
+
+    def expands(self, path):
+        """Whether the (dotted) relation ``path`` is rendered in full"""
+        return path in self.expanded_fields() and self.wants(path)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        related = [name for name in self.select_expanded if self.expands(name)]
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.requested_fields()
+        context['expand'] = self.expanded_fields()
+        return context
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ExportMixin:
+    """``export`` action streaming every row that matches the list filters.
+
+    ``?export_format=csv`` (default) or ``ndjson``; ``format`` itself is
+    reserved for DRF's content negotiation.
+    """
+    export_columns = ()
+    export_filename = 'export'
+
+    def get_export_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the filtered list as CSV or NDJSON"""
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({'export_format': [f'Expected one of: {", ".join(EXPORT_FORMATS)}.']})
+        return export_response(
+            self.get_export_queryset(), self.export_columns, export_format, self.export_filename
+        )
+
+
+def _bounded_int_param(request, name, default, maximum):
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    number = _int_or_none(value)
+    if number is None or not 1 <= number <= maximum:
+        raise ValidationError({name: [f'Expected an integer between 1 and {maximum}.']})
+    return number
+
+
+class BulkTaskActionsMixin:
+    """Batched create, partial update and status transition for tasks.
+
+    Every row is validated before anything is written; if any row fails the
+    request is rejected with ``{"errors": [{"index": i, "errors": {...}}]}``
+    and nothing is saved. Writes use multi-row INSERTs, ``bulk_update`` and a
+    single UPDATE respectively, and creation emails are queued as one batch.
+    """
+    bulk_max_items = 1000
+
+    def get_bulk_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValidationError({'detail': 'Expected a list of objects.'})
+        if not items:
+            raise ValidationError({'detail': 'Expected at least one item.'})
+        if len(items) > self.bulk_max_items:
+            raise ValidationError({'detail': f'At most {self.bulk_max_items} items per request.'})
+        return items
+
+    def get_bulk_serializer_context(self, items):
+        """Serializer context with every referenced project and user preloaded"""
+        context = self.get_serializer_context()
+        project_ids = {_int_or_none(item.get('project')) for item in items} - {None}
+        user_ids = {_int_or_none(item.get('assigned_to_id')) for item in items} - {None}
+        context['preloaded'] = {
+            Project: Project.objects.in_bulk(project_ids),
+            User: User.objects.in_bulk(user_ids),
+        }
+        return context
+
+    def check_assigned_users(self, data, context, errors):
+        users = context['preloaded'][User]
+        user_id = data.get('assigned_to_id')
+        if user_id is not None and user_id not in users:
+            errors.setdefault('assigned_to_id', []).append(f'Invalid pk "{user_id}" - object does not exist.')
+
+    def bulk_error_response(self, errors):
+        return Response(
+            {'errors': [{'index': i, 'errors': e} for i, e in enumerate(errors) if e]},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    @action(detail=False, methods=['post'], url_path='bulk-create')
+    def bulk_create(self, request):
+        """Create many tasks in batched INSERTs"""
+        items = self.get_bulk_items(request)
+        context = self.get_bulk_serializer_context(items)
+        serializer = self.get_serializer_class()(context=context)
+        errors, rows = [], []
+        for item in items:
+            try:
+                data = serializer.run_validation(item)
+            except ValidationError as exc:
+                errors.append(exc.detail)
+                continue
+            row_errors = {}
+            self.check_assigned_users(data, context, row_errors)
+            errors.append(row_errors)
+            rows.append(data)
+        if any(errors):
+            return self.bulk_error_response(errors)
+
+        model = self.get_queryset().model
+        users = context['preloaded'][User]
+        tasks = []
+        for data in rows:
+            task = model(created_by=request.user, **data)
+            if task.assigned_to_id is not None:
+                task.assigned_to = users[task.assigned_to_id]
+            tasks.append(task)
+        create_tasks(tasks)
+        queue_task_created_notifications([task.pk for task in tasks if task.assigned_to_id])
+
+        output = self.get_serializer_class()(tasks, many=True, context=self.get_serializer_context())
+        return Response(output.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['patch'], url_path='bulk-update')
+    def bulk_update(self, request):
+        """Partially update many tasks; each item needs an ``id``"""
+        items = self.get_bulk_items(request)
+        context = self.get_bulk_serializer_context(items)
+        ids = [_int_or_none(item.get('id')) for item in items]
+        instances = self.get_queryset().in_bulk({pk for pk in ids if pk is not None})
+
+        serializer_class = self.get_serializer_class()
+        errors, tasks, fields, seen = [], [], set(), set()
+        for pk, item in zip(ids, items):
+            instance = instances.get(pk)
+            if instance is None:
+                errors.append({'id': ['Not found.']})
+                continue
+            # One instance updated twice would count its stats delta and status event twice
+            if pk in seen:
+                errors.append({'id': ['Duplicate id.']})
+                continue
+            seen.add(pk)
+            serializer = serializer_class(instance, data=item, partial=True, context=context)
+            if not serializer.is_valid():
+                errors.append(dict(serializer.errors))
+                continue
+            row_errors = {}
+            self.check_assigned_users(serializer.validated_data, context, row_errors)
+            errors.append(row_errors)
+            for attr, value in serializer.validated_data.items():
+                setattr(instance, attr, value)
+                fields.add('assigned_to' if attr == 'assigned_to_id' else attr)
+            instance.updated_by = request.user
+            tasks.append(instance)
+        if any(errors):
+            return self.bulk_error_response(errors)
 
-class ProjectViewSet(viewsets.ModelViewSet):
+        update_tasks(tasks, fields | {'updated_by'})
+        output = serializer_class(tasks, many=True, context=self.get_serializer_context())
+        return Response(output.data)
+
+    @action(detail=False, methods=['post'], url_path='bulk-transition')
+    def bulk_transition(self, request):
+        """Move many tasks to one status with a single UPDATE"""
+        serializer = BulkTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        if len(ids) > self.bulk_max_items:
+            raise ValidationError({'ids': [f'At most {self.bulk_max_items} ids per request.']})
+
+        queryset = self.get_queryset().filter(pk__in=ids)
+        with transaction.atomic():
+            updated = transition_tasks(queryset, serializer.validated_data['status'], request.user)
+            missing = set(ids) - set(updated)
+            if missing:
+                transaction.set_rollback(True)
+                return self.bulk_error_response(
+                    [{'id': ['Not found.']} if pk in missing else {} for pk in ids]
+                )
+        return Response({'updated': len(updated)})
+
+
+class ProjectViewSet(ExportMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """Project ViewSet with CRUD operations"""
-    queryset = Project.objects.filter(is_active=True).prefetch_related('assigned_to', 'tasks')
+    queryset = Project.objects.filter(is_active=True)
     serializer_class = ProjectSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_class = ProjectFilter
     search_fields = ['name', 'description']
     ordering_fields = ['created_at', 'start_date', 'end_date', 'name']
     ordering = ['-created_at']
+    default_expand = ('assigned_to', 'tasks', 'tasks.assigned_to')
+    export_columns = PROJECT_EXPORT_COLUMNS
+    export_filename = 'projects'
+
+    def get_cache_scopes(self):
+        if self.detail:
+            return [project_scope(self.kwargs[self.lookup_url_kwarg or self.lookup_field])]
+        return [COLLECTION_SCOPE]
+
+    def get_export_queryset(self):
+        return super().get_export_queryset().annotate(overdue_tasks=overdue_count_subquery())
+
+    # Actions that read project rows directly instead of serializing them
+    report_actions = ('tasks_summary', 'burndown', 'velocity', 'export')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.report_actions:
+            return queryset.select_related('stats') if self.action == 'tasks_summary' else queryset
+        if self.wants('tasks_count') or self.wants('progress_percentage'):
+            queryset = queryset.select_related('stats')
+        if self.wants('assigned_to'):
+            users = User.objects.all() if self.expands('assigned_to') else User.objects.only('id')
+            queryset = queryset.prefetch_related(Prefetch('assigned_to', queryset=users))
+        if self.expands('tasks'):
+            tasks = Task.objects.filter(is_active=True)
+            if self.expands('tasks.assigned_to'):
+                tasks = tasks.select_related('assigned_to')
+            queryset = queryset.prefetch_related(Prefetch('tasks', queryset=tasks))
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
     def perform_update(self, serializer):
         serializer.save(updated_by=self.request.user)
+        # UpdateModelMixin drops the prefetched relations after saving;
+        # reload them so the response doesn't fetch them row by row
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
 
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue projects"""
-        overdue_projects = [p for p in self.get_queryset() if p.is_overdue]
-        serializer = self.get_serializer(overdue_projects, many=True)
-        return Response(serializer.data)
+        queryset = self.filter_queryset(self.get_queryset().overdue())
+        return paginated_response(self, queryset)
 
     @action(detail=True, methods=['get'])
     def tasks_summary(self, request, pk=None):
         """Get task summary for a project"""
+        return self.cached_response(request, self.build_tasks_summary)
+
+    def build_tasks_summary(self, request):
+        return Response(summarize_tasks(self.get_object()))
+
+    @action(detail=True, methods=['get'])
+    def burndown(self, request, pk=None):
+        """Remaining tasks per day, from the daily snapshots"""
+        return self.cached_response(request, self.build_burndown)
+
+    def build_burndown(self, request):
         project = self.get_object()
-        tasks = project.tasks.all()
-        
-        summary = {
-            'total_tasks': tasks.count(),
-            'completed_tasks': tasks.filter(status='completed').count(),
-            'in_progress_tasks': tasks.filter(status='in_progress').count(),
-            'overdue_tasks': len([t for t in tasks if t.is_overdue]),
-            'progress_percentage': project.progress_percentage,
-        }
-        return Response(summary)
+        days = _bounded_int_param(request, 'days', default=30, maximum=366)
+        since = timezone.localdate() - timedelta(days=days - 1)
+        snapshots = project.daily_snapshots.filter(date__gte=since).order_by('date')
+        return Response({
+            'days': days,
+            'results': [
+                {
+                    'date': snapshot.date,
+                    'total_tasks': snapshot.total_tasks,
+                    'completed_tasks': snapshot.completed_tasks,
+                    'remaining_tasks': snapshot.remaining_tasks,
+                }
+                for snapshot in snapshots
+            ],
+        })
+
+    @action(detail=True, methods=['get'])
+    def velocity(self, request, pk=None):
+        """Tasks completed and created per week, from the daily snapshots"""
+        return self.cached_response(request, self.build_velocity)
 
-class TaskViewSet(viewsets.ModelViewSet):
+    def build_velocity(self, request):
+        project = self.get_object()
+        weeks = _bounded_int_param(request, 'weeks', default=8, maximum=104)
+        today = timezone.localdate()
+        first_week = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+        rows = (
+            project.daily_snapshots.filter(date__gte=first_week)
+            .annotate(week=TruncWeek('date'))
+            .order_by()
+            .values('week')
+            .annotate(completed=Sum('completed_count'), created=Sum('created_count'))
+        )
+        totals = {row['week']: row for row in rows}
+        results = []
+        for index in range(weeks):
+            week = first_week + timedelta(weeks=index)
+            row = totals.get(week, {})
+            results.append({
+                'week': week,
+                'completed': row.get('completed') or 0,
+                'created': row.get('created') or 0,
+            })
+        return Response({
+            'weeks': weeks,
+            'average_completed': round(sum(r['completed'] for r in results) / weeks, 2),
+            'results': results,
+        })
+
+class TaskViewSet(ExportMixin, BulkTaskActionsMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """Base Task ViewSet"""
-    queryset = Task.objects.filter(is_active=True).select_related('project', 'assigned_to')
+    queryset = Task.objects.filter(is_active=True)
     serializer_class = TaskSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_class = TaskFilter
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'due_date', 'priority']
     ordering = ['-created_at']
+    default_expand = ('assigned_to',)
+    select_expanded = ('assigned_to',)
+
+    export_columns = TASK_EXPORT_COLUMNS
+    export_filename = 'tasks'
+
+    # Read actions render every row with its subtype serializer
+    polymorphic_actions = ('list', 'retrieve', 'overdue', 'my_tasks')
+
+    def get_serializer_class(self):
+        if self.action in self.polymorphic_actions:
+            return PolymorphicTaskSerializer
+        return super().get_serializer_class()
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and self.action in self.polymorphic_actions:
+            page = resolve_task_subtypes(page)
+        return page
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.action in self.polymorphic_actions:
+            instance = resolve_task_subtypes([instance])[0]
+        return instance
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -67,26 +458,27 @@ class TaskViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue tasks"""
-        overdue_tasks = [t for t in self.get_queryset() if t.is_overdue]
-        serializer = self.get_serializer(overdue_tasks, many=True)
-        return Response(serializer.data)
+        queryset = self.filter_queryset(self.get_queryset().overdue())
+        return paginated_response(self, queryset)
 
     @action(detail=False, methods=['get'])
     def my_tasks(self, request):
         """Get current user's tasks"""
-        tasks = self.get_queryset().filter(assigned_to=request.user)
+        tasks = resolve_task_subtypes(self.get_queryset().filter(assigned_to=request.user))
         serializer = self.get_serializer(tasks, many=True)
         return Response(serializer.data)
 
-class DevelopmentTaskViewSet(viewsets.ModelViewSet):
+class DevelopmentTaskViewSet(BulkTaskActionsMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """Development Task ViewSet"""
-    queryset = DevelopmentTask.objects.filter(is_active=True).select_related('project', 'assigned_to')
+    queryset = DevelopmentTask.objects.filter(is_active=True)
     serializer_class = DevelopmentTaskSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_class = TaskFilter
     search_fields = ['title', 'description', 'technology']
     ordering_fields = ['created_at', 'due_date', 'priority']
     ordering = ['-created_at']
+    default_expand = ('assigned_to',)
+    select_expanded = ('assigned_to',)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -94,15 +486,17 @@ class DevelopmentTaskViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         serializer.save(updated_by=self.request.user)
 
-class DesignTaskViewSet(viewsets.ModelViewSet):
+class DesignTaskViewSet(BulkTaskActionsMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """Design Task ViewSet"""
-    queryset = DesignTask.objects.filter(is_active=True).select_related('project', 'assigned_to')
+    queryset = DesignTask.objects.filter(is_active=True)
     serializer_class = DesignTaskSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_class = TaskFilter
     search_fields = ['title', 'description', 'design_type']
     ordering_fields = ['created_at', 'due_date', 'priority']
     ordering = ['-created_at']
+    default_expand = ('assigned_to',)
+    select_expanded = ('assigned_to',)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
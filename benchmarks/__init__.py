@@ -0,0 +1,6 @@
+"""Standalone performance benchmarks.
+
+Run a benchmark as a module from the repository root, e.g.
+``python -m benchmarks.filter_latency``. Each one builds its own throwaway
+SQLite database unless ``--database-url`` points it at another server.
+"""
@@ -0,0 +1,184 @@
+"""Concurrent-client throughput of the async endpoints against the WSGI path.
+
+Seeds one dataset with ``apps.projects.sample_data``, then sends the same
+GET requests, with ``--concurrency`` clients in flight at once, three ways:
+
+* ``wsgi``: the sync viewsets through Django's WSGI handler, one thread per
+  client, like a threaded WSGI server;
+* ``asgi``: the sync viewsets through the ASGI handler;
+* ``asgi-async``: the ``/api/async/`` endpoints through the ASGI handler.
+
+::
+
+    python -m benchmarks.async_throughput --concurrency 1 8 32
+    python -m benchmarks.async_throughput --database-url postgres://... --tasks 100000
+
+Requests are handled in process, without a network server, and the API
+cache is disabled. Every request authenticates with a JWT and runs the
+full view. On SQLite, queries barely wait on I/O, so use a networked
+database to see what async views save.
+"""
+import argparse
+import asyncio
+import io
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.harness import percentiles, setup_django
+
+DEFAULT_PATHS = [
+    '/api/tasks/',
+    '/api/tasks/?status=todo&expand=assigned_to,project',
+    '/api/tasks/overdue/',
+    '/api/tasks/my_tasks/',
+    '/api/projects/{project}/',
+    '/api/projects/{project}/tasks_summary/',
+]
+MODES = ('wsgi', 'asgi', 'asgi-async')
+
+
+def split(url):
+    path, _, query = url.partition('?')
+    return path, query
+
+
+def wsgi_client(handler, authorization):
+    def request(url):
+        path, query = split(url)
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+            'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'testserver', 'HTTP_AUTHORIZATION': authorization,
+            'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http', 'wsgi.errors': io.StringIO(),
+        }
+        statuses = []
+        response = handler(environ, lambda status, headers: statuses.append(status))
+        try:
+            b''.join(response)
+        finally:
+            response.close()
+        assert statuses[0].startswith('200'), f'{url}: {statuses[0]}'
+    return request
+
+
+def asgi_client(handler, authorization):
+    async def request(url):
+        path, query = split(url)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+            'query_string': query.encode(), 'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+            'headers': [(b'host', b'testserver'), (b'authorization', authorization.encode())],
+        }
+        received = False
+        statuses = []
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # The client never disconnects
+            await asyncio.Future()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        await handler(scope, receive, send)
+        assert statuses[0] == 200, f'{url}: {statuses[0]}'
+    return request
+
+
+def run_wsgi(request, url, concurrency, total):
+    def timed():
+        start = time.perf_counter()
+        request(url)
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        started = time.perf_counter()
+        samples = list(pool.map(lambda _: timed(), range(total)))
+    return samples, time.perf_counter() - started
+
+
+def run_asgi(request, url, concurrency, total):
+    async def main():
+        samples = []
+        remaining = iter(range(total))
+
+        async def client():
+            for _ in remaining:
+                start = time.perf_counter()
+                await request(url)
+                samples.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return samples, time.perf_counter() - started
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=200, help='requests per path, mode and concurrency')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=10_000)
+    parser.add_argument('--path', action='append', help=f'defaults to {", ".join(DEFAULT_PATHS)}')
+    parser.add_argument('--mode', action='append', choices=MODES)
+    parser.add_argument('--database-url', help='defaults to a temporary SQLite file')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    database_url = setup_django(args.database_url)
+
+    from django.conf import settings
+    from django.core.handlers.asgi import ASGIHandler
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test.utils import override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+    from apps.projects.models import Project
+    from apps.projects.sample_data import generate_sample_data
+
+    logging.disable(logging.WARNING)
+    override_settings(
+        DEBUG=False,
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        NPLUSONE_MODE='',
+    ).enable()
+
+    started = time.perf_counter()
+    generate_sample_data(args.users, args.projects, args.tasks, seed=args.seed)
+    print(f'database: {database_url}')
+    print(f'{args.users} users, {args.projects} projects, {args.tasks} tasks '
+          f'(seeded in {time.perf_counter() - started:.1f}s)')
+
+    project = Project.objects.order_by('-stats__total_tasks', 'pk').first()
+    user = project.assigned_to.order_by('pk').first() or project.created_by
+    authorization = f'Bearer {AccessToken.for_user(user)}'
+    clients = {
+        'wsgi': (wsgi_client(WSGIHandler(), authorization), run_wsgi, ''),
+        'asgi': (asgi_client(ASGIHandler(), authorization), run_asgi, ''),
+        'asgi-async': (asgi_client(ASGIHandler(), authorization), run_asgi, 'async/'),
+    }
+
+    print(f'{"path":<52} {"mode":<11} {"clients":>7} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8}')
+    for template in args.path or DEFAULT_PATHS:
+        for concurrency in args.concurrency:
+            for mode in args.mode or MODES:
+                request, run, prefix = clients[mode]
+                url = template.format(project=project.pk).replace('/api/', f'/api/{prefix}', 1)
+                run(request, url, concurrency, concurrency)  # warm up
+                samples, elapsed = run(request, url, concurrency, args.requests)
+                p50, p95 = percentiles(samples)
+                print(f'{template:<52} {mode:<11} {concurrency:>7} {len(samples) / elapsed:>8.0f} '
+                      f'{p50:>8.1f} {p95:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+"""Latency and query-count budgets for every API endpoint and Celery task.
+
+Seeds each dataset size with ``apps.projects.sample_data`` (same seed, same
+rows), then runs every route registered in ``apps/projects/urls.py`` and the
+tasks in ``apps/projects/tasks.py`` against it and compares the results with
+``benchmarks/baselines.json``::
+
+    python -m benchmarks.endpoints                       # small and medium
+    python -m benchmarks.endpoints --sizes large --repeat 5
+    python -m benchmarks.endpoints --only tasks --only celery
+    python -m benchmarks.endpoints --update-baselines
+
+Responses are never served from the API cache, so every run exercises the
+full view. Writes run inside a transaction that is rolled back after each
+iteration, so every iteration sees the same data. The command exits with
+status 1 when a benchmark uses more queries than its baseline (plus the
+``queries`` threshold) or its median latency is more than ``latency`` (a
+fraction) plus ``latency_slack_ms`` above the baseline. Latency baselines
+only mean something on the machine that recorded them; query counts are
+portable.
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from collections import namedtuple
+
+from benchmarks.harness import percentiles, setup_django
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+# name: (users, projects, tasks)
+SIZES = {
+    'small': (20, 10, 1_000),
+    'medium': (200, 50, 10_000),
+    'large': (2_000, 500, 100_000),
+}
+DEFAULT_SIZES = ['small', 'medium']
+
+DEFAULT_THRESHOLDS = {'latency': 0.5, 'latency_slack_ms': 5.0, 'queries': 0}
+
+# Items per bulk endpoint request
+BULK_ITEMS = 50
+
+# ``name`` is stable across datasets (route templates, not ids); ``setup``
+# runs before each iteration, inside the transaction but outside the timing.
+Benchmark = namedtuple('Benchmark', 'name run setup')
+
+
+class Client:
+    """An authenticated test client that checks every response's status"""
+
+    def __init__(self, user):
+        from rest_framework.test import APIClient
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+    def request(self, method, path, data=None):
+        response = getattr(self.client, method.lower())(path, data, format='json')
+        if response.status_code >= 400:
+            raise AssertionError(f'{method} {path} returned {response.status_code}: {response.content[:500]!r}')
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+
+def route_benchmarks(client, fixtures):
+    """One benchmark per method and route of the projects router"""
+    from apps.projects.urls import router
+
+    benchmarks = []
+    for prefix, viewset, basename in router.registry:
+        detail_id = fixtures['detail'][prefix]
+        list_path = f'/api/{prefix}/'
+        detail_path = f'/api/{prefix}/{detail_id}/'
+        payload = fixtures['payload'][prefix]
+
+        def add(method, path, template, data=None):
+            benchmarks.append(Benchmark(
+                f'{method} {template}',
+                lambda: client.request(method, path, data),
+                None,
+            ))
+
+        add('GET', list_path, f'/api/{prefix}/')
+        add('POST', list_path, f'/api/{prefix}/', payload)
+        add('GET', detail_path, f'/api/{prefix}/{{id}}/')
+        add('PATCH', detail_path, f'/api/{prefix}/{{id}}/', {'description': 'Benchmarked'})
+        add('DELETE', detail_path, f'/api/{prefix}/{{id}}/')
+        for extra in viewset.get_extra_actions():
+            method = next(m for m in extra.mapping if m != 'options').upper()
+            url_path = extra.url_path
+            if extra.detail:
+                path, template = f'{detail_path}{url_path}/', f'/api/{prefix}/{{id}}/{url_path}/'
+            else:
+                path, template = f'{list_path}{url_path}/', f'/api/{prefix}/{url_path}/'
+            data = fixtures['actions'].get((prefix, url_path))
+            add(method, path, template, data)
+    return benchmarks
+
+
+def celery_benchmarks(fixtures):
+    from apps.projects import tasks
+    from apps.projects.models import Task
+
+    def reset_overdue_scan():
+        Task.objects.filter(overdue_notified_at__isnull=False).update(overdue_notified_at=None)
+
+    def run(task, *args):
+        return lambda: task.apply(args=args).get()
+
+    assigned = fixtures['assigned_task_ids']
+    return [
+        Benchmark('celery mark_overdue_tasks', run(tasks.mark_overdue_tasks), reset_overdue_scan),
+        Benchmark('celery send_task_created_notifications',
+                  run(tasks.send_task_created_notifications, assigned), None),
+        Benchmark('celery send_overdue_notifications',
+                  run(tasks.send_overdue_notifications, assigned), None),
+        Benchmark('celery send_daily_summary', run(tasks.send_daily_summary), None),
+        Benchmark('celery rollup_project_snapshots', run(tasks.rollup_project_snapshots), None),
+    ]
+
+
+def build_fixtures():
+    """Ids and request bodies the benchmarks need from the seeded data"""
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from datetime import timedelta
+    from apps.projects.models import DesignTask, DevelopmentTask, Project, Task
+
+    user = User.objects.order_by('pk').first()
+    project = Project.objects.order_by('-stats__total_tasks', 'pk').first()
+    due = (timezone.now() + timedelta(days=7)).isoformat()
+    today = timezone.localdate()
+    task_models = {'tasks': Task, 'development-tasks': DevelopmentTask, 'design-tasks': DesignTask}
+    extra_fields = {
+        'tasks': {},
+        'development-tasks': {'technology': 'django'},
+        'design-tasks': {'design_type': 'mockup'},
+    }
+
+    fixtures = {
+        'user': user,
+        'detail': {'projects': project.pk},
+        'payload': {'projects': {
+            'name': 'Benchmark project', 'start_date': today.isoformat(),
+            'end_date': (today + timedelta(days=30)).isoformat(),
+        }},
+        'actions': {},
+        'assigned_task_ids': list(
+            Task.objects.filter(assigned_to__isnull=False).order_by('pk').values_list('pk', flat=True)[:BULK_ITEMS]
+        ),
+    }
+    for prefix, model in task_models.items():
+        ids = list(model.objects.filter(project=project).order_by('pk').values_list('pk', flat=True)[:BULK_ITEMS])
+        item = {'title': 'Benchmark task', 'project': project.pk, 'due_date': due, **extra_fields[prefix]}
+        fixtures['detail'][prefix] = ids[0]
+        fixtures['payload'][prefix] = item
+        fixtures['actions'][prefix, 'bulk-create'] = [item] * BULK_ITEMS
+        fixtures['actions'][prefix, 'bulk-update'] = [{'id': pk, 'priority': 'high'} for pk in ids]
+        fixtures['actions'][prefix, 'bulk-transition'] = {'ids': ids, 'status': 'review'}
+    return fixtures
+
+
+def run_benchmark(benchmark, repeat, warmup):
+    """``{'p50_ms', 'p95_ms', 'queries'}`` for one benchmark"""
+    from django.db import connection, reset_queries, transaction
+    from django.test.utils import CaptureQueriesContext
+
+    samples = []
+    queries = None
+    for iteration in range(warmup + repeat):
+        with transaction.atomic():
+            if benchmark.setup:
+                benchmark.setup()
+            # A full query log (9000 entries) would make the capture empty
+            reset_queries()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                benchmark.run()
+                elapsed = (time.perf_counter() - start) * 1000
+            transaction.set_rollback(True)
+        if iteration >= warmup:
+            samples.append(elapsed)
+            queries = len(captured)
+    p50, p95 = percentiles(samples)
+    return {'p50_ms': round(p50, 2), 'p95_ms': round(p95, 2), 'queries': queries}
+
+
+def compare(name, result, baseline, thresholds):
+    """Regression messages for ``result`` against ``baseline``"""
+    if baseline is None:
+        return []
+    problems = []
+    if result['queries'] > baseline['queries'] + thresholds['queries']:
+        problems.append(f"queries {baseline['queries']} -> {result['queries']}")
+    budget = baseline['p50_ms'] * (1 + thresholds['latency']) + thresholds['latency_slack_ms']
+    if result['p50_ms'] > budget:
+        problems.append(f"p50 {baseline['p50_ms']:.1f}ms -> {result['p50_ms']:.1f}ms (budget {budget:.1f}ms)")
+    return problems
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {'thresholds': dict(DEFAULT_THRESHOLDS), 'results': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', choices=SIZES, default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', action='append', default=[],
+                        help='Only run benchmarks whose name contains this text (repeatable)')
+    parser.add_argument('--baselines', default=BASELINES)
+    parser.add_argument('--update-baselines', action='store_true',
+                        help='Store these results as the new baselines instead of comparing')
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    parser.add_argument('--latency-threshold', type=float, help='Allowed median slowdown, as a fraction')
+    parser.add_argument('--latency-slack-ms', type=float, help='Allowed median slowdown on top, in ms')
+    parser.add_argument('--query-threshold', type=int, help='Allowed extra queries')
+    args = parser.parse_args()
+
+    database_url = setup_django()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test.utils import override_settings
+    from project_task_manager.celery import app
+    from apps.projects.sample_data import generate_sample_data
+
+    baselines = load_baselines(args.baselines)
+    thresholds = {**DEFAULT_THRESHOLDS, **baselines.get('thresholds', {})}
+    for key, value in (('latency', args.latency_threshold), ('latency_slack_ms', args.latency_slack_ms),
+                       ('queries', args.query_threshold)):
+        if value is not None:
+            thresholds[key] = value
+
+    app.conf.task_always_eager = True
+    # Task and notification INFO logs would drown the results table
+    logging.disable(logging.INFO)
+    overrides = override_settings(
+        DEBUG=False,
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        TASK_NOTIFICATIONS_SYNC=False,
+    )
+    overrides.enable()
+
+    print(f'database: {database_url}')
+    results = {}
+    regressions = []
+    for size in args.sizes:
+        users, projects, tasks = SIZES[size]
+        call_command('flush', interactive=False, verbosity=0)
+        started = time.perf_counter()
+        generate_sample_data(users, projects, tasks, seed=args.seed)
+        print(f'\n{size}: {users} users, {projects} projects, {tasks} tasks '
+              f'(seeded in {time.perf_counter() - started:.1f}s)')
+        print(f'{"benchmark":<58} {"p50 ms":>9} {"p95 ms":>9} {"queries":>8}  status')
+
+        fixtures = build_fixtures()
+        benchmarks = route_benchmarks(Client(fixtures['user']), fixtures) + celery_benchmarks(fixtures)
+        if args.only:
+            benchmarks = [b for b in benchmarks if any(text in b.name for text in args.only)]
+
+        results[size] = {}
+        for benchmark in benchmarks:
+            result = run_benchmark(benchmark, args.repeat, args.warmup)
+            results[size][benchmark.name] = result
+            baseline = baselines['results'].get(size, {}).get(benchmark.name)
+            problems = [] if args.update_baselines else compare(benchmark.name, result, baseline, thresholds)
+            regressions.extend(f'{size} {benchmark.name}: {problem}' for problem in problems)
+            status = 'REGRESSED' if problems else ('new' if baseline is None else 'ok')
+            print(f'{benchmark.name:<58} {result["p50_ms"]:>9.1f} {result["p95_ms"]:>9.1f} '
+                  f'{result["queries"]:>8}  {status}')
+
+    overrides.disable()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.update_baselines:
+        for size, size_results in results.items():
+            baselines['results'].setdefault(size, {}).update(size_results)
+        baselines['thresholds'] = thresholds
+        with open(args.baselines, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nBaselines written to {args.baselines}')
+        return
+
+    if regressions:
+        print('\nRegressions:')
+        for regression in regressions:
+            print(f'  {regression}')
+        raise SystemExit(1)
+    print('\nNo regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Latency of the ``?title=`` / ``?name=`` substring filters.
+
+Compares Django's plain ``icontains`` (a sequential scan) with
+``apps.projects.search.contains`` (trigram index) as the task table grows::
+
+    python -m benchmarks.filter_latency --rows 100000 1000000
+
+Rows are added cumulatively, so the larger sizes reuse the earlier inserts.
+"""
+import argparse
+import random
+
+from benchmarks.harness import measure, setup_django
+
+VERBS = ['Fix', 'Refactor', 'Write', 'Review', 'Design', 'Deploy', 'Test', 'Document']
+NOUNS = [
+    'checkout', 'invoice', 'login', 'dashboard', 'search', 'export', 'billing',
+    'profile', 'settings', 'report', 'onboarding', 'notification', 'upload',
+    'payment', 'analytics', 'permissions',
+]
+RARE = 'webhook'
+
+# (label, filter value): a common word, a rare word, and a mid-word fragment
+TERMS = [('common', 'invoice'), ('rare', RARE), ('fragment', 'boardi')]
+
+
+def title(rng, index):
+    if rng.random() < 0.001:
+        return f'{rng.choice(VERBS)} {RARE} retries #{index}'
+    return f'{rng.choice(VERBS)} {rng.choice(NOUNS)} {rng.choice(NOUNS)} #{index}'
+
+
+def grow_tasks(project, user, start, stop, rng, batch_size=5000):
+    from django.utils import timezone
+    from apps.projects.models import Task
+
+    due = timezone.now()
+    for offset in range(start, stop, batch_size):
+        Task.objects.bulk_create([
+            Task(title=title(rng, i), project=project, created_by=user, due_date=due)
+            for i in range(offset, min(offset + batch_size, stop))
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--database-url', help='defaults to a temporary SQLite file')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    database_url = setup_django(args.database_url)
+
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from apps.projects.models import Project, Task
+    from apps.projects.search import contains
+
+    rng = random.Random(args.seed)
+    user = User.objects.create(username='bench')
+    project = Project.objects.create(
+        name='Benchmark', start_date=timezone.now().date(),
+        end_date=timezone.now().date(), created_by=user,
+    )
+    print(f'database: {database_url}')
+    print(f'{"rows":>9}  {"term":<9} {"matches":>8}  {"icontains ms (p50/p95)":>24}  {"indexed ms (p50/p95)":>22}')
+
+    rows = 0
+    for target in sorted(args.rows):
+        grow_tasks(project, user, rows, target, rng)
+        rows = target
+        tasks = Task.objects.all()
+        for label, term in TERMS:
+            plain = tasks.filter(title__icontains=term)
+            indexed = contains(tasks, 'title', term)
+            matches = indexed.count()
+            assert matches == plain.count()
+            # A typeahead request: the first page plus the total
+            plain_ms = measure(lambda: (list(plain[:20]), plain.count()), args.repeat)
+            indexed_ms = measure(lambda: (list(indexed[:20]), indexed.count()), args.repeat)
+            print(
+                f'{rows:>9}  {label:<9} {matches:>8}  '
+                f'{plain_ms[0]:>11.1f} / {plain_ms[1]:<10.1f}  {indexed_ms[0]:>9.1f} / {indexed_ms[1]:<10.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Shared setup and timing helpers for the benchmarks"""
+import atexit
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+
+def setup_django(database_url=None):
+    """Configure Django against ``database_url`` or a fresh temporary SQLite file.
+
+    Must be called before importing any models. Returns the database URL used.
+    """
+    if database_url is None:
+        directory = tempfile.mkdtemp(prefix='ptm-bench-')
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        database_url = f'sqlite:///{os.path.join(directory, "bench.sqlite3")}'
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_task_manager.settings')
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return database_url
+
+
+def percentiles(samples):
+    """``(median, p95)`` of a list of timings"""
+    samples = sorted(samples)
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def measure(func, repeat=20, warmup=2):
+    """Run ``func`` and return ``(median_ms, p95_ms)`` over ``repeat`` runs"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples)
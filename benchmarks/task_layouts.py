@@ -0,0 +1,180 @@
+"""Throughput of multi-table versus single-table task subtypes.
+
+Builds two throwaway schemas next to the real ones: tasks with one joined
+table per subtype (the layout before ``0009_single_table_tasks``) and
+tasks with the subtype columns on the task table (the layout since), then
+times the same writes and reads against both::
+
+    python -m benchmarks.task_layouts --rows 1000 10000
+
+``create`` saves rows one at a time, ``bulk`` uses ``bulk_create`` (which
+Django refuses for multi-table children), ``update`` changes a task field
+and a subtype field together, and the reads fetch a 50-row page of one
+subtype or of every type with its subtype fields.
+"""
+import argparse
+
+from benchmarks.harness import measure, setup_django
+
+PAGE = 50
+BATCH = 200
+
+
+def define_models():
+    """``(multi-table models, single-table models)`` as ``(base, dev, design)``"""
+    from django.apps.registry import Apps
+    from django.db import models
+
+    # A private registry keeps these models out of migrations and the admin
+    registry = Apps(installed_apps=['benchmarks'])
+
+    def meta(**options):
+        return type('Meta', (), {'app_label': 'benchmarks', 'apps': registry, **options})
+
+    def fields():
+        return {
+            'title': models.CharField(max_length=200),
+            'is_active': models.BooleanField(default=True),
+            'created_at': models.DateTimeField(auto_now_add=True),
+            '__module__': __name__,
+        }
+
+    multi_base = type('MultiTask', (models.Model,), {**fields(), 'Meta': meta()})
+    multi_dev = type('MultiDevelopmentTask', (multi_base,), {
+        'technology': models.CharField(max_length=20, default='python'),
+        'branch_name': models.CharField(max_length=100, blank=True),
+        '__module__': __name__, 'Meta': meta(),
+    })
+    multi_design = type('MultiDesignTask', (multi_base,), {
+        'design_type': models.CharField(max_length=20, default='ui_ux'),
+        'design_tool': models.CharField(max_length=50, blank=True),
+        '__module__': __name__, 'Meta': meta(),
+    })
+
+    single_base = type('SingleTask', (models.Model,), {
+        **fields(),
+        'task_type': models.CharField(max_length=20, default='task'),
+        'technology': models.CharField(max_length=20, null=True),
+        'branch_name': models.CharField(max_length=100, null=True),
+        'design_type': models.CharField(max_length=20, null=True),
+        'design_tool': models.CharField(max_length=50, null=True),
+        'Meta': meta(indexes=[models.Index(fields=['task_type', 'created_at', 'id'])]),
+    })
+    return (multi_base, multi_dev, multi_design), (single_base, single_base, single_base)
+
+
+def create_tables(*models):
+    from django.db import connection
+
+    with connection.schema_editor() as editor:
+        for model in models:
+            editor.create_model(model)
+
+
+def timed_writes(base, dev, design, single, repeat):
+    """Time one batch of each write; every run adds ``BATCH`` rows per type"""
+    from django.db import transaction
+
+    dev_kwargs = {'task_type': 'development', 'technology': 'python', 'branch_name': ''} if single else {}
+    design_kwargs = {'task_type': 'design', 'design_type': 'ui_ux', 'design_tool': ''} if single else {}
+
+    def create():
+        with transaction.atomic():
+            for i in range(BATCH):
+                dev.objects.create(title=f'Dev {i}', **dev_kwargs)
+
+    def bulk():
+        dev.objects.bulk_create([dev(title=f'Dev {i}', **dev_kwargs) for i in range(BATCH)])
+
+    def update():
+        rows = dev.objects.filter(task_type='development') if single else dev.objects.all()
+        with transaction.atomic():
+            for task in rows.order_by('-id')[:BATCH]:
+                task.title += '!'
+                task.branch_name = 'main'
+                task.save(update_fields=['title', 'branch_name'])
+
+    results = {'create': measure(create, repeat)}
+    results['bulk'] = measure(bulk, repeat) if single else None
+    results['update'] = measure(update, repeat)
+    # Keep the other types in the table so reads have something to skip
+    with transaction.atomic():
+        for i in range(BATCH):
+            design.objects.create(title=f'Design {i}', **design_kwargs)
+            base.objects.create(title=f'Task {i}')
+    return results
+
+
+def timed_reads(base, dev, design, single, repeat):
+    if single:
+        subtype = dev.objects.filter(task_type='development', is_active=True)
+        every = base.objects.filter(is_active=True)
+    else:
+        subtype = dev.objects.filter(is_active=True)
+        every = base.objects.filter(is_active=True).select_related(
+            dev._meta.model_name, design._meta.model_name
+        )
+    order = ('-created_at', '-id')
+    return {
+        'subtype page': measure(lambda: list(subtype.order_by(*order)[:PAGE]), repeat),
+        'mixed page': measure(lambda: list(every.order_by(*order)[:PAGE]), repeat),
+    }
+
+
+def grow(base, dev, design, single, rows):
+    """Add rows split evenly across the three types until the base table holds ``rows``"""
+    missing = rows - base.objects.count()
+    if missing <= 0:
+        return
+    per_type = missing // 3
+    if single:
+        base.objects.bulk_create(
+            [base(title=f'Task {i}') for i in range(per_type)]
+            + [base(title=f'Dev {i}', task_type='development', technology='python', branch_name='')
+               for i in range(per_type)]
+            + [base(title=f'Design {i}', task_type='design', design_type='ui_ux', design_tool='')
+               for i in range(per_type)],
+            batch_size=5000,
+        )
+        return
+    from django.db import transaction
+
+    with transaction.atomic():
+        base.objects.bulk_create([base(title=f'Task {i}') for i in range(per_type)], batch_size=5000)
+        for model in (dev, design):
+            for i in range(per_type):
+                model.objects.create(title=f'{model.__name__} {i}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--database-url', help='defaults to a temporary SQLite file')
+    args = parser.parse_args()
+
+    database_url = setup_django(args.database_url)
+    multi, single = define_models()
+    create_tables(*multi, single[0])
+    layouts = [('multi-table', multi, False), ('single-table', single, True)]
+
+    print(f'database: {database_url}')
+    print(f'{"rows":>7}  {"layout":<13} {"operation":<13} {"p50 ms":>9} {"p95 ms":>9} {"rows/s":>9}')
+    for target in sorted(args.rows):
+        for label, models, is_single in layouts:
+            grow(*models, is_single, target)
+            results = timed_writes(*models, is_single, args.repeat)
+            results.update(timed_reads(*models, is_single, args.repeat))
+            for operation, timing in results.items():
+                if timing is None:
+                    print(f'{target:>7}  {label:<13} {operation:<13} {"n/a":>9}')
+                    continue
+                rows = PAGE if operation.endswith('page') else BATCH
+                print(
+                    f'{target:>7}  {label:<13} {operation:<13} '
+                    f'{timing[0]:>9.1f} {timing[1]:>9.1f} {rows / timing[0] * 1000:>9.0f}'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,4 @@
-# # Force import of signals when Django starts
-# try:
-#     import apps.core.signals
-# except ImportError:
-#     pass
+# Load the Celery app when Django starts so that @shared_task uses it
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
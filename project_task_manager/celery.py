@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.schedules import crontab
 from django.conf import settings
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_task_manager.settings')
@@ -14,4 +15,9 @@ app.conf.beat_schedule = {
         'task': 'apps.projects.tasks.mark_overdue_tasks',
         'schedule': 60.0,  # Run every 60 seconds
     },
+    'rollup-project-snapshots': {
+        'task': 'apps.projects.tasks.rollup_project_snapshots',
+        # Just after midnight, in CELERY_TIMEZONE; rolls up the day that just ended
+        'schedule': crontab(hour=0, minute=5),
+    },
 }
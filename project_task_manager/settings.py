@@ -60,6 +60,9 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 # print(INSTALLED_APPS)
 
 MIDDLEWARE = [
+    'apps.core.middleware.PerformanceMiddleware',
+    'apps.core.nplusone.NPlusOneMiddleware',
+    'apps.core.replicas.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -101,6 +104,27 @@ DATABASES = {
     )
 }
 
+# Read replicas of the primary, as comma-separated URLs; they become the
+# aliases replica_1, replica_2, ... (see apps.core.replicas)
+DATABASE_REPLICAS = []
+REPLICA_URLS = config('DATABASE_REPLICA_URLS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+for number, url in enumerate(REPLICA_URLS, 1):
+    DATABASES[f'replica_{number}'] = dj_database_url.parse(url, conn_max_age=600, conn_health_checks=True)
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+# A replica dedicated to reporting tasks; without one they use the others
+REPORTING_DATABASE = None
+if config('DATABASE_REPORTING_URL', default=''):
+    DATABASES['reporting'] = dj_database_url.parse(
+        config('DATABASE_REPORTING_URL'), conn_max_age=600, conn_health_checks=True,
+    )
+    REPORTING_DATABASE = 'reporting'
+
+DATABASE_ROUTERS = ['apps.core.replicas.ReplicaRouter']
+
+# Seconds a client reads from the primary after it writes
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -146,7 +170,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -157,8 +181,32 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.PageNumberOrKeysetPagination',
     'PAGE_SIZE': 20,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'apps.core.throttling.TokenBucketThrottle',
+    ],
+}
+
+# Token buckets per client (apps.core.throttling): tokens per period, refilled
+# continuously. Requests cost THROTTLE_COSTS[url name] tokens, or for viewset
+# routes THROTTLE_COSTS[action name], 1 by default.
+THROTTLE_RATES = {
+    'user': config('THROTTLE_USER_RATE', default='600/min'),
+    'anon': config('THROTTLE_ANON_RATE', default='60/min'),
+}
+THROTTLE_COSTS = {
+    'login': 10,
+    'register': 10,
+    'project-list': 3,
+    'async-project-list': 3,
+    # Actions, on every viewset and under /api/async/
+    'tasks_summary': 5,
+    'overdue': 10,
+    'export': 20,
+    'bulk_create': 10,
+    'bulk_update': 10,
+    'bulk_transition': 10,
 }
 
 # JWT Configuration
@@ -169,6 +217,10 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
 }
 
+# Async endpoints (/api/async/) run their queries on a thread pool, one
+# connection per thread; False sends them to Django's shared sync thread
+ASYNC_PARALLEL_QUERIES = config('ASYNC_PARALLEL_QUERIES', default=True, cast=bool)
+
 # Celery Configuration
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('REDIS_URL', default='redis://localhost:6379/0')
@@ -177,6 +229,49 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Cache backing the versioned API response cache (apps.core.cache). Set
+# CACHE_URL (e.g. redis://localhost:6379/1) to share it between processes.
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'ptm',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=300, cast=int)
+# Seconds a JWT-authenticated user stays cached; 0 loads it on every request
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+
+# Task notifications are queued to Celery after commit; tests send them inline
+TASK_NOTIFICATIONS_SYNC = False
+TASK_NOTIFICATIONS_BATCH_SIZE = 100
+# Rows per chunk when mark_overdue_tasks scans for newly overdue tasks
+OVERDUE_SCAN_CHUNK_SIZE = config('OVERDUE_SCAN_CHUNK_SIZE', default=1000, cast=int)
+# Users per send_daily_summary_shard subtask (a range of user ids)
+DAILY_SUMMARY_SHARD_SIZE = config('DAILY_SUMMARY_SHARD_SIZE', default=1000, cast=int)
+# Rows fetched per cursor round trip by the streaming /export/ actions
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+# Send per-request SQL/serializer/render timings in a Server-Timing header to
+# every client; otherwise only staff users get it
+PERF_SERVER_TIMING = config('PERF_SERVER_TIMING', default=DEBUG, cast=bool)
+# /metrics requires "Authorization: Bearer <METRICS_TOKEN>"; without a token
+# it is only served with DEBUG
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+# Repeated-query (N+1) detection per request: 'log', 'raise' or '' (off)
+NPLUSONE_MODE = config('NPLUSONE_MODE', default='log' if DEBUG else '')
+# Runs of one SELECT shape within a request that count as an N+1 pattern
+NPLUSONE_THRESHOLD = config('NPLUSONE_THRESHOLD', default=5, cast=int)
+# Rows per transaction for the import_tasks command
+TASK_IMPORT_CHUNK_SIZE = config('TASK_IMPORT_CHUNK_SIZE', default=5000, cast=int)
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_USE_TLS = True
@@ -199,8 +294,28 @@ if not DEBUG:
 
 # Override email backend during tests
 if 'test' in sys.argv:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
     EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
     DEFAULT_FROM_EMAIL = 'test@example.com'
+    TASK_NOTIFICATIONS_SYNC = True
+    CELERY_TASK_ALWAYS_EAGER = True
+    # A repeated query within one request fails the test
+    NPLUSONE_MODE = 'raise'
+    # Tests share one cache; throttling tests enable their own rates
+    THROTTLE_RATES = {}
+    # Test transactions belong to the test thread
+    ASYNC_PARALLEL_QUERIES = False
+    # A second database standing in for a replica; replica tests route to it
+    DATABASE_REPLICAS = []
+    REPORTING_DATABASE = None
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+    }
     print("📧 Using locmem email backend for tests")
 
 # Logging
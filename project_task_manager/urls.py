@@ -16,9 +16,11 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from apps.core.views import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('apps.authentication.urls')),
     path('api/', include('apps.projects.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,99 @@
+from asgiref.sync import async_to_sync
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from django.utils import timezone
+from datetime import timedelta
+from apps.core.cache import get_cache
+from apps.projects.models import Project, Task, DevelopmentTask, DesignTask
+
+
+class AsyncEndpointMixin:
+    def create_data(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.project = Project.objects.create(
+            name='Test Project', start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30), created_by=self.user
+        )
+        self.project.assigned_to.add(self.user)
+        for i, model in enumerate([Task, DevelopmentTask, DesignTask] * 2):
+            self.task = model.objects.create(
+                title=f'Task {i}', project=self.project, assigned_to=self.user, created_by=self.user,
+                due_date=timezone.now() + timedelta(days=i - 2)
+            )
+        # Enough plain tasks for a second page
+        Task.objects.bulk_create([
+            Task(title=f'Filler {i}', project=self.project, created_by=self.user, due_date=timezone.now())
+            for i in range(20)
+        ])
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def get(self, url, **headers):
+        return async_to_sync(self.async_client.get)(url, headers={**self.headers, **headers})
+
+
+class AsyncViewsTest(AsyncEndpointMixin, TestCase):
+    def setUp(self):
+        self.create_data()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_responses_match_the_sync_endpoints(self):
+        paths = [
+            'projects/',
+            f'projects/{self.project.pk}/',
+            f'projects/{self.project.pk}/tasks_summary/',
+            'tasks/',
+            'tasks/?page=2',
+            'tasks/?page=last',
+            'tasks/?status=todo&expand=assigned_to,project',
+            'tasks/?cursor=',
+            'tasks/overdue/',
+            'tasks/my_tasks/',
+            f'tasks/{self.task.pk}/',
+        ]
+        for path in paths:
+            with self.subTest(path=path):
+                expected = self.client.get(f'/api/{path}').json()
+                response = self.get(f'/api/async/{path}')
+                self.assertEqual(response.status_code, 200)
+                data = response.json()
+                for link in ('next', 'previous'):
+                    if isinstance(data, dict) and data.get(link):
+                        self.assertEqual(data.pop(link).replace('/api/async/', '/api/'), expected.pop(link))
+                self.assertEqual(data, expected)
+
+    def test_list_runs_the_page_and_count_queries_only(self):
+        # Loads the user into the authentication cache
+        self.get('/api/async/tasks/my_tasks/')
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get('/api/async/tasks/').status_code, 200)
+        # The response cache answers the repeat
+        with self.assertNumQueries(0):
+            response = self.get('/api/async/tasks/')
+        self.assertEqual(self.get('/api/async/tasks/', if_none_match=response['ETag']).status_code, 304)
+
+    def test_errors(self):
+        self.assertEqual(self.get('/api/async/tasks/', authorization='').status_code, 401)
+        for page in ('9', '0', 'first'):
+            self.assertEqual(self.get(f'/api/async/tasks/?page={page}').status_code, 404)
+        self.assertEqual(self.get('/api/async/tasks/0/').status_code, 404)
+        self.assertEqual(self.get('/api/async/projects/0/tasks_summary/').status_code, 404)
+        self.assertEqual(self.get('/api/async/projects/abc/tasks_summary/').status_code, 404)
+        response = async_to_sync(self.async_client.post)('/api/async/tasks/', headers=self.headers)
+        self.assertEqual(response.status_code, 405)
+
+
+class ParallelQueriesTest(AsyncEndpointMixin, TransactionTestCase):
+    """With ASYNC_PARALLEL_QUERIES the queries run on worker-thread connections"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.create_data()
+
+    @override_settings(ASYNC_PARALLEL_QUERIES=True)
+    def test_list(self):
+        response = self.get('/api/async/tasks/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 26)
@@ -0,0 +1,84 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.authentication.authentication import CachedJWTAuthentication
+from apps.core.cache import get_cache, get_versions, user_scope
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.token = AccessToken.for_user(self.user)
+        self.auth = CachedJWTAuthentication()
+
+    def test_user_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.auth.get_user(self.token), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.auth.get_user(self.token), self.user)
+
+    def test_only_the_fields_requests_need_are_cached(self):
+        self.user.first_name = 'Ada'
+        self.user.save()
+        self.auth.get_user(self.token)
+        cached = self.auth.get_user(self.token)
+        self.assertEqual((cached.username, cached.is_active, cached.is_staff), ('testuser', True, False))
+        self.assertEqual(cached.get_deferred_fields(), {
+            field.attname for field in User._meta.concrete_fields
+        } - {'id', 'username', 'email', 'is_active', 'is_staff', 'is_superuser'})
+        [version] = get_versions([user_scope(self.user.pk)])
+        entry = get_cache().get(f'auth-user:{self.user.pk}:{version}')
+        self.assertNotIn(self.user.password, str(entry))
+
+        # Deferred fields load on access and aren't overwritten on save
+        with self.assertNumQueries(1):
+            self.assertEqual(cached.first_name, 'Ada')
+        cached.is_staff = True
+        cached.save()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('testpass'))
+        self.assertTrue(self.user.is_staff)
+
+    def test_revoked_tokens_are_rejected_from_the_cache(self):
+        from unittest import mock
+
+        with mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True):
+            token = AccessToken.for_user(self.user)
+            self.auth.get_user(token)
+            self.assertEqual(self.auth.get_user(token), self.user)
+            token[api_settings.REVOKE_TOKEN_CLAIM] = 'stale'
+            with self.assertNumQueries(0), self.assertRaises(AuthenticationFailed):
+                self.auth.get_user(token)
+
+    def test_saving_the_user_invalidates_the_entry(self):
+        self.auth.get_user(self.token)
+        self.user.first_name = 'Changed'
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.auth.get_user(self.token).first_name, 'Changed')
+
+    def test_deactivated_and_deleted_users_are_rejected(self):
+        self.auth.get_user(self.token)
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.token)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=0)
+    def test_zero_timeout_disables_the_cache(self):
+        self.auth.get_user(self.token)
+        with self.assertNumQueries(1):
+            self.auth.get_user(self.token)
+
+    def test_api_requests_skip_the_user_query(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(client.get('/api/projects/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get('/api/projects/').status_code, 200)
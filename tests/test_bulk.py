@@ -0,0 +1,92 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.projects.models import Project, ProjectStats, Task, DevelopmentTask, DesignTask
+
+class BulkTaskAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass', email='test@example.com'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name='Test Project',
+            start_date='2023-01-01',
+            end_date='2030-12-31',
+            created_by=self.user
+        )
+        self.due = (timezone.now() + timedelta(days=3)).isoformat()
+
+    def items(self, count, **extra):
+        return [
+            dict({'title': f'Task {i}', 'project': self.project.id, 'due_date': self.due}, **extra)
+            for i in range(count)
+        ]
+
+    def test_bulk_create_subtype(self):
+        mail.outbox = []
+        payload = self.items(30, technology='django', assigned_to_id=self.user.id, estimated_hours=2)
+        with override_settings(TASK_NOTIFICATIONS_SYNC=False):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with self.assertNumQueries(9):
+                    response = self.client.post(
+                        '/api/development-tasks/bulk-create/', payload, format='json'
+                    )
+        # One notification batch, plus the cache version bump
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 30)
+        self.assertEqual(DevelopmentTask.objects.filter(technology='django').count(), 30)
+        self.assertEqual(len(mail.outbox), 30)
+        stats = ProjectStats.objects.get(project=self.project)
+        self.assertEqual(stats.total_tasks, 30)
+        self.assertEqual(stats.estimated_hours, 60)
+
+    def test_bulk_create_reports_row_errors(self):
+        payload = self.items(3)
+        payload[1]['project'] = 9999
+        payload[2]['assigned_to_id'] = 9999
+        response = self.client.post('/api/tasks/bulk-create/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1, 2])
+        self.assertIn('project', response.data['errors'][0]['errors'])
+        self.assertIn('assigned_to_id', response.data['errors'][1]['errors'])
+        self.assertEqual(Task.objects.count(), 0)
+
+    def test_bulk_update_and_transition(self):
+        tasks = [
+            DesignTask.objects.create(
+                title=f'Design {i}', project=self.project, due_date=timezone.now() + timedelta(days=1)
+            )
+            for i in range(5)
+        ]
+        payload = [{'id': t.id, 'design_tool': 'Figma', 'actual_hours': 3} for t in tasks]
+        response = self.client.patch('/api/design-tasks/bulk-update/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(DesignTask.objects.filter(design_tool='Figma', actual_hours=3).count(), 5)
+        self.assertEqual(ProjectStats.objects.get(project=self.project).actual_hours, 15)
+
+        ids = [t.id for t in tasks[:3]]
+        response = self.client.post(
+            '/api/tasks/bulk-transition/', {'ids': ids, 'status': 'completed'}, format='json'
+        )
+        self.assertEqual(response.data, {'updated': 3})
+        self.assertEqual(Task.objects.filter(status='completed').count(), 3)
+        self.assertEqual(ProjectStats.objects.get(project=self.project).completed_tasks, 3)
+
+        response = self.client.post(
+            '/api/tasks/bulk-transition/', {'ids': [ids[0], 9999], 'status': 'blocked'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Task.objects.filter(status='blocked').count(), 0)
+
+        payload = [{'id': tasks[3].id, 'status': 'completed'}, {'id': tasks[3].id, 'status': 'completed'}]
+        response = self.client.patch('/api/design-tasks/bulk-update/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1])
+        self.assertEqual(ProjectStats.objects.get(project=self.project).completed_tasks, 3)
@@ -0,0 +1,116 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from apps.core.cache import get_versions, project_scope
+from apps.projects.bulk import transition_tasks
+from apps.projects.models import Project, Task
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name='Test Project',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.user
+        )
+        self.other = Project.objects.create(
+            name='Other Project',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.user
+        )
+
+    def create_task(self, project, **kwargs):
+        return Task.objects.create(
+            title='Task',
+            project=project,
+            due_date=timezone.now() + timedelta(days=7),
+            created_by=self.user,
+            **kwargs
+        )
+
+    def test_repeated_reads_are_served_from_cache(self):
+        urls = [
+            '/api/projects/',
+            f'/api/projects/{self.project.pk}/',
+            f'/api/projects/{self.project.pk}/tasks_summary/',
+            '/api/tasks/',
+        ]
+        for url in urls:
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(first.data, second.data)
+
+    def test_task_write_invalidates_its_project_only(self):
+        summary = f'/api/projects/{self.project.pk}/tasks_summary/'
+        other_summary = f'/api/projects/{self.other.pk}/tasks_summary/'
+        self.client.get(summary)
+        self.client.get(other_summary)
+        self.client.get('/api/tasks/')
+
+        self.create_task(self.project)
+        self.assertEqual(self.client.get(summary).data['total_tasks'], 1)
+        self.assertEqual(len(self.client.get('/api/tasks/').data['results']), 1)
+        with self.assertNumQueries(0):
+            self.client.get(other_summary)
+
+    def test_bulk_transition_bumps_versions(self):
+        task = self.create_task(self.project)
+        before = get_versions([project_scope(self.project.pk)])
+        transition_tasks(Task.objects.filter(pk=task.pk), Task.StatusChoices.COMPLETED)
+        self.assertGreater(get_versions([project_scope(self.project.pk)]), before)
+
+    def test_responses_are_cached_per_user(self):
+        self.client.get('/api/projects/')
+        other_user = User.objects.create_user(username='other', password='testpass')
+        client = APIClient()
+        client.force_authenticate(user=other_user)
+        with self.assertNumQueries(3):
+            client.get('/api/projects/')
+
+    def test_unchanged_responses_are_not_modified(self):
+        urls = [
+            f'/api/projects/{self.project.pk}/',
+            f'/api/projects/{self.project.pk}/tasks_summary/',
+            '/api/tasks/',
+        ]
+        for url in urls:
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+            self.assertEqual(response['ETag'], first['ETag'])
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+            self.assertEqual(response.status_code, 304)
+
+    def test_writes_change_the_etag(self):
+        url = f'/api/projects/{self.project.pk}/'
+        other_url = f'/api/projects/{self.other.pk}/'
+        etag = self.client.get(url)['ETag']
+        other_etag = self.client.get(other_url)['ETag']
+        self.create_task(self.project)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(other_url, HTTP_IF_NONE_MATCH=other_etag).status_code, 304)
+
+    def test_etags_differ_per_user_and_format(self):
+        etag = self.client.get('/api/projects/')['ETag']
+        self.assertNotEqual(self.client.get('/api/projects/', HTTP_ACCEPT='text/html')['ETag'], etag)
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(username='other'))
+        self.assertEqual(client.get('/api/projects/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_responses_without_a_working_cache(self):
+        first = self.client.get('/api/projects/')
+        self.assertEqual(first.status_code, 200)
+        # Nothing can be validated without stored versions
+        self.assertEqual(self.client.get('/api/projects/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
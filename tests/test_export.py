@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from apps.projects.models import Project, Task, DevelopmentTask, DesignTask
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name='Test Project',
+            description='Test Description',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.user
+        )
+        common = dict(project=self.project, due_date=timezone.now() + timedelta(days=7), created_by=self.user)
+        Task.objects.create(title='Plain', status='todo', **common)
+        DevelopmentTask.objects.create(title='Backend', technology='django', status='todo', **common)
+        DesignTask.objects.create(title='Mockups', design_type='ui_ux', status='completed', **common)
+
+    def read(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_task_csv_includes_subtype_columns(self):
+        response, body = self.read('/api/tasks/export/')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="tasks.csv"')
+        rows = {row['title']: row for row in csv.DictReader(io.StringIO(body))}
+        self.assertEqual(set(rows), {'Plain', 'Backend', 'Mockups'})
+        self.assertEqual(rows['Backend']['task_type'], 'development')
+        self.assertEqual(rows['Backend']['technology'], 'django')
+        self.assertEqual(rows['Mockups']['task_type'], 'design')
+        self.assertEqual(rows['Mockups']['design_type'], 'ui_ux')
+        self.assertEqual(rows['Plain']['task_type'], 'task')
+        self.assertEqual(rows['Plain']['technology'], '')
+
+    def test_task_ndjson_applies_list_filters(self):
+        response, body = self.read('/api/tasks/export/?export_format=ndjson&status=todo&ordering=title')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Backend', 'Plain'])
+        self.assertEqual(rows[0]['project_name'], 'Test Project')
+        self.assertIsNone(rows[1]['design_type'])
+
+    def test_project_export(self):
+        _, body = self.read('/api/projects/export/?export_format=ndjson')
+        (row,) = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(row['name'], 'Test Project')
+        self.assertEqual(row['total_tasks'], 3)
+        self.assertEqual(row['completed_tasks'], 1)
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get('/api/tasks/export/?export_format=xml')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,118 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from apps.projects.bulk import transition_tasks
+from apps.projects.history import rollup_project_snapshots
+from apps.projects.models import Project, Task, DevelopmentTask, TaskStatusEvent, ProjectDailySnapshot
+
+class StatusHistoryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.project = Project.objects.create(
+            name='Test Project',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.user
+        )
+
+    def create_task(self, model=Task, **kwargs):
+        return model.objects.create(
+            title='Task',
+            project=self.project,
+            due_date=timezone.now() + timedelta(days=7),
+            created_by=self.user,
+            **kwargs
+        )
+
+    def transitions(self, task):
+        return list(task.status_events.values_list('from_status', 'to_status'))
+
+    def test_save_records_creation_and_status_changes_only(self):
+        task = self.create_task(DevelopmentTask)
+        task.title = 'Renamed'
+        task.save()
+        task.status = Task.StatusChoices.IN_PROGRESS
+        task.updated_by = self.user
+        task.save()
+        self.assertEqual(self.transitions(task), [('', 'todo'), ('todo', 'in_progress')])
+        self.assertEqual(task.status_events.last().changed_by, self.user)
+        self.assertEqual(task.status_events.last().project, self.project)
+
+    def test_bulk_transition_records_one_event_per_changed_task(self):
+        tasks = [self.create_task() for _ in range(3)]
+        Task.objects.filter(pk=tasks[0].pk).update(status=Task.StatusChoices.COMPLETED)
+        # SELECT, UPDATE, stats UPDATE and one event INSERT, plus savepoints
+        with self.assertNumQueries(8):
+            transition_tasks(Task.objects.filter(pk__in=[t.pk for t in tasks]), Task.StatusChoices.COMPLETED, self.user)
+        completed = TaskStatusEvent.objects.filter(to_status=Task.StatusChoices.COMPLETED)
+        self.assertEqual(sorted(completed.values_list('task_id', flat=True)), [tasks[1].pk, tasks[2].pk])
+
+    def test_admin_action_records_events(self):
+        task = self.create_task()
+        admin_user = User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.force_login(admin_user)
+        self.client.post('/admin/projects/task/', {
+            'action': 'mark_completed',
+            '_selected_action': [task.pk],
+        })
+        self.assertEqual(self.transitions(task), [('', 'todo'), ('todo', 'completed')])
+        self.assertEqual(Project.objects.get(pk=self.project.pk).task_stats.completed_tasks, 1)
+
+
+class BurndownVelocityTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name='Test Project',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.user
+        )
+        for _ in range(4):
+            Task.objects.create(
+                title='Task',
+                project=self.project,
+                due_date=timezone.now() + timedelta(days=7),
+                created_by=self.user
+            )
+
+    def test_rollup_and_reports(self):
+        transition_tasks(Task.objects.all()[:3], Task.StatusChoices.COMPLETED, self.user)
+        self.assertEqual(rollup_project_snapshots(), 1)
+        snapshot = ProjectDailySnapshot.objects.get(project=self.project)
+        self.assertEqual(snapshot.date, timezone.localdate())
+        self.assertEqual((snapshot.total_tasks, snapshot.completed_tasks), (4, 3))
+        self.assertEqual((snapshot.created_count, snapshot.completed_count), (4, 3))
+        # Re-running the same day replaces the row
+        rollup_project_snapshots()
+        self.assertEqual(ProjectDailySnapshot.objects.count(), 1)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/projects/{self.project.pk}/burndown/?days=7')
+        self.assertEqual(response.data['results'], [{
+            'date': timezone.localdate(), 'total_tasks': 4, 'completed_tasks': 3, 'remaining_tasks': 1,
+        }])
+
+        response = self.client.get(f'/api/projects/{self.project.pk}/velocity/?weeks=4')
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(response.data['results'][-1]['completed'], 3)
+        self.assertEqual(response.data['average_completed'], 0.75)
+
+    def test_scheduled_rollup_covers_the_day_that_ended(self):
+        from apps.projects.tasks import rollup_project_snapshots as rollup_task
+
+        yesterday = timezone.localtime() - timedelta(days=1)
+        # Created in the last minutes of yesterday
+        TaskStatusEvent.objects.update(changed_at=yesterday.replace(hour=23, minute=58))
+        self.assertEqual(rollup_task.run(), 1)
+        snapshot = ProjectDailySnapshot.objects.get(project=self.project)
+        self.assertEqual(snapshot.date, timezone.localdate() - timedelta(days=1))
+        self.assertEqual(snapshot.created_count, 4)
+
+    def test_report_parameters_are_validated(self):
+        response = self.client.get(f'/api/projects/{self.project.pk}/burndown/?days=0')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,111 @@
+import os
+import tempfile
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from apps.projects.importer import import_tasks, read_rows
+from apps.projects.models import Project, ProjectStats, Task, DevelopmentTask, DesignTask, TaskStatusEvent
+
+class ImportTasksTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.dev = User.objects.create_user(username='dev', email='dev@example.com')
+        self.project = Project.objects.create(
+            name='Test Project',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.user
+        )
+        self.due = (timezone.now() + timedelta(days=7)).isoformat()
+
+    def row(self, **kwargs):
+        row = {'title': 'Task', 'project_name': 'Test Project', 'due_date': self.due}
+        row.update(kwargs)
+        return row
+
+    def test_creates_all_task_types_with_stats_and_history(self):
+        rows = [
+            self.row(title='Plain', status='completed'),
+            self.row(title='Backend', task_type='development', technology='django',
+                     assigned_to_username='dev', estimated_hours='5'),
+            self.row(title='Mockups', task_type='design', design_type='mockup'),
+        ]
+        result = import_tasks(rows, created_by=self.user)
+        self.assertEqual((result.created, result.errors), (3, []))
+        backend = DevelopmentTask.objects.get()
+        self.assertEqual((backend.technology, backend.assigned_to, backend.estimated_hours), ('django', self.dev, 5))
+        self.assertEqual(DesignTask.objects.get().design_type, 'mockup')
+        stats = ProjectStats.objects.get(project=self.project)
+        self.assertEqual((stats.total_tasks, stats.completed_tasks), (3, 1))
+        self.assertEqual(TaskStatusEvent.objects.filter(from_status='').count(), 3)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_invalid_rows_are_skipped_and_reported(self):
+        rows = [
+            self.row(title='Good'),
+            self.row(project_name='Missing'),
+            self.row(status='bogus'),
+            self.row(due_date=''),
+            self.row(project_id='abc'),
+        ]
+        result = import_tasks(rows, created_by=self.user)
+        self.assertEqual(result.created, 1)
+        self.assertEqual([number for number, _ in result.errors], [2, 3, 4, 5])
+        self.assertEqual(Task.objects.get().title, 'Good')
+
+    def test_project_names_match_one_active_project(self):
+        for name, is_active in (('Twin', True), ('Twin', True), ('Archived', False)):
+            Project.objects.create(
+                name=name, start_date=timezone.now().date(), end_date=timezone.now().date(),
+                created_by=self.user, is_active=is_active
+            )
+        rows = [self.row(project_name='Twin'), self.row(project_name='Archived'), self.row()]
+        result = import_tasks(rows, created_by=self.user)
+        self.assertEqual(result.created, 1)
+        self.assertEqual([number for number, _ in result.errors], [1, 2])
+        self.assertIn('more than one project', result.errors[0][1])
+
+        # Unknown keys are looked up once, not once per chunk
+        with self.assertNumQueries(1):
+            result = import_tasks([self.row(project_name='Missing')] * 3, created_by=self.user, chunk_size=1)
+        self.assertEqual(len(result.errors), 3)
+
+    def test_lookups_and_inserts_are_batched_per_chunk(self):
+        rows = [self.row(task_type='development', assigned_to_username='dev') for _ in range(40)]
+        # Keys are looked up once (2 queries); each chunk then runs one task
+        # INSERT, one stats UPDATE and one event INSERT plus savepoints (9 queries)
+        with self.assertNumQueries(20):
+            result = import_tasks(rows, created_by=self.user, chunk_size=20)
+        self.assertEqual(result.created, 40)
+
+    def test_notify_queues_batched_emails(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            import_tasks([self.row(assigned_to_username='dev')], created_by=self.user, notify=True)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_export_round_trip_through_command(self):
+        DevelopmentTask.objects.create(
+            title='Backend', technology='react', project=self.project,
+            due_date=timezone.now() + timedelta(days=1), created_by=self.user
+        )
+        from rest_framework.test import APIClient
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        body = b''.join(client.get('/api/tasks/export/?export_format=ndjson').streaming_content)
+
+        with tempfile.NamedTemporaryFile('wb', suffix='.ndjson', delete=False) as f:
+            f.write(body)
+        self.addCleanup(os.unlink, f.name)
+        out = StringIO()
+        call_command('import_tasks', f.name, stdout=out, stderr=StringIO())
+        self.assertIn('Imported 1 tasks', out.getvalue())
+        self.assertEqual(list(DevelopmentTask.objects.values_list('technology', flat=True)), ['react', 'react'])
+
+    def test_read_rows_csv(self):
+        rows = list(read_rows(StringIO('title,project_name\nA,Test Project\n'), 'csv'))
+        self.assertEqual(rows, [{'title': 'A', 'project_name': 'Test Project'}])
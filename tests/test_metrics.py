@@ -0,0 +1,84 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from apps.core import metrics
+from apps.projects.models import Project, Task
+from apps.projects.tasks import mark_overdue_tasks
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsTest(TestCase):
+    def setUp(self):
+        for metric in metrics.REGISTRY:
+            metric.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name='Test Project',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.user
+        )
+        Task.objects.create(
+            title='Task', project=self.project, created_by=self.user,
+            due_date=timezone.now() - timedelta(hours=1)
+        )
+
+    def server_timing(self, response):
+        parts = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, duration = entry.split(';')[:2]
+            parts[name] = float(duration.split('=')[1])
+        return parts
+
+    def metrics(self):
+        return self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').content.decode()
+
+    @override_settings(PERF_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get('/api/tasks/')
+        self.assertEqual(response.status_code, 200)
+        timing = self.server_timing(response)
+        self.assertEqual(set(timing), {'db', 'serialize', 'render', 'total'})
+        self.assertIn('queries"', response['Server-Timing'])
+        self.assertGreater(timing['serialize'], 0)
+        self.assertGreater(timing['render'], 0)
+        self.assertGreaterEqual(timing['total'], timing['db'])
+
+    @override_settings(PERF_SERVER_TIMING=False)
+    def test_server_timing_is_only_sent_to_staff_when_disabled(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/tasks/'))
+        self.user.is_staff = True
+        self.client.force_authenticate(user=self.user)
+        self.assertIn('Server-Timing', self.client.get('/api/tasks/'))
+
+    def test_requests_are_aggregated_per_route(self):
+        self.client.get('/api/tasks/')
+        self.client.get(f'/api/projects/{self.project.pk}/')
+        body = self.metrics()
+        self.assertIn('http_request_duration_seconds_count{route="task-list",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_sql_queries_bucket{route="project-detail",method="GET",le="+Inf"} 1', body)
+        self.assertIn('# TYPE http_request_serializer_duration_seconds histogram', body)
+
+    def test_celery_task_duration_and_rows(self):
+        mark_overdue_tasks.delay()
+        body = self.metrics()
+        self.assertIn(
+            'celery_task_duration_seconds_count{task="apps.projects.tasks.mark_overdue_tasks",state="success"} 1',
+            body
+        )
+        self.assertIn('celery_task_rows_sum{task="apps.projects.tasks.mark_overdue_tasks"} 1.0', body)
+
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_need_a_token_unless_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
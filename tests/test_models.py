@@ -2,7 +2,7 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
-from apps.projects.models import Project, DevelopmentTask, DesignTask
+from apps.projects.models import Project, Task, DevelopmentTask, DesignTask, resolve_task_subtypes
 
 class ProjectModelTest(TestCase):
     def setUp(self):
@@ -55,3 +55,71 @@ class TaskModelTest(TestCase):
         )
         self.assertEqual(task.task_type, 'design')
         self.assertEqual(task.design_type, 'ui_ux')
+
+    def test_overdue_queryset_matches_property(self):
+        late = DevelopmentTask.objects.create(
+            title='Late Task',
+            project=self.project,
+            due_date=timezone.now() - timedelta(days=1),
+            created_by=self.user
+        )
+        DevelopmentTask.objects.create(
+            title='Done Task',
+            project=self.project,
+            status='completed',
+            due_date=timezone.now() - timedelta(days=1),
+            created_by=self.user
+        )
+        DesignTask.objects.create(
+            title='Future Task',
+            project=self.project,
+            due_date=timezone.now() + timedelta(days=1),
+            created_by=self.user
+        )
+        overdue = list(Task.objects.overdue())
+        self.assertEqual([t.pk for t in overdue], [late.pk])
+        self.assertTrue(all(t.is_overdue for t in overdue))
+        flags = dict(Task.objects.with_overdue_flag().values_list('title', 'overdue_flag'))
+        self.assertEqual(flags, {'Late Task': True, 'Done Task': False, 'Future Task': False})
+
+    def test_subtypes_share_the_task_table(self):
+        dev = DevelopmentTask.objects.create(
+            title='Dev Task', project=self.project, created_by=self.user,
+            due_date=timezone.now() + timedelta(days=7)
+        )
+        DesignTask.objects.create(
+            title='Design Task', project=self.project, created_by=self.user,
+            due_date=timezone.now() + timedelta(days=7)
+        )
+        Task.objects.create(
+            title='Plain Task', project=self.project, created_by=self.user,
+            due_date=timezone.now() + timedelta(days=7)
+        )
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertEqual(list(DevelopmentTask.objects.values_list('pk', flat=True)), [dev.pk])
+        self.assertEqual(dev.branch_name, '')
+        plain = Task.objects.get(title='Plain Task')
+        self.assertEqual(plain.task_type, 'task')
+        self.assertIsNone(plain.technology)
+        self.assertFalse(DesignTask.objects.filter(pk=dev.pk).exists())
+
+    def test_resolve_task_subtypes_runs_no_queries(self):
+        DevelopmentTask.objects.create(
+            title='Dev Task', project=self.project, created_by=self.user,
+            due_date=timezone.now() + timedelta(days=7)
+        )
+        tasks = list(Task.objects.all())
+        with self.assertNumQueries(0):
+            [task] = resolve_task_subtypes(tasks)
+        self.assertIs(type(task), DevelopmentTask)
+
+    def test_deleting_a_subtype_updates_stats(self):
+        task = DesignTask.objects.create(
+            title='Design Task', project=self.project, created_by=self.user,
+            due_date=timezone.now() + timedelta(days=7)
+        )
+        self.project.stats.refresh_from_db()
+        self.assertEqual(self.project.stats.total_tasks, 1)
+        task.delete()
+        self.project.stats.refresh_from_db()
+        self.assertEqual(self.project.stats.total_tasks, 0)
@@ -0,0 +1,136 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from apps.core.nplusone import NPlusOneError, detect_nplusone, query_shape
+from apps.projects.models import Project, Task, DevelopmentTask, DesignTask
+
+# Rows per project in the first measurement; the second doubles them
+ROWS = 6
+
+# Most queries each request may run, whatever the number of rows
+API_BUDGETS = [
+    ('get', '/api/projects/', 3),
+    ('get', '/api/projects/?expand=tasks,tasks.assigned_to', 4),
+    ('get', '/api/projects/{project}/', 3),
+    ('patch', '/api/projects/{project}/', 7),
+    ('delete', '/api/projects/{project}/', 11),
+    # The stats row, and the overdue count that changes with time alone
+    ('get', '/api/projects/{project}/tasks_summary/', 2),
+    ('get', '/api/projects/export/', 1),
+    ('get', '/api/tasks/', 2),
+    ('get', '/api/tasks/?expand=assigned_to,project', 2),
+    ('get', '/api/tasks/overdue/', 2),
+    ('get', '/api/tasks/{task}/', 1),
+    ('get', '/api/tasks/export/', 1),
+    ('get', '/api/development-tasks/?expand=assigned_to', 2),
+    ('get', '/api/design-tasks/?expand=assigned_to', 2),
+]
+ADMIN_BUDGETS = [
+    ('/admin/projects/project/', 8),
+    ('/admin/projects/project/{project}/change/', 9),
+    ('/admin/projects/task/', 9),
+    ('/admin/projects/developmenttask/', 9),
+    ('/admin/projects/designtask/', 9),
+]
+
+
+class QueryBudgetTest(TestCase):
+    """New N+1 patterns in the API or admin show up as a blown budget"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_superuser(username='admin', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.client.force_login(self.user)
+        self.count = 0
+
+    def create_project(self, rows):
+        today = timezone.now().date()
+        project = Project.objects.create(
+            name=f'Project {self.count}', start_date=today,
+            end_date=today + timedelta(days=30), created_by=self.user
+        )
+        for i in range(rows):
+            self.count += 1
+            user = User.objects.create_user(username=f'user{self.count}')
+            project.assigned_to.add(user)
+            model = (Task, DevelopmentTask, DesignTask)[i % 3]
+            task = model.objects.create(
+                title=f'Task {self.count}', project=project, assigned_to=user,
+                created_by=self.user, due_date=timezone.now() - timedelta(days=1)
+            )
+        return project, task
+
+    def count_queries(self, request, url, rows):
+        project, task = self.create_project(rows)
+        url = url.format(project=project.pk, task=task.pk)
+        with CaptureQueriesContext(connection) as queries:
+            response = request(url)
+            if hasattr(response, 'streaming_content'):
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, url)
+        return len(queries)
+
+    def assert_budget(self, method, url, budget):
+        request = getattr(self.client, method)
+        if method == 'patch':
+            request = lambda url: self.client.patch(url, {'description': 'Changed'}, format='json')
+        with self.subTest(method=method, url=url):
+            # Warm up per-process caches such as content types
+            self.count_queries(request, url, 1)
+            small = self.count_queries(request, url, ROWS)
+            large = self.count_queries(request, url, ROWS * 2)
+            self.assertEqual(small, large, f'{url} runs more queries as rows grow')
+            self.assertLessEqual(large, budget, f'{url} is over its query budget')
+
+    def test_api_query_budgets(self):
+        for method, url, budget in API_BUDGETS:
+            self.assert_budget(method, url, budget)
+
+    def test_admin_query_budgets(self):
+        for url, budget in ADMIN_BUDGETS:
+            self.assert_budget('get', url, budget)
+
+
+class NPlusOneDetectorTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser')
+        self.project = Project.objects.create(
+            name='Test Project', start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30), created_by=self.user
+        )
+        for i in range(5):
+            Task.objects.create(
+                title=f'Task {i}', project=self.project, created_by=self.user,
+                due_date=timezone.now()
+            )
+
+    def test_query_shape_ignores_literals_and_in_list_length(self):
+        self.assertEqual(
+            query_shape('SELECT * FROM t WHERE id IN (%s, %s, %s) AND  name = \'x\''),
+            query_shape('SELECT * FROM t WHERE id IN (%s) AND name = \'y\''),
+        )
+        self.assertNotEqual(query_shape('SELECT a FROM t'), query_shape('SELECT b FROM t'))
+
+    def test_repeated_queries_raise(self):
+        with self.assertRaisesMessage(NPlusOneError, '5x from tests/test_query_budgets.py'):
+            with detect_nplusone('loop', mode='raise'):
+                for task in Task.objects.all():
+                    task.project.name
+
+    def test_batched_queries_pass(self):
+        with detect_nplusone('loop', mode='raise') as recorder:
+            for task in Task.objects.select_related('project'):
+                task.project.name
+        self.assertEqual(recorder.repeated(), [])
+
+    @override_settings(NPLUSONE_MODE='log')
+    def test_log_mode_warns(self):
+        with self.assertLogs('apps.core.nplusone', 'WARNING'):
+            with detect_nplusone('loop'):
+                for task in Task.objects.all():
+                    task.project.name
@@ -0,0 +1,108 @@
+import os
+
+from django.test import TransactionTestCase, override_settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from apps.core.cache import get_cache
+from apps.core.replicas import end_task, pin_key, read_from, start_task, use_primary
+from apps.projects.models import Project, Task
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], API_CACHE_TIMEOUT=0)
+class ReplicaRouterTest(TransactionTestCase):
+    """``replica`` is a separate database that never catches up, so every
+    read it serves misses what was written to ``default``"""
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass', email='test@example.com')
+        self.user.save(using='replica')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_project(self):
+        return Project.objects.create(
+            name='Test Project', start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30), created_by=self.user
+        )
+
+    def test_reads_go_to_the_replica_and_writes_to_the_primary(self):
+        self.create_project()
+        start_task()
+        self.addCleanup(end_task)
+        self.assertFalse(Project.objects.exists())
+        self.assertTrue(Project.objects.using('default').exists())
+        with use_primary():
+            self.assertTrue(Project.objects.exists())
+        with transaction.atomic():
+            self.assertTrue(Project.objects.exists())
+        with read_from('replica'), transaction.atomic():
+            self.assertFalse(Project.objects.exists())
+
+    def test_reads_outside_a_request_or_task_go_to_the_primary(self):
+        from django.core.management import call_command
+
+        project = self.create_project()
+        self.assertTrue(Project.objects.exists())
+        Task.objects.create(
+            title='Task', project=project, assigned_to=self.user, created_by=self.user,
+            due_date=timezone.now() + timedelta(days=1)
+        )
+        project.stats.total_tasks = 0
+        project.stats.save()
+        call_command('rebuild_project_stats', stdout=open(os.devnull, 'w'))
+        project.stats.refresh_from_db(using='default')
+        self.assertEqual(project.stats.total_tasks, 1)
+
+    def test_clients_read_their_writes(self):
+        self.assertEqual(self.client.get('/api/projects/').json()['count'], 0)
+        data = {'name': 'Test Project', 'start_date': '2023-01-01', 'end_date': '2023-12-31'}
+        response = self.client.post('/api/projects/', data)
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('db_pin', response.cookies)
+        self.assertEqual(self.client.get('/api/projects/').json()['count'], 1)
+
+        # Token clients keep no cookies; they are pinned by user
+        other = APIClient()
+        other.force_authenticate(user=self.user)
+        self.assertEqual(other.get('/api/projects/').json()['count'], 1)
+        get_cache().delete(pin_key(self.user.pk))
+        self.assertEqual(other.get('/api/projects/').json()['count'], 0)
+
+    def test_writes_load_their_rows_from_the_primary(self):
+        project = self.create_project()
+        task = Task.objects.create(
+            title='Task', project=project, assigned_to=self.user, created_by=self.user,
+            due_date=timezone.now() + timedelta(days=1)
+        )
+        project.save(using='replica')
+        task.save(using='replica')
+        # Another client completes the task; the replica hasn't caught up
+        task.status = Task.StatusChoices.COMPLETED
+        task.save()
+
+        response = self.client.patch(f'/api/tasks/{task.pk}/', {'priority': 'low'})
+        self.assertEqual(response.status_code, 200)
+        task.refresh_from_db(using='default')
+        self.assertEqual(task.status, Task.StatusChoices.COMPLETED)
+        self.assertEqual(task.priority, 'low')
+        project.stats.refresh_from_db(using='default')
+        self.assertEqual(project.stats.completed_tasks, 1)
+
+    def test_reporting_tasks_read_the_reporting_database(self):
+        from apps.projects.tasks import send_daily_summary_shard
+
+        project = self.create_project()
+        Task.objects.create(
+            title='Overdue', project=project, assigned_to=self.user, created_by=self.user,
+            due_date=timezone.now() - timedelta(days=1)
+        )
+        with self.settings(REPORTING_DATABASE='replica', DATABASE_REPLICAS=[]):
+            self.assertEqual(send_daily_summary_shard.run(self.user.pk, self.user.pk), 0)
+        with self.settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(send_daily_summary_shard.run(self.user.pk, self.user.pk), 1)
@@ -0,0 +1,48 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from io import StringIO
+from apps.projects.models import Project, ProjectStats, Task, DevelopmentTask, DesignTask
+from apps.projects.sample_data import generate_sample_data
+from apps.projects.stats import COUNTER_FIELDS, rebuild_project_stats
+
+class SampleDataTest(TestCase):
+    def snapshot(self):
+        return list(
+            Task.objects.order_by('id').values_list(
+                'title', 'status', 'priority', 'project__name', 'assigned_to__username', 'estimated_hours'
+            )
+        )
+
+    def test_generates_requested_counts_and_subtypes(self):
+        self.assertEqual(generate_sample_data(5, 3, 300, seed=7, batch_size=100), (5, 3, 300))
+        self.assertEqual(Task.objects.count(), 300)
+        self.assertEqual(Project.objects.count(), 3)
+        self.assertGreater(DevelopmentTask.objects.count(), 0)
+        self.assertGreater(DesignTask.objects.count(), 0)
+        self.assertTrue(Task.objects.overdue().exists())
+        # Overdue tasks are marked notified so the scan doesn't email them all
+        self.assertFalse(Task.objects.overdue().filter(overdue_notified_at__isnull=True).exists())
+        self.assertEqual(Project.assigned_to.through.objects.values('project').distinct().count(), 3)
+
+    def test_stats_match_a_rebuild(self):
+        generate_sample_data(3, 2, 120, seed=1, batch_size=50)
+        generated = list(ProjectStats.objects.order_by('project').values(*COUNTER_FIELDS))
+        rebuild_project_stats()
+        self.assertEqual(list(ProjectStats.objects.order_by('project').values(*COUNTER_FIELDS)), generated)
+        self.assertEqual(sum(row['total_tasks'] for row in generated), 120)
+
+    def test_same_seed_same_data(self):
+        generate_sample_data(4, 2, 50, seed=3)
+        first = self.snapshot()
+        Task.objects.all().delete()
+        Project.objects.all().delete()
+        generate_sample_data(4, 2, 50, seed=3)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_command_scale_mode(self):
+        out = StringIO()
+        call_command('create_sample_data', '--users', '2', '--projects', '1', '--tasks', '10', stdout=out)
+        self.assertIn('Created 2 users, 1 projects and 10 tasks', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('create_sample_data', '--users', '0', '--tasks', '5', stdout=StringIO())
@@ -0,0 +1,145 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from apps.projects.models import Project, Task, DevelopmentTask
+from apps.projects.search import search
+
+class FullTextSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name='Payments Platform',
+            description='Billing and invoices',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.user
+        )
+
+    def create_task(self, model=Task, **kwargs):
+        return model.objects.create(
+            project=self.project,
+            due_date=timezone.now() + timedelta(days=7),
+            created_by=self.user,
+            **kwargs
+        )
+
+    def search_titles(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [row['title'] for row in response.data['results']]
+
+    def test_tasks_are_ranked_by_relevance(self):
+        self.create_task(title='Write docs', description='Mention the invoice export')
+        self.create_task(title='Invoice export', description='Export invoices as CSV')
+        self.create_task(title='Unrelated', description='Nothing here')
+        # Stemming matches "invoices" and title matches rank first
+        self.assertEqual(
+            self.search_titles('/api/tasks/?search=invoices'), ['Invoice export', 'Write docs']
+        )
+
+    def test_explicit_ordering_overrides_rank(self):
+        self.create_task(title='Invoice export', description='')
+        self.create_task(title='Write docs', description='invoice')
+        self.assertEqual(
+            self.search_titles('/api/tasks/?search=invoice&ordering=created_at'),
+            ['Invoice export', 'Write docs']
+        )
+
+    def test_subtype_fields_are_searchable(self):
+        self.create_task(DevelopmentTask, title='Backend', technology='django')
+        self.create_task(DevelopmentTask, title='Frontend', technology='react')
+        self.assertEqual(self.search_titles('/api/development-tasks/?search=django'), ['Backend'])
+        self.assertEqual(self.search_titles('/api/tasks/?search=django'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        task = self.create_task(title='Old title')
+        task.title = 'Fresh title'
+        task.save()
+        self.assertEqual(list(search(Task.objects.all(), 'fresh')), [task])
+        self.assertFalse(search(Task.objects.all(), 'old').exists())
+        task.delete()
+        self.assertFalse(search(Task.objects.all(), 'fresh').exists())
+
+    def test_search_syntax_is_not_interpreted(self):
+        self.create_task(title='Invoice export')
+        self.assertEqual(self.search_titles('/api/tasks/?search="invoice" OR NEAR(*'), [])
+        self.assertEqual(self.search_titles('/api/tasks/?search=invoice*'), ['Invoice export'])
+
+    def test_project_search(self):
+        response = self.client.get('/api/projects/?search=billing')
+        self.assertEqual([row['name'] for row in response.data['results']], ['Payments Platform'])
+
+    def test_admin_changelist_search(self):
+        from django.test import Client
+
+        self.create_task(title='Invoice export')
+        self.create_task(title='Unrelated')
+        admin_user = User.objects.create_superuser(username='admin', password='adminpass')
+        client = Client()
+        client.force_login(admin_user)
+        response = client.get('/admin/projects/task/', {'q': 'invoices'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task.title for task in response.context['cl'].result_list], ['Invoice export'])
+
+    def test_admin_search_matches_fields_outside_the_index(self):
+        from django.test import Client
+
+        self.create_task(title='Invoice export')
+        self.create_task(DevelopmentTask, title='Webhooks', repository_url='https://git.example.com/hooks')
+        admin_user = User.objects.create_superuser(username='admin', password='adminpass')
+        client = Client()
+        client.force_login(admin_user)
+
+        def titles(url, term):
+            response = client.get(url, {'q': term})
+            self.assertEqual(response.status_code, 200)
+            return sorted(task.title for task in response.context['cl'].result_list)
+
+        # project__name isn't in the task index
+        self.assertEqual(titles('/admin/projects/task/', 'payments'), ['Invoice export', 'Webhooks'])
+        self.assertEqual(titles('/admin/projects/developmenttask/', 'git.example'), ['Webhooks'])
+
+class SubstringFilterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name='Payments Platform',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.user
+        )
+        for title in ['Refactor Checkout', 'checkout tests', 'Billing 100%', 'Docs']:
+            DevelopmentTask.objects.create(
+                title=title,
+                project=self.project,
+                due_date=timezone.now() + timedelta(days=7),
+                created_by=self.user
+            )
+
+    def titles(self, url):
+        return sorted(row['title'] for row in self.client.get(url).data['results'])
+
+    def test_title_filter_uses_trigram_index(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            titles = self.titles('/api/tasks/?title=CHECKOUT')
+        self.assertEqual(titles, ['Refactor Checkout', 'checkout tests'])
+        self.assertTrue(any('projects_task_trgm' in q['sql'] for q in queries.captured_queries))
+        self.assertEqual(self.titles('/api/development-tasks/?title=eckou'), ['Refactor Checkout', 'checkout tests'])
+
+    def test_short_and_wildcard_values_fall_back_to_icontains(self):
+        self.assertEqual(self.titles('/api/tasks/?title=do'), ['Docs'])
+        self.assertEqual(self.titles('/api/tasks/?title=0%'), ['Billing 100%'])
+        self.assertEqual(self.titles('/api/tasks/?title=_'), [])
+
+    def test_project_name_filter(self):
+        response = self.client.get('/api/projects/?name=ments plat')
+        self.assertEqual([row['name'] for row in response.data['results']], ['Payments Platform'])
@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from django.core import mail
 from django.utils import timezone
@@ -51,4 +51,42 @@ class SignalTest(TestCase):
         
         # Check that no email was sent
         self.assertEqual(len(mail.outbox), 0)
-   
\ No newline at end of file
+
+    @override_settings(TASK_NOTIFICATIONS_SYNC=False)
+    def test_email_is_sent_after_commit(self):
+        mail.outbox = []
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            DevelopmentTask.objects.create(
+                title='Test Task',
+                project=self.project,
+                assigned_to=self.user,
+                due_date=timezone.now() + timedelta(days=7),
+                created_by=self.user
+            )
+        # Nothing goes out until the transaction commits
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(callbacks)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('New Task Assigned', mail.outbox[0].subject)
+
+    def test_failed_delivery_is_retried_for_failed_tasks_only(self):
+        from unittest import mock
+        from apps.projects.tasks import send_task_created_notifications
+
+        task = DevelopmentTask.objects.create(
+            title='Test Task',
+            project=self.project,
+            assigned_to=self.user,
+            due_date=timezone.now() + timedelta(days=7),
+            created_by=self.user
+        )
+        with mock.patch(
+            'apps.projects.tasks.deliver_task_created_notifications', return_value=(0, [task.pk])
+        ), mock.patch.object(send_task_created_notifications, 'retry', side_effect=RuntimeError) as retry:
+            with self.assertRaises(RuntimeError):
+                send_task_created_notifications.run([task.pk])
+        self.assertEqual(retry.call_args.kwargs['args'], [[task.pk]])
+
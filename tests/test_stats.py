@@ -0,0 +1,94 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from apps.projects.models import Project, ProjectStats, Task, DevelopmentTask, DesignTask
+from apps.projects.views import summarize_tasks
+
+class ProjectStatsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.project = Project.objects.create(
+            name='Test Project',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.user
+        )
+
+    def create_task(self, model=DevelopmentTask, **kwargs):
+        defaults = {
+            'title': 'Task',
+            'project': self.project,
+            'due_date': timezone.now() + timedelta(days=7),
+            'estimated_hours': 4,
+            'created_by': self.user,
+        }
+        defaults.update(kwargs)
+        return model.objects.create(**defaults)
+
+    def stats(self):
+        return ProjectStats.objects.get(project=self.project)
+
+    def test_stats_created_with_project(self):
+        self.assertEqual(self.stats().total_tasks, 0)
+
+    def test_create_update_and_soft_delete(self):
+        task = self.create_task()
+        self.create_task(model=DesignTask, status='blocked', estimated_hours=2)
+        stats = self.stats()
+        self.assertEqual(stats.total_tasks, 2)
+        self.assertEqual(stats.blocked_tasks, 1)
+        self.assertEqual(stats.estimated_hours, 6)
+
+        task = Task.objects.get(pk=task.pk)
+        task.status = 'completed'
+        task.actual_hours = 5
+        task.save()
+        stats = self.stats()
+        self.assertEqual(stats.completed_tasks, 1)
+        self.assertEqual(stats.actual_hours, 5)
+        self.assertEqual(Project.objects.get(pk=self.project.pk).progress_percentage, 50.0)
+
+        task.soft_delete()
+        stats = self.stats()
+        self.assertEqual(stats.total_tasks, 1)
+        self.assertEqual(stats.completed_tasks, 0)
+        self.assertEqual(stats.actual_hours, 0)
+
+    def test_delete_and_overdue(self):
+        task = self.create_task(due_date=timezone.now() + timedelta(hours=1), status=Task.StatusChoices.BLOCKED)
+        self.assertEqual(summarize_tasks(self.project)['overdue_tasks'], 0)
+        # The due date passes without any write to the task
+        Task.objects.filter(pk=task.pk).update(due_date=timezone.now() - timedelta(hours=1))
+        self.assertEqual(summarize_tasks(self.project)['overdue_tasks'], 1)
+        task.refresh_from_db()
+        task.status = Task.StatusChoices.COMPLETED
+        task.save()
+        self.assertEqual(summarize_tasks(self.project)['overdue_tasks'], 0)
+        task.delete()
+        self.assertEqual(self.stats().total_tasks, 0)
+        self.assertEqual(summarize_tasks(self.project)['overdue_tasks'], 0)
+
+    def test_moving_task_between_projects(self):
+        other = Project.objects.create(
+            name='Other Project',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+        )
+        task = self.create_task()
+        task.project = other
+        task.save()
+        self.assertEqual(self.stats().total_tasks, 0)
+        self.assertEqual(ProjectStats.objects.get(project=other).total_tasks, 1)
+
+    def test_rebuild_command(self):
+        self.create_task(status='in_progress')
+        ProjectStats.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_project_stats', stdout=out)
+        self.assertIn('Rebuilt stats for 1 projects', out.getvalue())
+        stats = self.stats()
+        self.assertEqual(stats.total_tasks, 1)
+        self.assertEqual(stats.in_progress_tasks, 1)
@@ -0,0 +1,132 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core import mail
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from apps.projects.models import Project, Task
+from apps.projects.tasks import mark_overdue_tasks
+
+class MarkOverdueTasksTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass',
+            email='test@example.com'
+        )
+        self.project = Project.objects.create(
+            name='Test Project',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.user
+        )
+
+    def create_task(self, due_in, **kwargs):
+        return Task.objects.create(
+            title='Task',
+            project=self.project,
+            assigned_to=self.user,
+            due_date=timezone.now() + due_in,
+            created_by=self.user,
+            **kwargs
+        )
+
+    def run_scan(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return mark_overdue_tasks.run(**kwargs)
+
+    def test_each_overdue_task_is_notified_once(self):
+        overdue = [self.create_task(timedelta(hours=-i - 1)) for i in range(3)]
+        self.create_task(timedelta(days=1))
+        self.create_task(timedelta(hours=-1), status=Task.StatusChoices.COMPLETED)
+        mail.outbox = []
+
+        self.assertEqual(self.run_scan(chunk_size=2), 'Processed 3 overdue tasks')
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertTrue(all('Overdue Task' in message.subject for message in mail.outbox))
+        self.assertFalse(
+            Task.objects.filter(pk__in=[t.pk for t in overdue], overdue_notified_at__isnull=True).exists()
+        )
+
+        self.assertEqual(self.run_scan(), 'Processed 0 overdue tasks')
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_tasks_overdue_before_the_last_run_are_still_notified(self):
+        self.run_scan()
+        # Created already past due, and moved from the future to the past
+        self.create_task(timedelta(days=-3))
+        task = self.create_task(timedelta(days=1))
+        task.due_date = timezone.now() - timedelta(days=2)
+        task.save()
+        self.assertEqual(self.run_scan(), 'Processed 2 overdue tasks')
+
+    def test_scan_refreshes_cached_project_summaries(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        summary = f'/api/projects/{self.project.pk}/tasks_summary/'
+        self.create_task(timedelta(seconds=1))
+        self.assertEqual(client.get(summary).data['overdue_tasks'], 0)
+        Task.objects.update(due_date=timezone.now() - timedelta(seconds=1))
+        self.run_scan()
+        self.assertEqual(client.get(summary).data['overdue_tasks'], 1)
+
+    def test_moving_the_due_date_allows_a_new_notification(self):
+        task = self.create_task(timedelta(hours=-1))
+        self.run_scan()
+        task.refresh_from_db()
+        self.assertIsNotNone(task.overdue_notified_at)
+
+        task.due_date = timezone.now() + timedelta(days=1)
+        task.save()
+        task.refresh_from_db()
+        self.assertIsNone(task.overdue_notified_at)
+
+class DailySummaryTest(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'user{i}', password='testpass', email=f'user{i}@example.com')
+            for i in range(3)
+        ]
+        self.project = Project.objects.create(
+            name='Test Project',
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date() + timedelta(days=30),
+            created_by=self.users[0]
+        )
+
+    def create_task(self, user, due_in, **kwargs):
+        return Task.objects.create(
+            title='Task',
+            project=self.project,
+            assigned_to=user,
+            due_date=timezone.now() + due_in,
+            created_by=user,
+            **kwargs
+        )
+
+    def test_summary_counts_per_user_across_shards(self):
+        from apps.projects.tasks import send_daily_summary
+
+        self.create_task(self.users[0], timedelta(days=-1))
+        self.create_task(self.users[0], timedelta(days=-2))
+        self.create_task(self.users[0], timedelta(days=7))
+        self.create_task(self.users[2], timedelta(days=-1), status=Task.StatusChoices.COMPLETED)
+        self.create_task(self.users[2], timedelta(days=-1))
+        self.create_task(self.users[1], timedelta(days=7))
+        mail.outbox = []
+
+        self.assertEqual(send_daily_summary.run(shard_size=1), 3)
+        by_recipient = {message.to[0]: message.body for message in mail.outbox}
+        self.assertEqual(sorted(by_recipient), ['user0@example.com', 'user2@example.com'])
+        self.assertIn('Overdue tasks: 2', by_recipient['user0@example.com'])
+        self.assertIn('Total active tasks: 3', by_recipient['user0@example.com'])
+        self.assertIn('Overdue tasks: 1', by_recipient['user2@example.com'])
+        self.assertIn('Total active tasks: 2', by_recipient['user2@example.com'])
+
+    def test_shard_runs_one_query(self):
+        from apps.projects.tasks import send_daily_summary_shard
+
+        self.create_task(self.users[0], timedelta(days=-1))
+        self.create_task(self.users[1], timedelta(days=-1))
+        with self.assertNumQueries(1):
+            self.assertEqual(send_daily_summary_shard.run(self.users[0].pk, self.users[1].pk), 2)
@@ -0,0 +1,60 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from apps.core.cache import get_cache
+from apps.core.throttling import consume, parse_rate
+
+
+@override_settings(
+    THROTTLE_RATES={'user': '10/min', 'anon': '20/min'},
+    THROTTLE_COSTS={'task-overdue': 4, 'login': 10, 'bulk_create': 10},
+)
+class TokenBucketThrottleTest(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('600/min'), (600, 60))
+        self.assertEqual(parse_rate('5/s'), (5, 1))
+
+    def test_bucket_empties_and_refills(self):
+        for _ in range(10):
+            self.assertEqual(consume('bucket', 10, 60, 1), 0)
+        wait = consume('bucket', 10, 60, 1)
+        self.assertAlmostEqual(wait, 6, delta=0.1)
+        # Requests costing more than the whole bucket wait for a full one
+        self.assertAlmostEqual(consume('bucket', 10, 60, 50), 60, delta=0.1)
+
+    def test_rejections_carry_retry_after(self):
+        for _ in range(10):
+            self.assertEqual(self.client.get('/api/tasks/').status_code, 200)
+        response = self.client.get('/api/tasks/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '6')
+
+    def test_expensive_endpoints_cost_more(self):
+        self.assertEqual(self.client.get('/api/tasks/overdue/').status_code, 200)
+        self.assertEqual(self.client.get('/api/tasks/overdue/').status_code, 200)
+        self.assertEqual(self.client.get('/api/tasks/overdue/').status_code, 429)
+        self.assertEqual(self.client.get('/api/tasks/').status_code, 200)
+
+    def test_actions_cost_the_same_on_every_viewset(self):
+        self.client.post('/api/development-tasks/bulk-create/', [], format='json')
+        self.assertEqual(self.client.get('/api/tasks/').status_code, 429)
+
+    def test_users_and_anonymous_clients_have_separate_buckets(self):
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user(username='other'))
+        for _ in range(10):
+            self.client.get('/api/tasks/')
+        self.assertEqual(self.client.get('/api/tasks/').status_code, 429)
+        self.assertEqual(other.get('/api/tasks/').status_code, 200)
+
+        anon = APIClient()
+        data = {'username': 'testuser', 'password': 'wrong'}
+        self.assertEqual(anon.post('/api/auth/login/', data).status_code, 401)
+        self.assertEqual(anon.post('/api/auth/login/', data).status_code, 401)
+        self.assertEqual(anon.post('/api/auth/login/', data).status_code, 429)
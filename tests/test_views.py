@@ -2,7 +2,9 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
-from apps.projects.models import Project
+from django.utils import timezone
+from datetime import timedelta
+from apps.projects.models import Project, Task, DevelopmentTask, DesignTask
 
 class ProjectAPITest(TestCase):
     def setUp(self):
@@ -32,3 +34,145 @@ class ProjectAPITest(TestCase):
         response = self.client.get('/api/projects/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
+
+    def test_overdue_projects_are_paginated(self):
+        Project.objects.create(
+            name='Late Project',
+            start_date='2023-01-01',
+            end_date='2023-02-01',
+            created_by=self.user
+        )
+        Project.objects.create(
+            name='Finished Project',
+            status='completed',
+            start_date='2023-01-01',
+            end_date='2023-02-01',
+            created_by=self.user
+        )
+        response = self.client.get('/api/projects/overdue/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Late Project')
+
+    def test_project_list_is_lean_by_default(self):
+        project = Project.objects.create(
+            name='Test Project',
+            start_date='2023-01-01',
+            end_date='2023-12-31',
+            created_by=self.user
+        )
+        project.assigned_to.set([self.user])
+        Task.objects.create(
+            title='Task', project=project, assigned_to=self.user,
+            due_date=timezone.now() + timedelta(days=1)
+        )
+        response = self.client.get('/api/projects/')
+        item = response.data['results'][0]
+        self.assertNotIn('tasks', item)
+        self.assertEqual(item['assigned_to'], [self.user.id])
+        self.assertEqual(item['tasks_count'], 1)
+
+        response = self.client.get('/api/projects/?expand=tasks,assigned_to')
+        item = response.data['results'][0]
+        self.assertEqual(item['assigned_to'][0]['username'], 'testuser')
+        self.assertEqual(item['tasks'][0]['assigned_to'], self.user.id)
+
+        response = self.client.get(f'/api/projects/{project.id}/')
+        self.assertEqual(response.data['tasks'][0]['assigned_to']['username'], 'testuser')
+
+    def test_sparse_fieldsets(self):
+        Project.objects.create(
+            name='Test Project',
+            start_date='2023-01-01',
+            end_date='2023-12-31',
+            created_by=self.user
+        )
+        response = self.client.get('/api/projects/?fields=id,name')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+        response = self.client.get('/api/projects/?fields=id,tasks.title&expand=tasks')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'tasks'})
+
+class TaskAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            name='Test Project',
+            start_date='2023-01-01',
+            end_date='2030-12-31',
+            created_by=self.user
+        )
+
+    def test_overdue_tasks(self):
+        Task.objects.create(
+            title='Late Task',
+            project=self.project,
+            due_date=timezone.now() - timedelta(days=2),
+            created_by=self.user
+        )
+        Task.objects.create(
+            title='Future Task',
+            project=self.project,
+            due_date=timezone.now() + timedelta(days=2),
+            created_by=self.user
+        )
+        response = self.client.get('/api/tasks/overdue/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['title'], 'Late Task')
+
+    def test_task_list_is_polymorphic(self):
+        due = timezone.now() + timedelta(days=2)
+        for i in range(3):
+            DevelopmentTask.objects.create(
+                title=f'Dev {i}', project=self.project, due_date=due, technology='django'
+            )
+            DesignTask.objects.create(
+                title=f'Design {i}', project=self.project, due_date=due, design_type='mockup'
+            )
+        Task.objects.create(title='Plain', project=self.project, due_date=due)
+
+        # count and page; subtype columns come with the rows
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/tasks/')
+        by_title = {item['title']: item for item in response.data['results']}
+        self.assertEqual(by_title['Dev 0']['task_type'], 'development')
+        self.assertEqual(by_title['Dev 0']['technology'], 'django')
+        self.assertEqual(by_title['Design 0']['task_type'], 'design')
+        self.assertEqual(by_title['Design 0']['design_type'], 'mockup')
+        self.assertEqual(by_title['Plain']['task_type'], 'task')
+        self.assertNotIn('technology', by_title['Plain'])
+
+        task_id = by_title['Dev 1']['id']
+        response = self.client.get(f'/api/tasks/{task_id}/')
+        self.assertEqual(response.data['technology'], 'django')
+
+    def test_keyset_pagination(self):
+        due = timezone.now() + timedelta(days=2)
+        for i in range(25):
+            Task.objects.create(
+                title=f'Task {i}', project=self.project, due_date=due + timedelta(hours=i % 5),
+                priority=['low', 'high'][i % 2]
+            )
+        orderings = {
+            '': ('-created_at', '-id'),
+            '&ordering=due_date': ('due_date', 'id'),
+            '&ordering=-priority': ('-priority', '-id'),
+        }
+        for ordering, order_by in orderings.items():
+            seen = []
+            response = self.client.get(f'/api/tasks/?cursor={ordering}')
+            self.assertNotIn('count', response.data)
+            while True:
+                seen.extend(item['id'] for item in response.data['results'])
+                if not response.data['next']:
+                    break
+                response = self.client.get(response.data['next'])
+            expected = list(Task.objects.order_by(*order_by).values_list('id', flat=True))
+            self.assertEqual(seen, expected)
+
+        response = self.client.get('/api/tasks/?cursor=bogus')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get('/api/tasks/?page=2')
+        self.assertEqual(response.data['count'], 25)